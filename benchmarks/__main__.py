@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import shutil
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+
+from datetime import datetime, timezone
+
+from benchmarks.runner import git_commit, child_env, start_child, child_result
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Benchmark Settings
+# ---------------------------------------------------------------------------------------------------------------------
+CASE_NAMES = ("drop_tick", "claim", "cleanup", "leaderboard")
+DEFAULT_GUILDS = "1000,10000,100000"
+DEFAULT_STATS_ROWS = 1_000_000
+
+QUICK = {"guilds": "100,1000", "stats_rows": 50_000, "claims": 1_000, "lookups": 50, "repeat": 1}
+
+# Options forwarded unchanged to every child process
+CHILD_OPTIONS = ("stats_rows", "claims", "lookups", "repeat", "concurrency", "expired_per_guild", "members",
+                 "rest_latency", "seed", "log_level")
+
+
+def parse_list(value: str):
+    return [int(part.replace("_", "")) for part in value.split(",") if part.strip()]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Child Process
+# ---------------------------------------------------------------------------------------------------------------------
+def run_child(options):
+    """Runs one case at one scale in this process and prints its result as a single JSON line."""
+    # Imported here: config creates data/ in the working directory, which the parent points at a scratch dir
+    from benchmarks import cases
+
+    logging.getLogger().setLevel(options.log_level.upper())
+    row = asyncio.run(cases.run(options.child[0], int(options.child[1]), options))
+    print(json.dumps(row), flush=True)
+
+
+def spawn(case: str, guilds: int, options):
+    """Runs a case in a fresh interpreter and scratch directory, so peak RSS and the databases start clean."""
+    scratch = tempfile.mkdtemp(prefix=f"collector-bench-{case}-{guilds}-")
+
+    args = ["--child", case, guilds]
+    for name in CHILD_OPTIONS:
+        args += [f"--{name.replace('_', '-')}", getattr(options, name)]
+    if options.throttled:
+        args.append("--throttled")
+
+    try:
+        process = start_child("benchmarks", args, scratch, child_env(options.backend, options.partitions))
+        row = child_result(process)
+        if row is None:
+            return {"case": case, "guilds": guilds, "error": f"exited with status {process.returncode}"}
+        return row
+    finally:
+        if options.keep:
+            print(f"Kept {scratch}", file=sys.stderr)
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def run_all(options):
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": options.backend,
+            "partitions": options.partitions,
+            "throttled": options.throttled,
+            "rest_latency_ms": options.rest_latency,
+        },
+        "results": [],
+    }
+
+    for case in options.cases:
+        for guilds in options.guilds:
+            print(f"[bench] {case} at {guilds} guild(s)...", file=sys.stderr, flush=True)
+            row = spawn(case, guilds, options)
+            report["results"].append(row)
+            if "error" in row:
+                print(f"[bench] {case} at {guilds} guild(s) failed: {row['error']}", file=sys.stderr)
+            else:
+                print(f"[bench] {row['ops_per_sec']} ops/s, p50 {row['p50_ms']} ms, p99 {row['p99_ms']} ms, "
+                      f"peak RSS {row['peak_rss_mb']} MB", file=sys.stderr, flush=True)
+
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+        print(f"[bench] Wrote {options.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    return 1 if any("error" in row for row in report["results"]) else 0
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------------------------------------------------
+def compare(base_path: str, head_path: str, threshold: float) -> int:
+    """Prints throughput and p99 changes per case and scale; exits 1 if any moved the wrong way past threshold."""
+    def load(path):
+        with open(path, encoding="utf-8") as file:
+            report = json.load(file)
+        rows = {(row["case"], row["guilds"], row.get("stats_rows")): row
+                for row in report["results"] if "error" not in row}
+        return report["meta"], rows
+
+    (base_meta, base), (head_meta, head) = load(base_path), load(head_path)
+    regressions = 0
+
+    print(f"base {base_meta['commit']} vs head {head_meta['commit']}")
+    for name in ("backend", "partitions", "throttled", "rest_latency_ms", "platform"):
+        if base_meta.get(name) != head_meta.get(name):
+            print(f"warning: {name} differs ({base_meta.get(name)} vs {head_meta.get(name)}); not like for like")
+
+    print(f"{'case':<12} {'guilds':>8} {'ops/s base':>12} {'ops/s head':>12} {'Δ':>8} "
+          f"{'p99 base':>10} {'p99 head':>10} {'Δ':>8}")
+    for key in sorted(base.keys() & head.keys(), key=lambda key: (CASE_NAMES.index(key[0]), key[1])):
+        old, new = base[key], head[key]
+        throughput = (new["ops_per_sec"] - old["ops_per_sec"]) / old["ops_per_sec"] if old["ops_per_sec"] else 0.0
+        tail = (new["p99_ms"] - old["p99_ms"]) / old["p99_ms"] if old["p99_ms"] else 0.0
+
+        flag = ""
+        if throughput < -threshold or tail > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{key[0]:<12} {key[1]:>8} {old['ops_per_sec']:>12} {new['ops_per_sec']:>12} {throughput:>+8.1%} "
+              f"{old['p99_ms']:>10} {new['p99_ms']:>10} {tail:>+8.1%}{flag}")
+
+    for key in sorted(base.keys() ^ head.keys()):
+        print(f"{key[0]:<12} {key[1]:>8} only in {'base' if key in base else 'head'}")
+
+    return 1 if regressions else 0
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Main Function
+# ---------------------------------------------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Hot-path benchmarks against fake guilds, channels and interactions. No Discord connection."
+    )
+    parser.add_argument("--cases", default=",".join(CASE_NAMES), help=f"Comma-separated from {', '.join(CASE_NAMES)}")
+    parser.add_argument("--guilds", default=DEFAULT_GUILDS, help="Comma-separated guild counts to run each case at")
+    parser.add_argument("--stats-rows", type=int, default=DEFAULT_STATS_ROWS,
+                        help="item_stats rows seeded for the leaderboard case")
+    parser.add_argument("--backend", default=os.getenv("STORAGE_BACKEND", "sqlite"), choices=("sqlite", "memory"))
+    parser.add_argument("--partitions", type=int, default=int(os.getenv("DB_PARTITIONS", 0)),
+                        help="DB_PARTITIONS for the sqlite backend")
+    parser.add_argument("--claims", type=int, default=10_000, help="Claim clicks per claim run")
+    parser.add_argument("--concurrency", type=int, default=64, help="Claim clicks in flight at once")
+    parser.add_argument("--lookups", type=int, default=200, help="Leaderboard builds per view")
+    parser.add_argument("--repeat", type=int, default=3, help="Drop ticks / cleanup passes per run")
+    parser.add_argument("--expired-per-guild", type=int, default=2, help="Expired drops per guild per cleanup pass")
+    parser.add_argument("--members", type=int, default=5, help="Members per fake guild")
+    parser.add_argument("--rest-latency", type=float, default=0.0, help="Simulated REST round trip in ms")
+    parser.add_argument("--throttled", action="store_true", help="Keep the 40/s send limiter (slow at scale)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--quick", action="store_true", help=f"Smoke-test sizes: {QUICK}")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--keep", action="store_true", help="Keep each run's scratch directory")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="Compare two saved reports")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change --compare flags")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.child:
+        return run_child(options)
+
+    if options.compare:
+        return compare(*options.compare, options.threshold)
+
+    if options.quick:
+        for name, value in QUICK.items():
+            if parser.get_default(name) == getattr(options, name):
+                setattr(options, name, value)
+
+    options.cases = [case.strip() for case in options.cases.split(",") if case.strip()]
+    unknown = set(options.cases) - set(CASE_NAMES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+    options.guilds = parse_list(options.guilds)
+
+    return run_all(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
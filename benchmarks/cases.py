@@ -0,0 +1,215 @@
+import time
+import random
+import asyncio
+import discord
+
+from datetime import datetime, timedelta, timezone
+
+from core.shards import ShardPartition
+from core.storage import storage
+from cogs.game_collector import DropButton, LeaderboardView
+
+from benchmarks.fakes import FakeBot, FakeInteraction, FakeMessage, snowflake
+from benchmarks.harness import Samples, instrument, result, unthrottle, load_bot, close_databases
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Case Settings
+# ---------------------------------------------------------------------------------------------------------------------
+# Far enough back that every guild's sampled next drop is already due
+OVERDUE = 10_000_000
+SEED_CHUNK = 50_000
+LEADERBOARD_FAILED = "Failed to load leaderboard."
+
+
+def partition_for(bot, cog) -> ShardPartition:
+    return ShardPartition(0, bot.shard_count, cog.drop_interval, cog.drop_chance_denominator)
+
+
+async def seed_drops(bot, per_guild: int, dropped_at: datetime, expires_at: int):
+    """Records per_guild drops in every guild's first channel and returns their messages."""
+    messages = []
+    for guild in bot.guilds:
+        channel = guild.text_channels[0]
+        for _ in range(per_guild):
+            embed = discord.Embed(description="Something dropped! Claim it or Destroy it!")
+            messages.append(FakeMessage(channel, snowflake(dropped_at), embeds=[embed]))
+
+    records = [
+        (message.id, message.guild.id, message.channel.id, dropped_at.replace(tzinfo=None).isoformat(), expires_at)
+        for message in messages
+    ]
+    for start in range(0, len(records), SEED_CHUNK):
+        for group in storage.groups(records[start:start + SEED_CHUNK], guild_of=lambda record: record[1]):
+            await storage.record_drops(group)
+    return messages
+
+
+async def seed_stats(bot, rows: int, rng: random.Random):
+    """Writes `rows` distinct item_stats rows spread evenly over the guilds, with a long-tailed score spread."""
+    guild_ids = [guild.id for guild in bot.guilds]
+    user_ids = [snowflake() for _ in range(max(1_000, rows // 4))]
+
+    batch = []
+    for index in range(rows):
+        guild_index, slot = index % len(guild_ids), index // len(guild_ids)
+        user_id = user_ids[(slot + guild_index * 7_919) % len(user_ids)]
+        collected = int(rng.paretovariate(1.2))
+        batch.append((guild_ids[guild_index], user_id, collected, int(rng.paretovariate(1.5)) - 1, collected // 50))
+
+        if len(batch) >= SEED_CHUNK or index == rows - 1:
+            for group in storage.groups(batch):
+                await storage.record_stats(group)
+            batch = []
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Drop Tick
+# ---------------------------------------------------------------------------------------------------------------------
+async def drop_tick(bot, cog, options, scale):
+    """Every guild due at once: item_drop_task sends one drop per guild and records them."""
+    partition = partition_for(bot, cog)
+    guild_ids = [guild.id for guild in bot.guilds]
+    per_drop, ticks = Samples(), Samples()
+    instrument(cog, "drop_item", per_drop)
+
+    started = time.perf_counter()
+    for _ in range(options.repeat):
+        partition.scheduler.schedule_many(guild_ids, now=partition.scheduler.clock() - OVERDUE)
+        tick_started = time.perf_counter()
+        await cog.item_drop_task(partition)
+        ticks.observe(time.perf_counter() - tick_started)
+    elapsed = time.perf_counter() - started
+
+    sent = sum(guild.text_channels[0].sent for guild in bot.guilds)
+    return result("drop_tick", scale, sent, elapsed, per_drop, {"drop": per_drop, "tick": ticks},
+                  recorded=await storage.active_drop_count())
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Claims
+# ---------------------------------------------------------------------------------------------------------------------
+async def claim(bot, cog, options, scale):
+    """One Claim click on each of up to --claims open drops, --concurrency at a time."""
+    rng = random.Random(options.seed)
+    messages = await seed_drops(bot, 1, datetime.now(timezone.utc), int(time.time()) + 1_800)
+    messages = rng.sample(messages, min(options.claims, len(messages)))
+
+    handler = Samples()
+    semaphore = asyncio.Semaphore(options.concurrency)
+    outcomes = {"edit": 0, "message": 0, None: 0}
+
+    async def click(message):
+        async with semaphore:
+            interaction = FakeInteraction(bot, rng.choice(message.guild.humans()), message.guild, message=message)
+            button = DropButton("claim", "normal")
+            started = time.perf_counter()
+            await button.callback(interaction)
+            handler.observe(time.perf_counter() - started)
+            outcomes[interaction.response.kind] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(click(message) for message in messages))
+    elapsed = time.perf_counter() - started
+
+    return result("claim", scale, len(messages), elapsed, handler, {"handler": handler},
+                  claimed=outcomes["edit"], refused=outcomes["message"], unanswered=outcomes[None])
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Cleanup
+# ---------------------------------------------------------------------------------------------------------------------
+async def cleanup(bot, cog, options, scale):
+    """--expired-per-guild expired drops in every guild, removed by one cleanup_expired_drops pass per repeat."""
+    partition = partition_for(bot, cog)
+    per_channel, passes = Samples(), Samples()
+    instrument(cog, "_purge_channel", per_channel)
+
+    elapsed = 0.0
+    for _ in range(options.repeat):
+        dropped_at = datetime.now(timezone.utc) - timedelta(minutes=31)
+        await seed_drops(bot, options.expired_per_guild, dropped_at, int(time.time()) - 60)
+        partition.expiries.push(time.time() - 1)
+
+        started = time.perf_counter()
+        await cog.cleanup_expired_drops(partition)
+        passes.observe(time.perf_counter() - started)
+        elapsed += time.perf_counter() - started
+
+    return result("cleanup", scale, partition.cleanup_totals["deleted"], elapsed, passes,
+                  {"pass": passes, "channel": per_channel},
+                  skipped=partition.cleanup_totals["skipped"], failed=partition.cleanup_totals["failed"],
+                  remaining=await storage.active_drop_count())
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Leaderboard
+# ---------------------------------------------------------------------------------------------------------------------
+# (global view, metric, page)
+LEADERBOARD_VARIANTS = {
+    "local_top": (False, "collected", 1),
+    "local_page2": (False, "collected", 2),
+    "global_top": (True, "collected", 1),
+    "global_page2": (True, "collected", 2),
+    "global_destroyed": (True, "destroyed", 1),
+}
+
+
+async def leaderboard(bot, cog, options, scale):
+    """build_leaderboard_embed for --lookups random guilds in each view, over --stats-rows item_stats rows."""
+    rng = random.Random(options.seed)
+    await seed_stats(bot, options.stats_rows, rng)
+
+    series = {name: Samples() for name in LEADERBOARD_VARIANTS}
+    overall = Samples()
+    failures = 0
+
+    elapsed = 0.0
+    for _ in range(options.lookups):
+        for name, (global_view, metric, page) in LEADERBOARD_VARIANTS.items():
+            guild = rng.choice(bot.guilds)
+            interaction = FakeInteraction(bot, rng.choice(guild.humans()), guild)
+            view = LeaderboardView(bot, guild.id)
+            view.global_view, view.metric = global_view, metric
+            if page > 1:
+                await view.build_leaderboard_embed(interaction)
+                view.cursors.append(view.last_key)
+
+            started = time.perf_counter()
+            embed = await view.build_leaderboard_embed(interaction)
+            took = time.perf_counter() - started
+            view.stop()
+
+            series[name].observe(took)
+            overall.observe(took)
+            elapsed += took
+            failures += embed.description == LEADERBOARD_FAILED
+
+    return result("leaderboard", scale, len(overall), elapsed, overall, series, failures=failures)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------------------------------------------------
+CASES = {
+    "drop_tick": drop_tick,
+    "claim": claim,
+    "cleanup": cleanup,
+    "leaderboard": leaderboard,
+}
+
+
+async def run(case: str, guilds: int, options) -> dict:
+    """Builds a fake bot with `guilds` guilds, runs one case against it and returns its result row."""
+    bot = FakeBot.populated(guilds, members=options.members, latency=options.rest_latency / 1000)
+    if not options.throttled:
+        unthrottle()
+
+    cog = await load_bot(bot)
+    try:
+        scale = {"guilds": guilds}
+        if case == "leaderboard":
+            scale["stats_rows"] = options.stats_rows
+        return await CASES[case](bot, cog, options, scale)
+    finally:
+        await bot.close()
+        await close_databases()
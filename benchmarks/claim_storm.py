@@ -0,0 +1,389 @@
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+
+from datetime import datetime, timezone
+
+from benchmarks.fakes import snowflake
+from benchmarks.runner import git_commit, child_env, start_child, child_result
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Storm Settings
+# ---------------------------------------------------------------------------------------------------------------------
+ARRIVALS = ("burst", "uniform", "poisson", "normal")
+
+# Discord shows "This interaction failed" if there is no response within three seconds of the click
+INTERACTION_DEADLINE = 3.0
+BURST_SPREAD = 0.01
+# Time for every worker to open the database and load guild state before the first click
+STARTUP_MARGIN = 3.0
+
+
+def arrival_offsets(kind: str, count: int, window: float, rng: random.Random):
+    """Seconds after a drop appears at which each of `count` clickers clicks."""
+    if kind == "burst":
+        return [rng.uniform(0, BURST_SPREAD) for _ in range(count)]
+    if kind == "uniform":
+        return [rng.uniform(0, window) for _ in range(count)]
+    if kind == "poisson":
+        offsets, at = [], 0.0
+        for _ in range(count):
+            at += rng.expovariate(count / window)
+            offsets.append(at)
+        return offsets
+    return [min(window, max(0.0, rng.gauss(window / 2, window / 6))) for _ in range(count)]
+
+
+def make_plan(options):
+    """Guilds, drops and every click, fixed up front so each worker process sees the same storm."""
+    rng = random.Random(options.seed)
+    guilds = [[snowflake(), snowflake()] for _ in range(options.guilds)]
+    clickers = {guild_id: [snowflake() for _ in range(options.clickers)] for guild_id, _ in guilds}
+
+    drops, clicks = [], []
+    for index in range(options.drops):
+        guild_index = index % len(guilds)
+        rarity = "rare" if rng.random() < options.rare_ratio else "normal"
+        drops.append([snowflake(), guild_index, rarity])
+
+        posted_at = index * options.drop_spacing
+        users = clickers[guilds[guild_index][0]]
+        for user_id, offset in zip(users, arrival_offsets(options.arrival, len(users), options.window, rng)):
+            action = "destroy" if rng.random() < options.destroy_ratio else "claim"
+            clicks.append([posted_at + offset, index, user_id, action])
+
+    clicks.sort()
+    for index, click in enumerate(clicks):
+        click.append(index % options.processes)
+
+    return {"guilds": guilds, "drops": drops, "clicks": clicks, "rest_latency": options.rest_latency / 1000}
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Child Processes
+# ---------------------------------------------------------------------------------------------------------------------
+# The bot's modules are imported inside these functions: config creates data/ in the working directory, which the
+# parent points at the storm's scratch directory.
+def build_bot(plan):
+    from benchmarks.fakes import FakeBot, FakeGuild
+
+    bot = FakeBot()
+    for guild_id, channel_id in plan["guilds"]:
+        bot.add_guild(FakeGuild(bot, guild_id, members=0, latency=plan["rest_latency"], channel_id=channel_id))
+    return bot
+
+
+async def seed(plan):
+    """Creates the schema and records every drop as open, as drop_item would have."""
+    from core.storage import storage
+    from benchmarks.harness import load_bot, close_databases
+
+    bot = build_bot(plan)
+    await load_bot(bot)
+    try:
+        now = datetime.now(timezone.utc)
+        records = [(message_id, plan["guilds"][guild_index][0], plan["guilds"][guild_index][1],
+                    now.replace(tzinfo=None).isoformat(), int(now.timestamp()) + 3_600)
+                   for message_id, guild_index, _ in plan["drops"]]
+        for group in storage.groups(records, guild_of=lambda record: record[1]):
+            await storage.record_drops(group)
+        return {"drops": len(records)}
+    finally:
+        await bot.close()
+        await close_databases()
+
+
+async def work(plan, worker: int, start_at: float):
+    """Plays this worker's share of the clicks at their planned times and reports what each one got back."""
+    import discord
+    from core.database import partitions
+    from core.metrics import latency
+    from cogs.game_collector import DropButton, ALREADY_SETTLED
+    from benchmarks.fakes import FakeMember, FakeMessage, FakeInteraction
+    from benchmarks.harness import load_bot, close_databases, peak_rss_mb
+
+    bot = build_bot(plan)
+    await load_bot(bot)
+
+    messages = []
+    for message_id, guild_index, _ in plan["drops"]:
+        guild = bot.get_guild(plan["guilds"][guild_index][0])
+        embed = discord.Embed(description="Something dropped! Claim it or Destroy it!")
+        messages.append(FakeMessage(guild.text_channels[0], message_id, embeds=[embed]))
+
+    # Lock waits are counted from the first click, not during setup
+    for pool in partitions.pools:
+        pool.checkouts = {"reader": 0, "writer": 0}
+        pool.wait_time = {"reader": 0.0, "writer": 0.0}
+        pool.max_wait = {"reader": 0.0, "writer": 0.0}
+
+    late_start = max(0.0, time.time() - start_at)
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+    base = time.perf_counter() - late_start
+    records = []
+
+    async def click(at, drop, user_id, action):
+        await asyncio.sleep(max(0.0, base + at - time.perf_counter()))
+        message = messages[drop]
+        interaction = FakeInteraction(bot, FakeMember(message.guild, user_id), message.guild, message=message)
+
+        started = time.perf_counter()
+        await DropButton(action, plan["drops"][drop][2]).callback(interaction)
+        handled = time.perf_counter() - started
+
+        response = interaction.response
+        if response.kind is None:
+            outcome = "unanswered"
+        elif response.kind == "edit":
+            outcome = "won"
+        elif response.content == ALREADY_SETTLED:
+            outcome = "refused"
+        else:
+            outcome = "error"
+        answered = response.answered_at - (base + at) if response.answered_at else None
+        records.append([drop, outcome, handled, answered, started - (base + at)])
+
+    await asyncio.gather(*(click(at, drop, user_id, action)
+                           for at, drop, user_id, action, owner in plan["clicks"] if owner == worker))
+
+    result = {
+        "worker": worker,
+        "records": records,
+        "pools": partitions.stats(),
+        "outbound_wait": latency("outbound_wait_interaction").summary(),
+        "late_start_ms": round(late_start * 1000, 1),
+    }
+    await bot.close()
+    await close_databases()
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+async def verify():
+    """What the database ended up crediting, read after every worker has flushed and exited."""
+    from core.database import partitions
+    from core.storage import storage
+    from benchmarks.harness import close_databases
+
+    try:
+        settled = item_stats = 0
+        for pool in partitions.pools:
+            async with pool.reader() as conn:
+                cursor = await conn.execute("SELECT COUNT(*) FROM active_drops WHERE status != 'open'")
+                settled += (await cursor.fetchone())[0]
+                cursor = await conn.execute(
+                    "SELECT COALESCE(SUM(items_collected + items_destroyed), 0) FROM item_stats"
+                )
+                item_stats += (await cursor.fetchone())[0]
+        collected, destroyed = await storage.totals()
+        return {"settled": settled, "credited": item_stats, "user_totals": collected + destroyed}
+    finally:
+        await close_databases()
+
+
+def run_child(options):
+    import config  # Configures logging, which is then turned down for the run
+
+    logging.getLogger().setLevel(options.log_level.upper())
+    with open(options.plan, encoding="utf-8") as file:
+        plan = json.load(file)
+
+    if options.role == "seed":
+        result = asyncio.run(seed(plan))
+    elif options.role == "worker":
+        result = asyncio.run(work(plan, options.worker, options.start_at))
+    else:
+        result = asyncio.run(verify())
+    print(json.dumps(result), flush=True)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------------------------------------------------
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def at(q):
+        return round(ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))] * 1000, 3)
+
+    return {"count": len(ordered), "p50_ms": at(50), "p90_ms": at(90), "p99_ms": at(99), "max_ms": at(100)}
+
+
+def summarise(options, plan, workers, verified) -> dict:
+    records = [record for worker in workers for record in worker["records"]]
+    outcomes = {"won": 0, "refused": 0, "error": 0, "unanswered": 0}
+    winners = [0] * len(plan["drops"])
+    for drop, outcome, *_ in records:
+        outcomes[outcome] += 1
+        winners[drop] += outcome == "won"
+
+    answered = [record[3] for record in records if record[3] is not None]
+    late = sum(1 for value in answered if value > options.deadline)
+    span = max(answered, default=0.0)
+
+    pools = [pool for worker in workers for pool in worker["pools"]]
+    checkouts = sum(pool["writer_checkouts"] for pool in pools)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "drops": options.drops,
+            "clickers": options.clickers,
+            "arrival": options.arrival,
+            "window_s": options.window,
+            "drop_spacing_s": options.drop_spacing,
+            "destroy_ratio": options.destroy_ratio,
+            "guilds": options.guilds,
+            "processes": options.processes,
+            "partitions": options.partitions,
+            "rest_latency_ms": options.rest_latency,
+            "seed": options.seed,
+        },
+        "clicks": len(records),
+        "seconds": round(span, 3),
+        "clicks_per_sec": round(len(records) / span, 1) if span else None,
+        "outcomes": outcomes,
+        "interaction_failed": outcomes["unanswered"] + outcomes["error"] + late,
+        "answered_late": late,
+        "latency": {
+            "handler": percentiles([record[2] for record in records]),
+            "click_to_response": percentiles(answered),
+            "dispatch_lag": percentiles([record[4] for record in records]),
+        },
+        "lock_wait": {
+            "writer_checkouts": checkouts,
+            "writer_wait_avg_ms": round(sum(pool["writer_wait_avg_ms"] * pool["writer_checkouts"]
+                                            for pool in pools) / checkouts, 3) if checkouts else 0.0,
+            "writer_wait_max_ms": max((pool["writer_wait_max_ms"] for pool in pools), default=0.0),
+            "outbound_wait_p99_ms": max(worker["outbound_wait"]["p99_ms"] for worker in workers),
+        },
+        "duplicates": {
+            "drops_with_several_winners": sum(1 for count in winners if count > 1),
+            "extra_winning_responses": sum(count - 1 for count in winners if count > 1),
+            "drops_without_winner": sum(1 for count in winners if count == 0),
+            "settled_in_db": verified["settled"],
+            "credited_in_db": verified["credited"],
+            "duplicate_credits": verified["credited"] - verified["settled"],
+            "user_totals_mismatch": verified["user_totals"] - verified["credited"],
+        },
+        "peak_rss_mb": max(worker["peak_rss_mb"] for worker in workers),
+        "late_start_ms": max(worker["late_start_ms"] for worker in workers),
+    }
+
+
+def storm(options) -> int:
+    plan = make_plan(options)
+    scratch = tempfile.mkdtemp(prefix="collector-storm-")
+    env = child_env("sqlite", options.partitions)
+    plan_path = f"{scratch}/plan.json"
+    with open(plan_path, "w", encoding="utf-8") as file:
+        json.dump(plan, file)
+
+    common = ["--plan", plan_path, "--log-level", options.log_level]
+    try:
+        print(f"[storm] {len(plan['clicks'])} click(s) on {options.drops} drop(s) across {options.processes} "
+              f"process(es), {options.arrival} arrivals...", file=sys.stderr, flush=True)
+        if child_result(start_child("benchmarks.claim_storm", ["--role", "seed", *common], scratch, env)) is None:
+            print("[storm] Seeding failed.", file=sys.stderr)
+            return 1
+
+        start_at = time.time() + STARTUP_MARGIN + 0.5 * options.processes
+        processes = [
+            start_child("benchmarks.claim_storm",
+                        ["--role", "worker", "--worker", worker, "--start-at", start_at, *common], scratch, env)
+            for worker in range(options.processes)
+        ]
+        workers = [child_result(process) for process in processes]
+        if any(worker is None for worker in workers):
+            print("[storm] A worker failed.", file=sys.stderr)
+            return 1
+
+        verified = child_result(start_child("benchmarks.claim_storm", ["--role", "verify", *common], scratch, env))
+        if verified is None:
+            print("[storm] Verification failed.", file=sys.stderr)
+            return 1
+    finally:
+        if options.keep:
+            print(f"[storm] Kept {scratch}", file=sys.stderr)
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    report = summarise(options, plan, workers, verified)
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+        print(f"[storm] Wrote {options.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    duplicates = report["duplicates"]
+    print(f"[storm] {report['clicks_per_sec']} clicks/s, click-to-response p99 "
+          f"{report['latency']['click_to_response'].get('p99_ms')} ms, {report['interaction_failed']} failed, "
+          f"{duplicates['duplicate_credits']} duplicate credit(s)", file=sys.stderr)
+
+    failed = duplicates["duplicate_credits"] or duplicates["extra_winning_responses"]
+    if report["interaction_failed"] > options.max_failed:
+        print(f"[storm] {report['interaction_failed']} failed interaction(s), more than --max-failed "
+              f"{options.max_failed}", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Main Function
+# ---------------------------------------------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.claim_storm",
+        description="Many users clicking Claim/Destroy on the same drops at once, against a real SQLite file."
+    )
+    parser.add_argument("--drops", type=int, default=20, help="Drops being fought over")
+    parser.add_argument("--clickers", type=int, default=300, help="Users clicking each drop")
+    parser.add_argument("--arrival", default="burst", choices=ARRIVALS,
+                        help="How each drop's clicks are spread over --window")
+    parser.add_argument("--window", type=float, default=1.0, help="Seconds over which a drop's clicks arrive")
+    parser.add_argument("--drop-spacing", type=float, default=0.0, help="Seconds between drops appearing")
+    parser.add_argument("--destroy-ratio", type=float, default=0.2, help="Share of clicks that are Destroy")
+    parser.add_argument("--rare-ratio", type=float, default=0.0, help="Share of drops that are rare")
+    parser.add_argument("--guilds", type=int, default=1, help="Guilds the drops are spread over")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Bot processes sharing the database, as in cluster mode; clicks are dealt round robin")
+    parser.add_argument("--partitions", type=int, default=0, help="DB_PARTITIONS")
+    parser.add_argument("--rest-latency", type=float, default=50.0, help="Simulated response round trip in ms")
+    parser.add_argument("--deadline", type=float, default=INTERACTION_DEADLINE,
+                        help="Responses later than this many seconds count as failed interactions")
+    parser.add_argument("--max-failed", type=int, default=0,
+                        help="Failed interactions tolerated before the run exits non-zero, like a duplicate credit")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory and database")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--role", choices=("seed", "worker", "verify"), help=argparse.SUPPRESS)
+    parser.add_argument("--plan", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, default=0.0, help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.role:
+        return run_child(options)
+
+    if options.drops < 1 or options.clickers < 1 or options.guilds < 1 or options.processes < 1:
+        parser.error("--drops, --clickers, --guilds and --processes must be at least 1")
+    if options.window <= 0:
+        parser.error("--window must be positive")
+
+    return storm(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
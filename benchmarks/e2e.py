@@ -0,0 +1,246 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import urllib.request
+
+from datetime import datetime, timezone
+
+from benchmarks import fake_discord
+from benchmarks.runner import ROOT, git_commit, child_env, start_child, child_result
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Run Settings
+# ---------------------------------------------------------------------------------------------------------------------
+# Server options forwarded unchanged to benchmarks.fake_discord
+SERVER_OPTIONS = ("guilds", "members", "shards", "latency", "jitter", "global_limit", "clicks_per_drop",
+                  "click_delay", "destroy_ratio", "command_rate", "seed")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Bot Process
+# ---------------------------------------------------------------------------------------------------------------------
+# The bot's modules are imported inside these functions: config creates data/ in the working directory, which the
+# parent points at a scratch directory.
+def bot_stats(cog) -> dict:
+    from core.metrics import latency_summaries
+    from core.outbound import outbound
+    from core.audit import audit_log
+    from core.stats_buffer import stats_buffer
+    from core.ratelimit import send_limiter
+
+    cleanup = {"deleted": 0, "skipped": 0, "failed": 0}
+    for partition in cog.partitions.values():
+        for key, value in partition.cleanup_totals.items():
+            cleanup[key] += value
+
+    return {
+        "cleanup": cleanup,
+        "outbound": outbound.stats(),
+        "audit": audit_log.stats(),
+        "stats_buffer": {"flushes": stats_buffer.flushes, "rows_flushed": stats_buffer.rows_flushed},
+        "send_limiter_wait_s": round(send_limiter.global_bucket.waited, 3),
+        "latency": latency_summaries(),
+    }
+
+
+def run_bot(options):
+    """Runs bot.main() unchanged, with config.client's REST and gateway pointed at the fake server."""
+    import config  # Configures logging, which is then turned down for the run
+
+    logging.getLogger().setLevel(options.log_level.upper())
+    import discord.http
+    discord.http.Route.BASE = options.bot + fake_discord.API_PREFIX
+    with urllib.request.urlopen(options.bot + "/_world") as response:
+        world = json.load(response)
+
+    client = config.client
+    loaded = {}
+
+    async def before_identify_hook(shard_id, *, initial=False):
+        pass  # The fake gateway has no identify rate limit
+
+    async def setup_hook():
+        """Runs after the extensions have created the schema and before any shard connects."""
+        from core.storage import storage
+        from core.state import guild_states
+
+        await storage.set_config("drop_chance_denominator", str(options.denominator))
+        await guild_states.ensure(guild["id"] for guild in world["guilds"])
+        for guild in world["guilds"]:
+            await guild_states.update_settings(guild["id"], drop_channel_id=guild["channel_id"],
+                                               drop_expiry_minutes=options.expiry,
+                                               rare_role_id=guild["rare_role_id"])
+
+        loaded["cog"] = client.get_cog("ItemDrop")
+        loaded["cog"].drop_interval = options.interval
+
+    client.before_identify_hook = before_identify_hook
+    client.setup_hook = setup_hook
+
+    import bot
+    asyncio.run(bot.main())
+    print(json.dumps(bot_stats(loaded["cog"])), flush=True)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------------------------------------------------
+def summarise(options, seconds: float, server: dict, bot: dict) -> dict:
+    events, requests = server["events"], server["requests"]
+    interactions = server["interactions"]
+
+    def rate(count):
+        return round(count / seconds, 2) if seconds else None
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": options.backend,
+            "partitions": options.partitions,
+            **{name: getattr(options, name) for name in SERVER_OPTIONS},
+            "buckets": options.bucket or [],
+            "ratelimits": not options.no_ratelimits,
+            "duration": options.duration,
+            "interval": options.interval,
+            "denominator": options.denominator,
+            "expiry_minutes": options.expiry,
+        },
+        "seconds": round(seconds, 1),
+        "throughput": {
+            "drops_per_sec": rate(events.get("drops_posted", 0)),
+            "settled_per_sec": rate(events.get("drops_settled", 0)),
+            "interactions_answered_per_sec": rate(interactions["answered"]),
+            "rest_requests_per_sec": rate(sum(requests.values())),
+            "messages_deleted_per_sec": rate(events.get("messages_deleted", 0)),
+        },
+        "interactions": interactions,
+        "rate_limited": server["rate_limited"],
+        "global_rate_limited": server["global_rate_limited"],
+        "requests": requests,
+        "events": events,
+        "unhandled": server["unhandled"],
+        "disconnected": server["disconnected"],
+        "bot": bot,
+    }
+
+
+def run(options) -> int:
+    scratch = tempfile.mkdtemp(prefix="collector-e2e-")
+    # bot.main() loads every cogs/*.py relative to the working directory
+    os.symlink(os.path.join(ROOT, "cogs"), os.path.join(scratch, "cogs"))
+
+    args = []
+    for name in SERVER_OPTIONS:
+        args += [f"--{name.replace('_', '-')}", getattr(options, name)]
+    for bucket in options.bucket or ():
+        args += ["--bucket", bucket]
+    if options.no_ratelimits:
+        args.append("--no-ratelimits")
+
+    server = start_child("benchmarks.fake_discord", args, scratch, child_env())
+    bot = None
+    try:
+        url = json.loads(server.stdout.readline())["url"]
+        print(f"[e2e] Fake Discord at {url}; {options.guilds} guild(s) on {options.shards} shard(s) for "
+              f"{options.duration}s...", file=sys.stderr, flush=True)
+
+        env = child_env(options.backend, options.partitions)
+        env["DISCORD_TOKEN"] = "fake-token"
+        env.pop("TEST_GUILD_ID", None)
+        bot = start_child("benchmarks.e2e", [
+            "--bot", url, "--interval", options.interval, "--denominator", options.denominator,
+            "--expiry", options.expiry, "--log-level", options.log_level,
+        ], scratch, env)
+
+        started = time.perf_counter()
+        while bot.poll() is None and time.perf_counter() - started < options.duration:
+            time.sleep(0.2)
+        if bot.poll() is None:
+            # Let the last clicks be answered before the bot closes its HTTP session
+            urllib.request.urlopen(urllib.request.Request(url + "/_pause", method="POST")).close()
+            time.sleep(fake_discord.INTERACTION_DEADLINE)
+            bot.send_signal(signal.SIGTERM)
+        seconds = time.perf_counter() - started
+        bot_result = child_result(bot)
+
+        server.send_signal(signal.SIGTERM)
+        server_result = child_result(server)
+    finally:
+        for process in (bot, server):
+            if process is not None and process.poll() is None:
+                process.kill()
+        if options.keep:
+            print(f"[e2e] Kept {scratch}", file=sys.stderr)
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    if bot_result is None or server_result is None:
+        print(f"[e2e] The {'bot' if bot_result is None else 'fake server'} failed.", file=sys.stderr)
+        return 1
+
+    report = summarise(options, seconds, server_result, bot_result)
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+        print(f"[e2e] Wrote {options.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    interactions = report["interactions"]
+    print(f"[e2e] {report['throughput']['drops_per_sec']} drops/s, {report['throughput']['rest_requests_per_sec']} "
+          f"REST requests/s, {sum(report['rate_limited'].values())} 429(s), {interactions['answered']}/"
+          f"{interactions['sent']} interactions answered (p99 "
+          f"{interactions['response_latency'].get('p99_ms')} ms, {interactions['late']} late)", file=sys.stderr)
+    if report["unhandled"]:
+        print(f"[e2e] Requests the fake server does not implement: {report['unhandled']}", file=sys.stderr)
+    return 0
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Main Function
+# ---------------------------------------------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.e2e",
+        description="The whole bot against a local fake Discord, with simulated latency and 429 buckets."
+    )
+    fake_discord.add_options(parser)
+    parser.add_argument("--duration", type=float, default=90, help="Seconds to run the bot for")
+    parser.add_argument("--interval", type=float, default=10, help="Seconds per drop roll (the bot uses 60)")
+    parser.add_argument("--denominator", type=int, default=1, help="1-in-N drop chance per roll")
+    parser.add_argument("--expiry", type=int, default=1, help="Drop expiry in minutes")
+    parser.add_argument("--backend", default=os.getenv("STORAGE_BACKEND", "sqlite"), choices=("sqlite", "memory"))
+    parser.add_argument("--partitions", type=int, default=int(os.getenv("DB_PARTITIONS", 0)), help="DB_PARTITIONS")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory, database and logs")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--bot", metavar="URL", help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.bot:
+        return run_bot(options)
+
+    try:
+        fake_discord.parse_buckets(options.bucket)
+    except ValueError as e:
+        parser.error(str(e))
+    if options.click_delay <= 0 or options.duration <= 0:
+        parser.error("--click-delay and --duration must be positive")
+
+    return run(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,655 @@
+import sys
+import json
+import random
+import signal
+import asyncio
+import logging
+import argparse
+import itertools
+
+from aiohttp import web, WSMsgType
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Server Settings
+# ---------------------------------------------------------------------------------------------------------------------
+# Nothing here imports the bot: the server runs in its own process so its work never lands on the bot's event loop.
+API_PREFIX = "/api/v10"
+HEARTBEAT_INTERVAL = 41_250
+INTERACTION_DEADLINE = 3.0
+GLOBAL_LIMIT = 50
+
+# Route name -> (requests, per seconds), keyed by the route's major parameter as Discord does
+BUCKETS = {
+    "send_message": (5, 5.0),
+    "edit_message": (5, 5.0),
+    "delete_message": (5, 1.0),
+    "bulk_delete": (1, 1.0),
+    "add_role": (10, 10.0),
+    "remove_role": (10, 10.0),
+    "get_user": (30, 1.0),
+    "get_member": (10, 1.0),
+    "followup": (5, 2.0),
+}
+
+# Interaction endpoints are not bound by the global limit
+GLOBAL_EXEMPT = {"interaction_callback", "followup", "edit_original"}
+
+ADMINISTRATOR = str(discord.Permissions(administrator=True).value)
+EPHEMERAL = 64
+
+
+def json_response(data, status: int = 200, headers=None) -> web.Response:
+    """
+    A JSON response with the headers discord.py expects of Discord: the bare content type (anything else is read
+    as text) and Via, without which a 429 is taken for a Cloudflare ban and raised instead of retried.
+    """
+    return web.Response(body=json.dumps(data).encode(), status=status,
+                        headers={**(headers or {}), "Content-Type": "application/json", "Via": "1.1 google"})
+
+
+def parse_buckets(values):
+    """NAME=LIMIT/SECONDS overrides of BUCKETS."""
+    buckets = dict(BUCKETS)
+    for value in values or ():
+        name, _, rule = value.partition("=")
+        limit, _, per = rule.partition("/")
+        if name not in BUCKETS or not limit or not per:
+            raise ValueError(f"Bad bucket {value!r}; expected NAME=LIMIT/SECONDS with NAME one of {', '.join(BUCKETS)}")
+        buckets[name] = (int(limit), float(per))
+    return buckets
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Rate Limits
+# ---------------------------------------------------------------------------------------------------------------------
+class Bucket:
+    """A fixed window of `limit` requests per `per` seconds, reported through Discord's X-RateLimit headers."""
+
+    __slots__ = ("name", "limit", "per", "remaining", "reset_at")
+
+    def __init__(self, name: str, limit: int, per: float):
+        self.name = name
+        self.limit = limit
+        self.per = per
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def take(self, now: float) -> float:
+        """Uses one request and returns 0, or returns the seconds until the window resets."""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        if self.remaining <= 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return 0.0
+
+    def headers(self, now: float) -> dict:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": f"{datetime.now(timezone.utc).timestamp() + self.reset_at - now:.3f}",
+            "X-RateLimit-Reset-After": f"{max(0.0, self.reset_at - now):.3f}",
+            "X-RateLimit-Bucket": self.name,
+        }
+
+
+class RateLimiter:
+    def __init__(self, buckets: dict, global_limit: int, enabled: bool = True):
+        self.rules = buckets
+        self.enabled = enabled
+        self.global_bucket = Bucket("global", global_limit, 1.0)
+        self._buckets = {}
+
+    def check(self, route: str, major, now: float):
+        """(retry_after, is_global, headers) for one request; retry_after is 0 when it may proceed."""
+        if not self.enabled:
+            return 0.0, False, {}
+
+        if route not in GLOBAL_EXEMPT:
+            retry_after = self.global_bucket.take(now)
+            if retry_after:
+                return retry_after, True, {}
+
+        rule = self.rules.get(route)
+        if rule is None:
+            return 0.0, False, {}
+
+        key = (route, major)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = Bucket(route, *rule)
+        return bucket.take(now), False, bucket.headers(now)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# World
+# ---------------------------------------------------------------------------------------------------------------------
+class World:
+    """
+    Guilds, channels, roles and members for one run.
+
+    Each guild has a drops channel, a collector_logs channel for the audit log and a rare role. Guild ids are a
+    millisecond apart, so (id >> 22) % shards deals them evenly over the shards.
+    """
+
+    def __init__(self, guilds: int, members: int, shards: int):
+        self.shards = shards
+        self._ids = itertools.count(1)
+        self._base = datetime.now(timezone.utc) - timedelta(days=365)
+
+        self.application_id = self.snowflake()
+        self.bot_user = self.user(self.application_id, "Collector", bot=True)
+        self.owner = self.user(self.snowflake(), "owner")
+
+        self.guilds = {}
+        self.channels = {}
+        for index in range(guilds):
+            guild_id = discord.utils.time_snowflake(self._base + timedelta(milliseconds=index))
+            guild = {
+                "id": guild_id,
+                "channel_id": self.snowflake(),
+                "log_channel_id": self.snowflake(),
+                "rare_role_id": self.snowflake(),
+                "members": [self.snowflake() for _ in range(members)],
+            }
+            self.guilds[guild_id] = guild
+            self.channels[guild["channel_id"]] = guild_id
+            self.channels[guild["log_channel_id"]] = guild_id
+
+    def snowflake(self) -> int:
+        return discord.utils.time_snowflake(self._base) + next(self._ids)
+
+    def now_snowflake(self) -> int:
+        return discord.utils.time_snowflake(datetime.now(timezone.utc)) + next(self._ids) % (1 << 22)
+
+    def shard_of(self, guild_id: int) -> int:
+        return (guild_id >> 22) % self.shards
+
+    def summary(self):
+        """What the harness needs to configure the bot: ids only."""
+        return {
+            "application_id": self.application_id,
+            "guilds": [{key: guild[key] for key in ("id", "channel_id", "log_channel_id", "rare_role_id")}
+                       for guild in self.guilds.values()],
+        }
+
+    # Payloads
+    @staticmethod
+    def user(user_id: int, name: str = None, bot: bool = False) -> dict:
+        return {"id": str(user_id), "username": name or f"user{user_id % 100_000}", "discriminator": "0",
+                "global_name": None, "avatar": None, "bot": bot}
+
+    def member(self, guild: dict, user_id: int, roles=()) -> dict:
+        user = self.bot_user if user_id == self.application_id else self.user(user_id)
+        return {"user": user, "roles": [str(role) for role in roles], "joined_at": self._base.isoformat(),
+                "deaf": False, "mute": False, "flags": 0, "permissions": ADMINISTRATOR}
+
+    def channel(self, guild: dict, channel_id: int, name: str, position: int) -> dict:
+        return {"id": str(channel_id), "type": 0, "guild_id": str(guild["id"]), "name": name, "position": position,
+                "permission_overwrites": [], "nsfw": False, "parent_id": None, "topic": None,
+                "last_message_id": None, "rate_limit_per_user": 0}
+
+    def guild_create(self, guild: dict) -> dict:
+        guild_id = guild["id"]
+        return {
+            "id": str(guild_id), "name": f"guild{guild_id % 100_000}", "icon": None, "owner_id": self.owner["id"],
+            "member_count": len(guild["members"]) + 1, "large": False, "unavailable": False,
+            "roles": [
+                {"id": str(guild_id), "name": "@everyone", "permissions": ADMINISTRATOR, "position": 0,
+                 "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0},
+                {"id": str(guild["rare_role_id"]), "name": "Rare", "permissions": "0", "position": 1,
+                 "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0},
+            ],
+            "channels": [self.channel(guild, guild["channel_id"], "drops", 0),
+                         self.channel(guild, guild["log_channel_id"], "collector_logs", 1)],
+            "members": [self.member(guild, self.application_id)],
+            "emojis": [], "stickers": [], "features": [], "threads": [], "presences": [], "voice_states": [],
+            "stage_instances": [], "guild_scheduled_events": [], "soundboard_sounds": [],
+            "premium_tier": 0, "system_channel_flags": 0, "verification_level": 0, "explicit_content_filter": 0,
+            "default_message_notifications": 0, "mfa_level": 0, "nsfw_level": 0, "preferred_locale": "en-US",
+            "afk_timeout": 300,
+        }
+
+    def message(self, channel_id: int, data: dict, flags: int = 0) -> dict:
+        return {
+            "id": str(self.now_snowflake()), "channel_id": str(channel_id),
+            "guild_id": str(self.channels[channel_id]) if channel_id in self.channels else None,
+            "author": self.bot_user, "content": data.get("content") or "",
+            "timestamp": datetime.now(timezone.utc).isoformat(), "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+            "embeds": data.get("embeds") or [], "components": data.get("components") or [], "pinned": False,
+            "type": 0, "flags": flags,
+        }
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Fake Discord
+# ---------------------------------------------------------------------------------------------------------------------
+class FakeDiscord:
+    """
+    The REST endpoints and gateway the bot uses, with simulated latency and Discord-style 429 buckets.
+
+    Players click every drop the bot posts: each click is an INTERACTION_CREATE on the guild's shard, and the
+    time until the bot's callback arrives is recorded. Callbacks after the three-second deadline get Discord's
+    Unknown interaction error, as they would for real.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.world = World(options.guilds, options.members, options.shards)
+        self.limiter = RateLimiter(parse_buckets(options.bucket), options.global_limit, not options.no_ratelimits)
+        self.loop = None
+        self.url = None
+        self.paused = False
+
+        self.messages = {}
+        self.shards = {}
+        self.interactions = {}
+
+        self.requests = Counter()
+        self.rate_limited = Counter()
+        self.global_limited = 0
+        self.unhandled = Counter()
+        self.disconnected = Counter()
+        self.events = Counter()
+        self.click_latency = []
+
+        self.app = web.Application(client_max_size=8 * 1024 * 1024)
+        self._routes()
+
+    # Plumbing
+    def _routes(self):
+        routes = (
+            ("GET", "/gateway/bot", "gateway", None, self.get_gateway),
+            ("GET", "/users/@me", "me", None, self.get_me),
+            ("GET", "/oauth2/applications/@me", "application", None, self.get_application),
+            ("POST", "/channels/{channel_id}/messages", "send_message", "channel_id", self.send_message),
+            ("POST", "/channels/{channel_id}/messages/bulk-delete", "bulk_delete", "channel_id", self.bulk_delete),
+            ("PATCH", "/channels/{channel_id}/messages/{message_id}", "edit_message", "channel_id",
+             self.edit_message),
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}", "delete_message", "channel_id",
+             self.delete_message),
+            ("PUT", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}", "add_role", "guild_id", self.no_content),
+            ("DELETE", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}", "remove_role", "guild_id",
+             self.no_content),
+            ("GET", "/guilds/{guild_id}/members/{user_id}", "get_member", "guild_id", self.get_member),
+            ("GET", "/users/{user_id}", "get_user", None, self.get_user),
+            ("POST", "/interactions/{interaction_id}/{token}/callback", "interaction_callback", "interaction_id",
+             self.interaction_callback),
+            ("POST", "/webhooks/{application_id}/{token}", "followup", "token", self.followup),
+            ("PATCH", "/webhooks/{application_id}/{token}/messages/@original", "edit_original", "token",
+             self.edit_original),
+            ("PUT", "/applications/{application_id}/commands", "sync_commands", None, self.empty_list),
+            ("PUT", "/applications/{application_id}/guilds/{guild_id}/commands", "sync_commands", None,
+             self.empty_list),
+        )
+        for method, path, name, major, handler in routes:
+            self.app.router.add_route(method, API_PREFIX + path, self._endpoint(name, major, handler))
+
+        self.app.router.add_get("/gateway", self.gateway)
+        self.app.router.add_get("/_world", self.get_world)
+        self.app.router.add_get("/_stats", self.get_stats)
+        self.app.router.add_post("/_pause", self.pause)
+        self.app.router.add_route("*", "/{path:.*}", self.unknown)
+
+    def _endpoint(self, name: str, major, handler):
+        async def endpoint(request):
+            self.requests[name] += 1
+            if self.options.latency or self.options.jitter:
+                await asyncio.sleep((self.options.latency + self.rng.uniform(0, self.options.jitter)) / 1000)
+
+            retry_after, is_global, headers = self.limiter.check(
+                name, request.match_info.get(major) if major else None, self.loop.time()
+            )
+            if retry_after:
+                self.rate_limited[name] += 1
+                self.global_limited += is_global
+                headers = {**headers, "Retry-After": f"{retry_after:.3f}",
+                           "X-RateLimit-Scope": "global" if is_global else "user"}
+                if is_global:
+                    headers["X-RateLimit-Global"] = "true"
+                return json_response({"message": "You are being rate limited.",
+                                          "retry_after": round(retry_after, 3), "global": is_global},
+                                         status=429, headers=headers)
+
+            # The bot closing its session mid-request is expected at shutdown: count it instead of logging it
+            try:
+                response = await handler(request)
+            except ConnectionResetError:
+                self.disconnected[name] += 1
+                return web.Response(status=499)
+            except asyncio.CancelledError:
+                self.disconnected[name] += 1
+                raise
+            response.headers.update(headers)
+            return response
+
+        return endpoint
+
+    @staticmethod
+    def error(status: int, code: int, message: str):
+        return json_response({"message": message, "code": code}, status=status)
+
+    async def unknown(self, request):
+        self.unhandled[f"{request.method} {request.path}"] += 1
+        return self.error(404, 0, "404: Not Found")
+
+    # Session
+    async def get_gateway(self, request):
+        return json_response({
+            "url": self.url.replace("http", "ws", 1) + "/gateway", "shards": self.options.shards,
+            "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1},
+        })
+
+    async def get_me(self, request):
+        return json_response(self.world.bot_user)
+
+    async def get_application(self, request):
+        return json_response({
+            "id": str(self.world.application_id), "name": "Collector", "description": "", "icon": None,
+            "bot_public": True, "bot_require_code_grant": False, "owner": self.world.owner, "verify_key": "",
+            "flags": 0, "team": None,
+        })
+
+    async def get_world(self, request):
+        return json_response(self.world.summary())
+
+    async def pause(self, request):
+        """Stops the players, so the bot can be shut down without interactions in flight."""
+        self.paused = True
+        return web.Response(status=204)
+
+    # Messages
+    async def send_message(self, request):
+        channel_id = int(request.match_info["channel_id"])
+        if channel_id not in self.world.channels:
+            return self.error(404, 10003, "Unknown Channel")
+
+        message = self.world.message(channel_id, await request.json())
+        self.messages[int(message["id"])] = message
+        self.events["messages_sent"] += 1
+        if message["components"]:
+            self.events["drops_posted"] += 1
+            self.schedule_clicks(message)
+        return json_response(message)
+
+    async def edit_message(self, request):
+        message = self.messages.get(int(request.match_info["message_id"]))
+        if message is None:
+            return self.error(404, 10008, "Unknown Message")
+        message.update({key: value for key, value in (await request.json()).items()
+                        if key in ("content", "embeds", "components")})
+        message["edited_timestamp"] = datetime.now(timezone.utc).isoformat()
+        return json_response(message)
+
+    async def delete_message(self, request):
+        if self.messages.pop(int(request.match_info["message_id"]), None) is None:
+            return self.error(404, 10008, "Unknown Message")
+        self.events["messages_deleted"] += 1
+        return web.Response(status=204)
+
+    async def bulk_delete(self, request):
+        message_ids = (await request.json()).get("messages", [])
+        if not 2 <= len(message_ids) <= 100:
+            return self.error(400, 50016, "You must provide at least 2 and fewer than 100 messages to delete.")
+        for message_id in message_ids:
+            self.events["messages_deleted"] += self.messages.pop(int(message_id), None) is not None
+        return web.Response(status=204)
+
+    # Guilds and users
+    async def no_content(self, request):
+        self.events[request.method.lower() + "_role"] += 1
+        return web.Response(status=204)
+
+    async def get_member(self, request):
+        guild = self.world.guilds.get(int(request.match_info["guild_id"]))
+        user_id = int(request.match_info["user_id"])
+        if guild is None or user_id not in guild["members"]:
+            return self.error(404, 10007, "Unknown Member")
+        return json_response(self.world.member(guild, user_id))
+
+    async def get_user(self, request):
+        return json_response(self.world.user(int(request.match_info["user_id"])))
+
+    async def empty_list(self, request):
+        return json_response([])
+
+    # Interactions
+    async def interaction_callback(self, request):
+        interaction_id = int(request.match_info["interaction_id"])
+        pending = self.interactions.get(interaction_id)
+        if pending is None:
+            return self.error(404, 10062, "Unknown interaction")
+
+        elapsed = self.loop.time() - pending["sent_at"]
+        if pending["answered"]:
+            return self.error(400, 40060, "Interaction has already been acknowledged.")
+        if elapsed > INTERACTION_DEADLINE:
+            self.events["interactions_late"] += 1
+            return self.error(404, 10062, "Unknown interaction")
+
+        pending["answered"] = True
+        self.click_latency.append(elapsed)
+        payload = await request.json()
+        kind, data = payload["type"], payload.get("data") or {}
+
+        if kind == 7 and pending["message_id"] in self.messages:
+            message = self.messages[pending["message_id"]]
+            message.update({key: value for key, value in data.items() if key in ("content", "embeds", "components")})
+            self.events["drops_settled"] += 1
+        else:
+            message = self.world.message(pending["channel_id"], data, data.get("flags", 0) & EPHEMERAL)
+            self.events["interaction_messages"] += 1
+
+        return json_response({
+            "interaction": {"id": str(interaction_id), "type": pending["type"],
+                            "response_message_id": message["id"], "response_message_loading": False,
+                            "response_message_ephemeral": bool(message["flags"] & EPHEMERAL)},
+            "resource": {"type": kind, "message": message},
+        })
+
+    async def followup(self, request):
+        return json_response(self.world.message(0, await request.json()))
+
+    async def edit_original(self, request):
+        return json_response(self.world.message(0, await request.json()))
+
+    # Gateway
+    async def gateway(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        sequence = itertools.count(1)
+        shard_id = None
+
+        async def dispatch(event: str, data):
+            await ws.send_str(json.dumps({"op": 0, "t": event, "s": next(sequence), "d": data}))
+
+        await ws.send_str(json.dumps({"op": 10, "d": {"heartbeat_interval": HEARTBEAT_INTERVAL}}))
+        try:
+            async for frame in ws:
+                if frame.type != WSMsgType.TEXT:
+                    continue
+                message = json.loads(frame.data)
+                op = message.get("op")
+
+                if op == 1:
+                    await ws.send_str(json.dumps({"op": 11}))
+                elif op == 2:
+                    shard_id = (message["d"].get("shard") or [0, 1])[0]
+                    guilds = [guild for guild in self.world.guilds.values()
+                              if self.world.shard_of(guild["id"]) == shard_id]
+                    self.shards[shard_id] = dispatch
+                    await dispatch("READY", {
+                        "v": 10, "user": self.world.bot_user, "session_id": f"session-{shard_id}",
+                        "resume_gateway_url": self.url.replace("http", "ws", 1) + "/gateway",
+                        "guilds": [{"id": str(guild["id"]), "unavailable": True} for guild in guilds],
+                        "shard": [shard_id, self.options.shards],
+                        "application": {"id": str(self.world.application_id), "flags": 0},
+                    })
+                    for guild in guilds:
+                        await dispatch("GUILD_CREATE", self.world.guild_create(guild))
+                elif op == 6:
+                    # Resumes are not emulated; the client identifies again
+                    await ws.send_str(json.dumps({"op": 9, "d": False}))
+        finally:
+            if shard_id is not None and self.shards.get(shard_id) is dispatch:
+                del self.shards[shard_id]
+        return ws
+
+    # Players
+    def schedule_clicks(self, message: dict):
+        custom_id = message["components"][0]["components"][0].get("custom_id", "")
+        if not custom_id.startswith("collector:"):
+            return
+
+        for _ in range(self.options.clicks_per_drop):
+            delay = self.rng.expovariate(1 / self.options.click_delay)
+            action = "destroy" if self.rng.random() < self.options.destroy_ratio else "claim"
+            self.loop.call_later(delay, self.click, int(message["id"]), custom_id.replace("claim", action, 1))
+
+    def click(self, message_id: int, custom_id: str):
+        message = self.messages.get(message_id)
+        if message is None:
+            return
+        guild = self.world.guilds[int(message["guild_id"])]
+        self.send_interaction(guild, guild["channel_id"], 3, {"custom_id": custom_id, "component_type": 2},
+                              message)
+
+    async def run_commands(self):
+        """Players using /leaderboard at --command-rate per second, spread over random guilds."""
+        guilds = list(self.world.guilds.values())
+        while True:
+            await asyncio.sleep(self.rng.expovariate(self.options.command_rate))
+            guild = self.rng.choice(guilds)
+            self.send_interaction(guild, guild["channel_id"], 2,
+                                  {"id": str(self.world.application_id + 1), "name": "leaderboard", "type": 1})
+
+    def send_interaction(self, guild: dict, channel_id: int, kind: int, data: dict, message: dict = None):
+        dispatch = self.shards.get(self.world.shard_of(guild["id"]))
+        if dispatch is None or self.paused or not guild["members"]:
+            return
+
+        interaction_id = self.world.now_snowflake()
+        user_id = self.rng.choice(guild["members"])
+        payload = {
+            "id": str(interaction_id), "application_id": str(self.world.application_id), "type": kind,
+            "token": f"token-{interaction_id}", "version": 1, "guild_id": str(guild["id"]),
+            "channel": self.world.channel(guild, channel_id, "drops", 0), "channel_id": str(channel_id),
+            "member": self.world.member(guild, user_id), "data": data, "app_permissions": ADMINISTRATOR,
+            "locale": "en-US", "guild_locale": "en-US", "entitlements": [], "attachment_size_limit": 8_388_608,
+            "authorizing_integration_owners": {"0": str(guild["id"])}, "context": 0,
+        }
+        if message is not None:
+            payload["message"] = message
+
+        self.interactions[interaction_id] = {"sent_at": self.loop.time(), "answered": False, "type": kind,
+                                             "channel_id": channel_id,
+                                             "message_id": int(message["id"]) if message else None}
+        self.events["clicks" if kind == 3 else "commands"] += 1
+        self.loop.create_task(dispatch("INTERACTION_CREATE", payload))
+
+    # Report
+    def stats(self) -> dict:
+        latencies = sorted(self.click_latency)
+
+        def at(q):
+            return round(latencies[min(len(latencies) - 1, round(q / 100 * (len(latencies) - 1)))] * 1000, 3)
+
+        sent = len(self.interactions)
+        answered = sum(1 for pending in self.interactions.values() if pending["answered"])
+        return {
+            "requests": dict(self.requests),
+            "rate_limited": dict(self.rate_limited),
+            "global_rate_limited": self.global_limited,
+            "unhandled": dict(self.unhandled),
+            "disconnected": dict(self.disconnected),
+            "events": dict(self.events),
+            "interactions": {
+                "sent": sent,
+                "answered": answered,
+                "unanswered": sent - answered - self.events["interactions_late"],
+                "late": self.events["interactions_late"],
+                "response_latency": {"count": len(latencies), "p50_ms": at(50), "p90_ms": at(90),
+                                     "p99_ms": at(99), "max_ms": at(100)} if latencies else {"count": 0},
+            },
+            "open_messages": len(self.messages),
+        }
+
+    async def get_stats(self, request):
+        return json_response(self.stats())
+
+    async def serve(self, host: str, port: int):
+        self.loop = asyncio.get_running_loop()
+        runner = web.AppRunner(self.app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        print(json.dumps({"url": self.url}), flush=True)
+
+        stopped = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.loop.add_signal_handler(sig, stopped.set)
+
+        commands = self.loop.create_task(self.run_commands()) if self.options.command_rate > 0 else None
+        try:
+            await stopped.wait()
+        finally:
+            if commands:
+                commands.cancel()
+            await runner.cleanup()
+        print(json.dumps(self.stats()), flush=True)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Main Function
+# ---------------------------------------------------------------------------------------------------------------------
+def add_options(parser: argparse.ArgumentParser):
+    """The server's options, shared with benchmarks.e2e which forwards them."""
+    parser.add_argument("--guilds", type=int, default=200)
+    parser.add_argument("--members", type=int, default=20, help="Clicking members per guild")
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=50.0, help="REST round trip in ms")
+    parser.add_argument("--jitter", type=float, default=20.0, help="Extra uniform random latency in ms")
+    parser.add_argument("--global-limit", type=int, default=GLOBAL_LIMIT, help="Requests per second across routes")
+    parser.add_argument("--bucket", action="append", metavar="NAME=LIMIT/SECONDS",
+                        help=f"Override a route bucket; routes: {', '.join(BUCKETS)}")
+    parser.add_argument("--no-ratelimits", action="store_true", help="Never answer 429")
+    parser.add_argument("--clicks-per-drop", type=int, default=3)
+    parser.add_argument("--click-delay", type=float, default=1.5, help="Mean seconds from a drop to each click")
+    parser.add_argument("--destroy-ratio", type=float, default=0.2)
+    parser.add_argument("--command-rate", type=float, default=0.5, help="/leaderboard uses per second")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.fake_discord",
+        description="A local stand-in for Discord's REST API and gateway. Prints its URL, then its stats on exit."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    add_options(parser)
+    options = parser.parse_args(argv)
+
+    try:
+        parse_buckets(options.bucket)
+    except ValueError as e:
+        parser.error(str(e))
+    if options.click_delay <= 0:
+        parser.error("--click-delay must be positive")
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(FakeDiscord(options).serve(options.host, options.port))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+import time
+import asyncio
+import discord
+import itertools
+
+from datetime import datetime, timezone
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Snowflakes
+# ---------------------------------------------------------------------------------------------------------------------
+_sequence = itertools.count()
+
+
+def snowflake(at: datetime = None) -> int:
+    """A unique Discord-style id whose embedded timestamp is `at` (default now), as the real ones are."""
+    at = at or datetime.now(timezone.utc)
+    return discord.utils.time_snowflake(at) + next(_sequence) % (1 << 22)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Users and Members
+# ---------------------------------------------------------------------------------------------------------------------
+class FakeAsset:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class FakeUser:
+    """Just enough of discord.User for rendering names and mentions; slotted, as a large run holds millions."""
+
+    __slots__ = ("id", "name", "bot")
+
+    def __init__(self, user_id: int, name: str = None, bot: bool = False):
+        self.id = user_id
+        self.name = name or f"user{user_id % 100_000}"
+        self.bot = bot
+
+    @property
+    def display_name(self):
+        return self.name
+
+    @property
+    def global_name(self):
+        return self.name
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    @property
+    def display_avatar(self):
+        return FakeAsset(f"https://cdn.example/avatars/{self.id}.png")
+
+    def __str__(self):
+        return self.name
+
+
+class FakePermissions:
+    def __init__(self, administrator: bool = False):
+        self.administrator = administrator
+        self.send_messages = True
+        self.manage_messages = True
+        self.manage_roles = True
+
+
+class FakeMember(FakeUser):
+    __slots__ = ("guild", "roles")
+
+    def __init__(self, guild, user_id: int, name: str = None, bot: bool = False):
+        super().__init__(user_id, name, bot)
+        self.guild = guild
+        self.roles = []
+
+    @property
+    def guild_permissions(self):
+        return FakePermissions()
+
+    def get_role(self, role_id: int):
+        return next((role for role in self.roles if role.id == role_id), None)
+
+    async def add_roles(self, *roles, reason=None):
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        self.roles = [role for role in self.roles if role not in roles]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Messages and Channels
+# ---------------------------------------------------------------------------------------------------------------------
+class FakeMessage:
+    def __init__(self, channel, message_id: int = None, embeds=None, view=None, content=None):
+        self.id = message_id or snowflake()
+        self.channel = channel
+        self.guild = channel.guild
+        self.embeds = list(embeds or ())
+        self.view = view
+        self.content = content
+
+    async def delete(self):
+        await self.channel._request("delete")
+        self.channel.deleted += 1
+
+
+class FakePartialMessage:
+    def __init__(self, channel, message_id: int):
+        self.id = message_id
+        self.channel = channel
+
+    async def delete(self):
+        await self.channel._request("delete")
+        self.channel.deleted += 1
+
+
+class FakeTextChannel:
+    """A text channel that accepts every send and delete, after an optional simulated REST round trip."""
+
+    def __init__(self, guild, channel_id: int = None, name: str = "general", latency: float = 0.0):
+        self.id = channel_id or snowflake()
+        self.guild = guild
+        self.name = name
+        self.latency = latency
+        self.mention = f"<#{self.id}>"
+
+        self.sent = 0
+        self.deleted = 0
+
+    async def _request(self, route: str):
+        """One REST round trip; `route` names the endpoint for subclasses that count calls."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def permissions_for(self, member):
+        return FakePermissions()
+
+    async def send(self, content=None, *, embed=None, embeds=None, view=None, **kwargs):
+        await self._request("send")
+        self.sent += 1
+        return FakeMessage(self, embeds=[embed] if embed else embeds, view=view, content=content)
+
+    async def delete_messages(self, messages, *, reason=None):
+        await self._request("bulk_delete")
+        self.deleted += len(messages)
+
+    def get_partial_message(self, message_id: int):
+        return FakePartialMessage(self, message_id)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Guilds
+# ---------------------------------------------------------------------------------------------------------------------
+class FakeRole:
+    def __init__(self, guild, role_id: int = None, name: str = "role"):
+        self.id = role_id or snowflake()
+        self.guild = guild
+        self.name = name
+        self.members = []
+
+
+class FakeGuild:
+    channel_class = FakeTextChannel
+
+    def __init__(self, bot, guild_id: int = None, members: int = 5, shard_id: int = 0, latency: float = 0.0,
+                 channel_id: int = None):
+        self.id = guild_id or snowflake()
+        self.name = f"guild{self.id % 100_000}"
+        self.shard_id = shard_id
+        self.owner_id = None
+
+        self.me = FakeMember(self, bot.user.id, bot.user.name, bot=True)
+        self._members = {self.me.id: self.me}
+        for _ in range(members):
+            member = FakeMember(self, snowflake())
+            self._members[member.id] = member
+
+        self.text_channels = [self.channel_class(self, channel_id, latency=latency)]
+        self._channels = {channel.id: channel for channel in self.text_channels}
+        self._roles = {}
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    @property
+    def member_count(self):
+        return len(self._members)
+
+    @property
+    def channels(self):
+        return list(self._channels.values())
+
+    def get_member(self, user_id: int):
+        return self._members.get(user_id)
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+    def get_role(self, role_id: int):
+        return self._roles.get(role_id)
+
+    def humans(self):
+        return [member for member in self._members.values() if not member.bot]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Interactions
+# ---------------------------------------------------------------------------------------------------------------------
+class FakeResponse:
+    """Records how an interaction was answered, and fails a second answer the way discord.py does."""
+
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+        self.kind = None
+        self.content = None
+        self.answered_at = None
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _answer(self, kind: str, content: str = None):
+        if self._done:
+            raise discord.InteractionResponded(self._interaction)
+        self._done = True
+        self.kind = kind
+        self.content = content
+        await self._interaction.channel._request("interaction")
+        self.answered_at = time.perf_counter()
+
+    async def send_message(self, content=None, **kwargs):
+        await self._answer("message", content)
+
+    async def edit_message(self, **kwargs):
+        await self._answer("edit")
+
+    async def defer(self, **kwargs):
+        await self._answer("defer")
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        await self._interaction.channel._request("followup")
+        self.sent += 1
+
+
+class FakeInteraction:
+    def __init__(self, bot, user, guild=None, channel=None, message=None):
+        self.id = snowflake()
+        self.client = bot
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id if guild else None
+        self.channel = channel or (message.channel if message else guild.text_channels[0])
+        self.message = message
+        self.created_at = discord.utils.snowflake_time(self.id)
+        self.created = time.perf_counter()
+        self.command = None
+        self.data = {}
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Bot
+# ---------------------------------------------------------------------------------------------------------------------
+class FakeBot:
+    """
+    A stand-in for the AutoShardedBot with an in-memory guild cache and no gateway.
+
+    Every user id resolves through get_user, so leaderboards never fall through to a REST fetch.
+    """
+
+    def __init__(self, shard_count: int = 1):
+        self.user = FakeUser(snowflake(), "Collector", bot=True)
+        self.owner_id = None
+        self.shard_count = shard_count
+        self.shards = None
+        self.latency = 0.0
+        self.cogs = {}
+
+        self._guilds = {}
+        self._channels = {}
+        self._users = {}
+
+    @classmethod
+    def populated(cls, guilds: int, members: int = 5, latency: float = 0.0, shard_count: int = 1):
+        bot = cls(shard_count)
+        for _ in range(guilds):
+            bot.add_guild(FakeGuild(bot, members=members, latency=latency))
+        return bot
+
+    def add_guild(self, guild: FakeGuild):
+        guild.shard_id = (guild.id >> 22) % self.shard_count if self.shard_count > 1 else 0
+        self._guilds[guild.id] = guild
+        for channel in guild.channels:
+            self._channels[channel.id] = channel
+        return guild
+
+    @property
+    def guilds(self):
+        return list(self._guilds.values())
+
+    def is_ready(self) -> bool:
+        return True
+
+    def get_guild(self, guild_id: int):
+        return self._guilds.get(guild_id)
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+    def get_user(self, user_id: int):
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = FakeUser(user_id)
+        return user
+
+    async def fetch_user(self, user_id: int):
+        return self.get_user(user_id)
+
+    async def add_cog(self, cog):
+        """Registers a cog and runs its cog_load, as commands.Bot does."""
+        await cog.cog_load()
+        self.cogs[cog.qualified_name] = cog
+
+    async def close(self):
+        for cog in list(self.cogs.values()):
+            await cog.cog_unload()
+        self.cogs.clear()
+
+    def add_dynamic_items(self, *items):
+        pass
+
+    def remove_dynamic_items(self, *items):
+        pass
@@ -0,0 +1,111 @@
+import sys
+import math
+import time
+import resource
+import functools
+
+import cogs.customisation
+import cogs.game_collector
+
+from core.database import db, partitions
+from core.ratelimit import send_limiter, TokenBucket
+from core.state import guild_states
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Samples
+# ---------------------------------------------------------------------------------------------------------------------
+class Samples:
+    """Every latency observed for one series, kept in full so percentiles cover the whole run."""
+
+    def __init__(self):
+        self._values = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def observe(self, seconds: float):
+        self._values.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self._values:
+            return 0.0
+        ordered = sorted(self._values)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "count": len(self._values),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(max(self._values, default=0.0) * 1000, 3),
+        }
+
+
+def instrument(obj, name: str, samples: Samples):
+    """Replaces the coroutine method obj.name with one that records each call's duration in samples."""
+    original = getattr(obj, name)
+
+    @functools.wraps(original)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            samples.observe(time.perf_counter() - started)
+
+    setattr(obj, name, wrapper)
+    return original
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Process Measurements
+# ---------------------------------------------------------------------------------------------------------------------
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def result(case: str, scale: dict, ops: int, seconds: float, primary: Samples, series: dict, **extra) -> dict:
+    """One machine-readable result row: throughput, the primary series' percentiles and every series in full."""
+    summary = primary.summary()
+    return {
+        "case": case,
+        **scale,
+        "ops": ops,
+        "seconds": round(seconds, 3),
+        "ops_per_sec": round(ops / seconds, 1) if seconds > 0 else None,
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+        "peak_rss_mb": peak_rss_mb(),
+        "series": {name: samples.summary() for name, samples in series.items()},
+        **extra,
+    }
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Bot Setup
+# ---------------------------------------------------------------------------------------------------------------------
+def unthrottle():
+    """Lifts the proactive send limits so a run measures the bot's own work rather than the 40/s budget."""
+    send_limiter.global_bucket = TokenBucket(math.inf, math.inf)
+    send_limiter.channel_rate = math.inf
+    send_limiter.channel_burst = math.inf
+
+
+async def load_bot(bot):
+    """Creates the schema through the cogs' own setup functions and registers default settings for every guild."""
+    await cogs.customisation.setup(bot)
+    await cogs.game_collector.setup(bot)
+
+    cog = bot.cogs["ItemDrop"]
+    await cog.initialise()
+    await guild_states.ensure(guild.id for guild in bot.guilds)
+    return cog
+
+
+async def close_databases():
+    await partitions.close()
+    await db.close()
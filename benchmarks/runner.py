@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import subprocess
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Child Processes
+# ---------------------------------------------------------------------------------------------------------------------
+# Nothing here imports config: it creates data/ in the working directory, so only children (run in a scratch
+# directory) may import the bot's modules.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def child_env(backend: str = "sqlite", partitions: int = 0):
+    """The environment for a child: the repo importable, the chosen storage, and no cluster or shard settings."""
+    env = dict(os.environ, STORAGE_BACKEND=backend, DB_PARTITIONS=str(partitions))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    for name in ("CLUSTER_ID", "CLUSTER_SOCKET", "SHARD_COUNT", "SHARD_IDS"):
+        env.pop(name, None)
+    return env
+
+
+def start_child(module: str, args, cwd: str, env) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", module, *map(str, args)], cwd=cwd, env=env,
+                            stdout=subprocess.PIPE, text=True)
+
+
+def child_result(process: subprocess.Popen):
+    """Waits for a child and returns the JSON object on its last line of output, or None if it failed."""
+    output, _ = process.communicate()
+    lines = output.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        return None
+    return json.loads(lines[-1])
@@ -0,0 +1,681 @@
+import sys
+import json
+import time
+import heapq
+import random
+import shutil
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import functools
+import itertools
+import discord
+
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+from benchmarks.fakes import FakeBot, FakeGuild, FakeTextChannel, FakeMessage, FakeInteraction, snowflake
+from benchmarks.runner import git_commit, child_env, start_child, child_result
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Simulation Settings
+# ---------------------------------------------------------------------------------------------------------------------
+DEFAULT_GUILDS = "1000"
+DEFAULT_DENOMINATOR = "120"
+DEFAULT_EXPIRY = "30"
+
+# Late clicks on a drop someone already took arrive this many seconds after the first, on average
+LATE_CLICK_SPREAD = 2.0
+
+# Storage calls that write, with how many rows each call carries
+WRITES = {
+    "record_drops": len,
+    "settle_drop": lambda *args: 1,
+    "delete_drops": len,
+    "record_stats": len,
+    "save_settings": lambda *args: 1,
+}
+
+
+def parse_list(value: str):
+    return [int(part.replace("_", "")) for part in value.split(",") if part.strip()]
+
+
+def plan_clicks(rng: random.Random, options, expiry: float):
+    """(delay, action) for each click one drop in an active guild gets: maybe a first click, then late claims."""
+    delay = rng.expovariate(1 / (options.claim_delay * 60))
+    if delay >= expiry:
+        return []
+
+    clicks = [(delay, "destroy" if rng.random() < options.destroy_ratio else "claim")]
+    late = int(rng.expovariate(1 / options.extra_clicks)) if options.extra_clicks else 0
+    for _ in range(late):
+        at = delay + rng.expovariate(1 / LATE_CLICK_SPREAD)
+        if at < expiry:
+            clicks.append((at, "claim"))
+    return clicks
+
+
+def count_writes(sim, storage):
+    """Wraps the storage singleton's write methods to count one transaction, and its rows, per call."""
+    for name, rows_of in WRITES.items():
+        original = getattr(storage, name)
+
+        @functools.wraps(original)
+        async def wrapper(*args, _name=name, _rows_of=rows_of, _original=original, **kwargs):
+            sim.db.add(_name)
+            sim.db_rows.add(_name, _rows_of(*args[:1]))
+            return await _original(*args, **kwargs)
+
+        setattr(storage, name, wrapper)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Virtual Clock
+# ---------------------------------------------------------------------------------------------------------------------
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop whose clock only moves when nothing is ready to run, and then jumps straight to the next timer.
+
+    Every sleep, wait_for timeout and send-limiter wait costs no real time, so weeks of drop ticks and expiry
+    passes run as fast as the handlers themselves. Nothing may wait on threads or sockets: the memory backend only.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._now = 0.0
+
+    def time(self) -> float:
+        return self._now
+
+    def _run_once(self):
+        if not self._ready:
+            while self._scheduled and self._scheduled[0]._cancelled:
+                handle = heapq.heappop(self._scheduled)
+                handle._scheduled = False
+                self._timer_cancelled_count -= 1
+            if self._scheduled:
+                self._now = max(self._now, self._scheduled[0]._when)
+        super()._run_once()
+
+
+class Meter:
+    """Counts per virtual minute."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.minutes = defaultdict(Counter)
+
+    def add(self, key: str, amount: int = 1):
+        self.minutes[int(self.clock() // 60)][key] += amount
+
+    def totals(self) -> Counter:
+        total = Counter()
+        for counts in self.minutes.values():
+            total.update(counts)
+        return total
+
+    def series(self, minutes: int, bucket: int = 1, key: str = None):
+        """Sums per `bucket` minutes over the run, for one key or all of them."""
+        values = [0] * -(-minutes // bucket)
+        for minute, counts in self.minutes.items():
+            if minute < minutes:
+                values[minute // bucket] += counts[key] if key else sum(counts.values())
+        return values
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Simulated Guilds
+# ---------------------------------------------------------------------------------------------------------------------
+class SimChannel(FakeTextChannel):
+    """Counts every REST call against the virtual minute it was made in, and hands each drop to the simulation."""
+
+    async def _request(self, route: str):
+        self.guild.sim.rest.add(route)
+        await super()._request(route)
+
+    async def send(self, content=None, *, embed=None, embeds=None, view=None, **kwargs):
+        await self._request("send")
+        self.sent += 1
+
+        sim = self.guild.sim
+        message = FakeMessage(self, snowflake(sim.now()), embeds=[embed] if embed else embeds, view=view,
+                              content=content)
+        sim.on_drop(message)
+        return message
+
+
+class SimGuild(FakeGuild):
+    channel_class = SimChannel
+
+    def __init__(self, sim, bot, members: int, latency: float):
+        self.sim = sim
+        super().__init__(bot, members=members, latency=latency)
+
+
+class Simulation:
+    """
+    Players for one run: some guilds are active, and in those each drop gets a first click after an exponential
+    delay (if it comes before the drop expires) plus a few late clicks that should be refused.
+    """
+
+    def __init__(self, options, loop: VirtualClockLoop, guilds: int, expiry_minutes: int):
+        self.options = options
+        self.loop = loop
+        self.rng = random.Random(options.seed)
+        self.expiry = expiry_minutes * 60
+        self.started = time.time()
+
+        self.rest = Meter(loop.time)
+        self.db = Meter(loop.time)
+        self.db_rows = Meter(loop.time)
+        self.drops = Meter(loop.time)
+        self.outcomes = Counter()
+        self.active_drops = []
+        self._clicks = set()
+
+        self.bot = FakeBot()
+        for _ in range(guilds):
+            self.bot.add_guild(SimGuild(self, self.bot, options.members, options.rest_latency / 1000))
+        self.active = {guild.id for guild in self.bot.guilds if self.rng.random() < options.active_share}
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.wall_time(), timezone.utc)
+
+    def wall_time(self) -> float:
+        return self.started + self.loop.time()
+
+    def on_drop(self, message):
+        self.drops.add("drops")
+        if message.guild.id not in self.active:
+            return
+
+        for delay, action in plan_clicks(self.rng, self.options, self.expiry):
+            self.loop.call_later(delay, self.click, message, action)
+
+    def click(self, message, action: str):
+        task = self.loop.create_task(self._click(message, action))
+        self._clicks.add(task)
+        task.add_done_callback(self._clicks.discard)
+
+    async def _click(self, message, action: str):
+        from cogs.game_collector import DropButton
+
+        interaction = FakeInteraction(self.bot, self.rng.choice(message.guild.humans()), message.guild,
+                                      message=message)
+        await DropButton(action, message.view.children[0].rarity).callback(interaction)
+
+        kind = interaction.response.kind
+        if kind == "edit":
+            self.outcomes["claimed" if action == "claim" else "destroyed"] += 1
+        else:
+            self.outcomes["refused" if kind == "message" else "unanswered"] += 1
+
+    async def cancel_clicks(self):
+        for task in list(self._clicks):
+            task.cancel()
+        await asyncio.gather(*self._clicks, return_exceptions=True)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Fast Path
+# ---------------------------------------------------------------------------------------------------------------------
+class FastSimulation:
+    """
+    The same players, drop scheduler and storage backend as Simulation, without the cog or any fake REST objects.
+
+    Drops, clicks, stats flushes and expiry passes are taken from one timeline in order and written to storage in
+    the batches the cog makes: one record_drops per tick, one settle_drop per winning click, one record_stats per
+    flush interval and one delete_drops per expiry pass. REST calls are counted by route instead of being sent.
+    The full run is still the one to use for changes to the handlers.
+
+    1000 guilds over 14 days take about 8 s this way against about 85 s for the full run. Both grow faster than
+    linearly with guilds, as the memory backend scans every open drop on each expiry pass: 5000 guilds over 28 days
+    take about a minute.
+    """
+
+    def __init__(self, options, guilds: int, expiry_minutes: int):
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.expiry = expiry_minutes * 60
+        self.started = int(time.time())
+        self.clock = 0.0
+
+        self.rest = Meter(self.time)
+        self.db = Meter(self.time)
+        self.db_rows = Meter(self.time)
+        self.drops = Meter(self.time)
+        self.outcomes = Counter()
+        self.active_drops = []
+        self.expired = 0
+
+        # Guild id -> (drop channel id, member ids); fake guilds have a single text channel
+        self.guilds = {snowflake(): (snowflake(), [snowflake() for _ in range(options.members)])
+                       for _ in range(guilds)}
+        self.active = {guild_id for guild_id in self.guilds if self.rng.random() < options.active_share}
+
+        self._events = []
+        self._sequence = itertools.count()
+        self._settled = set()
+        self._pending_stats = {}
+        self._flush_at = None
+
+    def time(self) -> float:
+        return self.clock
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.wall_time(), timezone.utc)
+
+    def wall_time(self) -> float:
+        return self.started + self.clock
+
+    def _push(self, at: float, *event):
+        heapq.heappush(self._events, (at, next(self._sequence), *event))
+
+    async def post(self, storage, expiries, due):
+        """One drop per due guild, recorded the way drop_items records a tick."""
+        now = self.now()
+        dropped_at = now.replace(tzinfo=None).isoformat()
+        expires_at = int(self.wall_time()) + self.expiry
+        rows = []
+        for guild_id in due:
+            channel_id, _ = self.guilds[guild_id]
+            row = (snowflake(now), guild_id, channel_id, dropped_at, expires_at)
+            rare = self.rng.randint(1, 50) == 1
+            rows.append(row)
+            self.rest.add("send")
+            self.drops.add("drops")
+
+            if guild_id in self.active:
+                for delay, action in plan_clicks(self.rng, self.options, self.expiry):
+                    self._push(self.clock + delay, "click", row, action, rare)
+
+        for group in storage.groups(rows, guild_of=lambda row: row[1]):
+            await storage.record_drops(group)
+        if rows:
+            expiries.push(min(row[4] for row in rows))
+
+    async def click(self, storage, row, action: str, rare: bool):
+        """A click answered as resolve_drop answers it; only the first click on a drop reaches storage."""
+        from core.stats_buffer import FLUSH_INTERVAL
+
+        self.rest.add("interaction")
+        message_id, guild_id, channel_id, drop_time, expires_at = row
+        if message_id in self._settled:
+            self.outcomes["refused"] += 1
+            return
+
+        self._settled.add(message_id)
+        status = "claimed" if action == "claim" else "destroyed"
+        user_id = self.rng.choice(self.guilds[guild_id][1])
+        if not await storage.settle_drop(message_id, guild_id, channel_id, drop_time, expires_at, status, user_id):
+            self.outcomes["refused"] += 1
+            return
+
+        self.outcomes[status] += 1
+        deltas = self._pending_stats.setdefault((guild_id, user_id), [0, 0, 0])
+        if action == "claim":
+            deltas[0] += 1
+            deltas[2] += rare
+        else:
+            deltas[1] += 1
+
+        if self._flush_at is None:
+            self._flush_at = (self.clock // FLUSH_INTERVAL + 1) * FLUSH_INTERVAL
+            self._push(self._flush_at, "flush")
+
+    async def flush(self, storage):
+        rows = [(guild_id, user_id, *deltas) for (guild_id, user_id), deltas in self._pending_stats.items()]
+        self._pending_stats = {}
+        self._flush_at = None
+        for group in storage.groups(rows):
+            await storage.record_stats(group)
+
+    async def cleanup(self, storage, expiries):
+        """One expiry pass: the REST calls _purge_channel would make, then the same delete_drops batches."""
+        from cogs.game_collector import BULK_DELETE_MAX_AGE
+
+        now = int(self.wall_time())
+        if not expiries.pop_due(now):
+            return
+
+        expired = await storage.due_drops(now, [0], 1)
+        by_channel = defaultdict(list)
+        for message_id, _, channel_id in expired:
+            by_channel[channel_id].append(message_id)
+
+        cutoff = self.now() - BULK_DELETE_MAX_AGE
+        for message_ids in by_channel.values():
+            recent = [mid for mid in message_ids if discord.utils.snowflake_time(mid) > cutoff]
+            singles = len(message_ids) - len(recent)
+            for start in range(0, len(recent), 100):
+                chunk = len(recent[start:start + 100])
+                if chunk < 2:
+                    singles += chunk
+                else:
+                    self.rest.add("bulk_delete")
+            if singles:
+                self.rest.add("delete", singles)
+
+        self.expired += len(expired)
+        for group in storage.groups(expired, guild_of=lambda row: row[1]):
+            await storage.delete_drops(group)
+
+        earliest = await storage.next_expiry([0], 1)
+        if earliest is not None:
+            expiries.push(earliest)
+
+    async def run(self, storage, scheduler, expiries):
+        """Steps straight from each event to the next, in the order clicks, drops, expiry, sampling."""
+        end = self.options.days * 86_400
+        next_sample = 60
+
+        while True:
+            due_at = scheduler.next_due()
+            deadline = expiries.next_deadline()
+            times = [next_sample]
+            if due_at is not None:
+                times.append(due_at)
+            if deadline is not None:
+                times.append(deadline - self.started)
+            if self._events:
+                times.append(self._events[0][0])
+
+            self.clock = min(times)
+            if self.clock > end:
+                break
+
+            while self._events and self._events[0][0] <= self.clock:
+                _, _, kind, *args = heapq.heappop(self._events)
+                if kind == "click":
+                    await self.click(storage, *args)
+                else:
+                    await self.flush(storage)
+
+            if due_at is not None and due_at <= self.clock:
+                await self.post(storage, expiries, scheduler.pop_due(self.clock))
+            if deadline is not None and deadline - self.started <= self.clock:
+                await self.cleanup(storage, expiries)
+            if next_sample <= self.clock:
+                self.active_drops.append(await storage.active_drop_count())
+                next_sample += 60
+
+        if len(self.active_drops) < self.options.days * 1_440:
+            self.active_drops.append(await storage.active_drop_count())
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Child Process
+# ---------------------------------------------------------------------------------------------------------------------
+# The bot's modules are imported inside these functions: config creates data/ in the working directory, which the
+# parent points at a scratch directory.
+async def simulate(options, loop: VirtualClockLoop, guilds: int, denominator: int, expiry_minutes: int) -> dict:
+    from core.shards import ShardPartition
+    from core.scheduler import DropScheduler, DeadlineQueue
+    from core.storage import storage
+    from core.state import guild_states
+    from core.ratelimit import send_limiter, TokenBucket
+    from benchmarks.harness import load_bot, close_databases
+
+    random.seed(options.seed)
+    sim = Simulation(options, loop, guilds, expiry_minutes)
+    cog = await load_bot(sim.bot)
+    for guild in sim.bot.guilds:
+        await guild_states.update_settings(guild.id, drop_expiry_minutes=expiry_minutes)
+
+    # Everything that reads a clock now reads the virtual one
+    cog.clock = sim.wall_time
+    cog.drop_chance_denominator = denominator
+    cog.drop_interval = options.interval
+    send_limiter.clock = loop.time
+    send_limiter.global_bucket = TokenBucket(send_limiter.global_bucket.rate, send_limiter.global_bucket.capacity,
+                                             loop.time)
+
+    partition = ShardPartition(0, 1, cog.drop_interval, denominator)
+    partition.scheduler = DropScheduler(options.interval, denominator, clock=loop.time,
+                                        rng=random.Random(options.seed))
+    partition.expiries = DeadlineQueue(clock=sim.wall_time)
+    partition.scheduler.schedule_many(guild.id for guild in sim.bot.guilds)
+    cog.partitions[0] = partition
+    count_writes(sim, storage)
+
+    async def drive(tick):
+        while True:
+            await tick(partition)
+
+    async def sample():
+        while True:
+            await asyncio.sleep(60)
+            sim.active_drops.append(await storage.active_drop_count())
+
+    started = time.perf_counter()
+    tasks = [loop.create_task(coro) for coro in (drive(cog.item_drop_task), drive(cog.cleanup_expired_drops),
+                                                 sample())]
+    try:
+        await asyncio.sleep(options.days * 86_400)
+        if len(sim.active_drops) < options.days * 1_440:
+            sim.active_drops.append(await storage.active_drop_count())
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await sim.cancel_clicks()
+        await sim.bot.close()
+        await close_databases()
+
+    return summarise(options, sim, partition.cleanup_totals["deleted"], guilds, denominator, expiry_minutes,
+                     time.perf_counter() - started)
+
+
+async def simulate_fast(options, guilds: int, denominator: int, expiry_minutes: int) -> dict:
+    from core.scheduler import DropScheduler, DeadlineQueue
+    from core.storage import storage
+
+    sim = FastSimulation(options, guilds, expiry_minutes)
+    scheduler = DropScheduler(options.interval, denominator, clock=sim.time, rng=random.Random(options.seed))
+    expiries = DeadlineQueue(clock=sim.wall_time)
+    scheduler.schedule_many(sim.guilds)
+    count_writes(sim, storage)
+
+    started = time.perf_counter()
+    await sim.run(storage, scheduler, expiries)
+    return summarise(options, sim, sim.expired, guilds, denominator, expiry_minutes, time.perf_counter() - started)
+
+
+def run_child(options):
+    import config  # Configures logging, which is then turned down for the run
+
+    logging.getLogger().setLevel(options.log_level.upper())
+    loop = VirtualClockLoop()
+    asyncio.set_event_loop(loop)
+    try:
+        args = map(int, options.child)
+        run = simulate_fast(options, *args) if options.fast else simulate(options, loop, *args)
+        row = loop.run_until_complete(run)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+    print(json.dumps(row), flush=True)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------------------------------------------------
+def spread(values, scale: float = 1.0):
+    if not values:
+        return {"mean": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "mean": round(sum(ordered) / len(ordered) / scale, 3),
+        "p99": round(ordered[min(len(ordered) - 1, round(0.99 * (len(ordered) - 1)))] / scale, 3),
+        "max": round(ordered[-1] / scale, 3),
+    }
+
+
+def summarise(options, sim, expired: int, guilds: int, denominator: int, expiry_minutes: int,
+              seconds: float) -> dict:
+    minutes = options.days * 1_440
+    hours = -(-minutes // 60)
+
+    drops_per_hour = sim.drops.series(minutes, 60)
+    rest_per_minute = sim.rest.series(minutes)
+    writes_per_minute = sim.db.series(minutes)
+    drops = sum(drops_per_hour)
+    # One active_drops sample per virtual minute; each hour reports its last
+    hourly_active = sim.active_drops[59::60] or sim.active_drops[-1:]
+
+    series = [
+        {
+            "hour": hour + 1,
+            "drops": drops_per_hour[hour],
+            "rest_calls": sum(rest_per_minute[hour * 60:(hour + 1) * 60]),
+            "db_writes": sum(writes_per_minute[hour * 60:(hour + 1) * 60]),
+            "active_drops": hourly_active[hour] if hour < len(hourly_active) else None,
+        }
+        for hour in range(hours)
+    ]
+
+    return {
+        "guilds": guilds,
+        "denominator": denominator,
+        "expiry_minutes": expiry_minutes,
+        "days": options.days,
+        "mode": "fast" if options.fast else "full",
+        "wall_seconds": round(seconds, 2),
+        "drops": drops,
+        "drops_per_hour": {
+            **spread(drops_per_hour),
+            "expected": round(guilds * 3_600 / (options.interval * denominator), 1),
+        },
+        "rest_calls_per_minute": {
+            **spread(rest_per_minute),
+            "by_route": {route: round(count / minutes, 3) for route, count in sorted(sim.rest.totals().items())},
+        },
+        "db_writes_per_second": {
+            **spread(writes_per_minute, 60),
+            "rows_mean": round(sum(sim.db_rows.totals().values()) / (minutes * 60), 3),
+            "by_call": dict(sorted(sim.db.totals().items())),
+        },
+        "active_drops": {
+            "max": max(sim.active_drops, default=0),
+            "mean": round(sum(sim.active_drops) / len(sim.active_drops), 1) if sim.active_drops else 0.0,
+            "final": sim.active_drops[-1] if sim.active_drops else 0,
+        },
+        "clicks": dict(sim.outcomes),
+        "expired": expired,
+        "series": series,
+    }
+
+
+def spawn(guilds: int, denominator: int, expiry: int, options):
+    scratch = tempfile.mkdtemp(prefix=f"collector-sim-{guilds}-")
+    args = ["--child", guilds, denominator, expiry]
+    for name in ("days", "interval", "active_share", "claim_delay", "destroy_ratio", "extra_clicks", "members",
+                 "rest_latency", "seed", "log_level"):
+        args += [f"--{name.replace('_', '-')}", getattr(options, name)]
+    if options.fast:
+        args.append("--fast")
+
+    try:
+        row = child_result(start_child("benchmarks.simulate", args, scratch, child_env("memory")))
+        return row or {"guilds": guilds, "denominator": denominator, "expiry_minutes": expiry, "error": "failed"}
+    finally:
+        if options.keep:
+            print(f"Kept {scratch}", file=sys.stderr)
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def run_all(options) -> int:
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "days": options.days,
+            "interval": options.interval,
+            "active_share": options.active_share,
+            "claim_delay_minutes": options.claim_delay,
+            "destroy_ratio": options.destroy_ratio,
+            "extra_clicks": options.extra_clicks,
+            "rest_latency_ms": options.rest_latency,
+            "seed": options.seed,
+            "mode": "fast" if options.fast else "full",
+        },
+        "results": [],
+    }
+
+    for guilds, denominator, expiry in itertools.product(options.guilds, options.denominator, options.expiry):
+        print(f"[sim] {guilds} guild(s), 1 in {denominator}, {expiry} min expiry, {options.days} day(s)...",
+              file=sys.stderr, flush=True)
+        row = spawn(guilds, denominator, expiry, options)
+        report["results"].append(row)
+        if "error" in row:
+            print("[sim] Failed.", file=sys.stderr)
+        else:
+            print(f"[sim] {row['drops_per_hour']['mean']} drops/h, {row['rest_calls_per_minute']['mean']} REST "
+                  f"calls/min (max {row['rest_calls_per_minute']['max']}), {row['db_writes_per_second']['mean']} "
+                  f"DB writes/s, active_drops max {row['active_drops']['max']} ({row['wall_seconds']} s)",
+                  file=sys.stderr, flush=True)
+
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+        print(f"[sim] Wrote {options.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    return 1 if any("error" in row for row in report["results"]) else 0
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Main Function
+# ---------------------------------------------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.simulate",
+        description="Weeks of drops, claims and expiry on a virtual clock, for choosing drop chance and expiry."
+    )
+    parser.add_argument("--guilds", default=DEFAULT_GUILDS, help="Comma-separated guild counts")
+    parser.add_argument("--denominator", default=DEFAULT_DENOMINATOR,
+                        help="Comma-separated 1-in-N drop chances, as set by set_drop_chance")
+    parser.add_argument("--expiry", default=DEFAULT_EXPIRY, help="Comma-separated drop expiry times in minutes")
+    parser.add_argument("--days", type=int, default=14, help="Virtual days to simulate")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds per drop roll")
+    parser.add_argument("--active-share", type=float, default=0.5, help="Share of guilds whose members click drops")
+    parser.add_argument("--claim-delay", type=float, default=5.0,
+                        help="Mean minutes until the first click on a drop in an active guild")
+    parser.add_argument("--destroy-ratio", type=float, default=0.2, help="Share of first clicks that are Destroy")
+    parser.add_argument("--extra-clicks", type=float, default=0.5, help="Mean late clicks after the first")
+    parser.add_argument("--members", type=int, default=5, help="Members per fake guild")
+    parser.add_argument("--rest-latency", type=float, default=50.0, help="Simulated REST round trip in ms")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fast", action="store_true",
+                        help="Skip the cog and fake REST objects; same scheduler and storage, counted REST calls")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--keep", action="store_true", help="Keep each run's scratch directory")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.child:
+        return run_child(options)
+
+    options.guilds = parse_list(options.guilds)
+    options.denominator = parse_list(options.denominator)
+    options.expiry = parse_list(options.expiry)
+    if not options.guilds or min(options.guilds) < 1 or options.days < 1:
+        parser.error("--guilds and --days must be at least 1")
+    if not options.denominator or min(options.denominator) < 1 or not options.expiry or min(options.expiry) < 1:
+        parser.error("--denominator and --expiry must be at least 1")
+    if options.claim_delay <= 0:
+        parser.error("--claim-delay must be positive")
+
+    return run_all(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
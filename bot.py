@@ -1,8 +1,15 @@
 import os
 import discord
+import signal
 import asyncio
 import logging
 from config import client, DISCORD_TOKEN, perform_sync, TEST_GUILD_ID
+from core.database import db, partitions
+from core.stats_buffer import stats_buffer
+from core.background import background
+from core.audit import audit_log
+from core.cluster import cluster
+from core.exporter import exporter
 
 logger = logging.getLogger(__name__)
 
@@ -48,11 +55,25 @@ async def main():
                 await client.load_extension(f"cogs.{filename[:-3]}")
                 logger.info(f"Loaded cog: {filename[:-3]}")
 
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(client.close()))
+        except (NotImplementedError, AttributeError):
+            pass  # Signal handlers are unavailable on Windows event loops
+
         logger.info("Starting bot...")
         await client.start(DISCORD_TOKEN)
 
     except Exception as e:
         logger.exception(f"Unhandled exception during startup: {e}")
+    finally:
+        await exporter.stop()
+        await audit_log.stop()
+        await background.drain()
+        await stats_buffer.stop()
+        # After the final flush, so the other processes still hear about it
+        await cluster.stop()
+        await partitions.close()
+        await db.close()
 
 
 if __name__ == "__main__":
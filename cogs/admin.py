@@ -1,12 +1,15 @@
 import discord
-import aiosqlite
 import logging
 
 from discord import app_commands
 from discord.ext import commands
 from config import client, perform_sync
 
-from core.utils import log_command_usage, DB_PATH, only_owner, owner_check
+from core.utils import log_command_usage, only_owner, owner_check
+from core.database import db, partitions, PARTITIONED_TABLES
+from core.state import guild_states
+from core.leaderboard import leaderboards
+from core.cluster import cluster
 from core.autocomplete import table_name_autocomplete, cog_autocomplete
 
 # ---------------------------------------------------------------------------------------------------------------------
@@ -14,6 +17,11 @@ from core.autocomplete import table_name_autocomplete, cog_autocomplete
 # ---------------------------------------------------------------------------------------------------------------------
 logger = logging.getLogger(__name__)
 
+
+def table_pools(table_name: str):
+    """The databases holding a table: every partition for the guild-keyed tables, otherwise the main file."""
+    return partitions.pools if table_name in PARTITIONED_TABLES else [db]
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Admin Class
 # ---------------------------------------------------------------------------------------------------------------------
@@ -21,6 +29,39 @@ class AdminCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        cluster.on("sync_all", self.apply_sync_all)
+        cluster.on("tables_changed", self.apply_tables_changed)
+        cluster.on("extension", self.apply_extension)
+
+    async def cog_unload(self):
+        for event in ("sync_all", "tables_changed", "extension"):
+            cluster.off(event)
+
+    # ---------------------------------------------------------------------------------------------------------------------
+    # Cluster Events
+    # ---------------------------------------------------------------------------------------------------------------------
+    async def apply_sync_all(self, data=None):
+        """Syncs commands to every guild this process serves; returns (guilds, commands synced)."""
+        total_commands = 0
+        for guild in self.bot.guilds:
+            total_commands += await perform_sync(guild=guild)
+        return len(self.bot.guilds), total_commands
+
+    async def apply_tables_changed(self, data):
+        """Drops in-memory copies of a table another process reset or deleted."""
+        guild_states.invalidate()
+        if data["table"] in ("item_stats", "user_totals"):
+            await leaderboards.rebuild()
+
+    async def apply_extension(self, data):
+        name = f"cogs.{data['extension']}"
+        if data["action"] in ("unload", "reload"):
+            await client.unload_extension(name)
+        if data["action"] in ("load", "reload"):
+            await client.load_extension(name)
+        logger.info(f"Applied cluster {data['action']} of {name}")
+
     @app_commands.command(name="sync_all", description="Owner: Sync all slash commands to all guilds.")
     @only_owner()
     async def sync_all(self, interaction: discord.Interaction):
@@ -29,17 +70,13 @@ class AdminCog(commands.Cog):
             return
 
         await interaction.response.defer(ephemeral=True)
-        total_commands = 0
-        total_guilds = len(self.bot.guilds)
+        await cluster.broadcast("sync_all")
+        total_guilds, total_commands = await self.apply_sync_all()
 
-        for guild in self.bot.guilds:
-            count = await perform_sync(guild=guild)
-            total_commands += count
-
-        await interaction.followup.send(
-            f"Synced commands to {total_guilds} guild(s). Total commands synced: {total_commands}",
-            ephemeral=True
-        )
+        message = f"Synced commands to {total_guilds} guild(s). Total commands synced: {total_commands}"
+        if cluster.connected:
+            message += "\nOther cluster processes are syncing their own guilds."
+        await interaction.followup.send(message, ephemeral=True)
 
         await log_command_usage(self.bot, interaction)
     # ---------------------------------------------------------------------------------------------------------------------
@@ -53,21 +90,30 @@ class AdminCog(commands.Cog):
 
         await interaction.response.defer()
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                cursor = await conn.execute(
-                    "SELECT sql FROM sqlite_master WHERE type='table' AND name = ?",
-                    (table_name,)
-                )
-                schema = await cursor.fetchone()
-                await cursor.close()
-
-                if not schema:
-                    await interaction.followup.send(f'`Error: No table found with name {table_name}`')
-                    return
-
-                await conn.execute(f'DROP TABLE IF EXISTS {table_name}')
-                await conn.execute(schema[0])
-                await conn.commit()
+            found = False
+            for pool in table_pools(table_name):
+                async with pool.writer() as conn:
+                    cursor = await conn.execute(
+                        "SELECT sql FROM sqlite_master WHERE type='table' AND name = ?",
+                        (table_name,)
+                    )
+                    schema = await cursor.fetchone()
+                    await cursor.close()
+
+                    if not schema:
+                        continue
+
+                    await conn.execute(f'DROP TABLE IF EXISTS {table_name}')
+                    await conn.execute(schema[0])
+                    await conn.commit()
+                    found = True
+
+            if not found:
+                await interaction.followup.send(f'`Error: No table found with name {table_name}`')
+                return
+
+            await self.apply_tables_changed({"table": table_name})
+            await cluster.broadcast("tables_changed", {"table": table_name})
 
             await interaction.followup.send(f'`Success: {table_name} table has been reset`')
         except Exception as e:
@@ -87,20 +133,29 @@ class AdminCog(commands.Cog):
 
         await interaction.response.defer()
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                cursor = await conn.execute(
-                    "SELECT name FROM sqlite_master WHERE type='table' AND name = ?",
-                    (table_name,)
-                )
-                exists = await cursor.fetchone()
-                await cursor.close()
-
-                if not exists:
-                    await interaction.followup.send(f'`Error: No table found with name {table_name}`')
-                    return
-
-                await conn.execute(f'DROP TABLE IF EXISTS {table_name}')
-                await conn.commit()
+            found = False
+            for pool in table_pools(table_name):
+                async with pool.writer() as conn:
+                    cursor = await conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type='table' AND name = ?",
+                        (table_name,)
+                    )
+                    exists = await cursor.fetchone()
+                    await cursor.close()
+
+                    if not exists:
+                        continue
+
+                    await conn.execute(f'DROP TABLE IF EXISTS {table_name}')
+                    await conn.commit()
+                    found = True
+
+            if not found:
+                await interaction.followup.send(f'`Error: No table found with name {table_name}`')
+                return
+
+            await self.apply_tables_changed({"table": table_name})
+            await cluster.broadcast("tables_changed", {"table": table_name})
 
             await interaction.followup.send(f'`Success: {table_name} table has been deleted`')
         except Exception as e:
@@ -121,6 +176,7 @@ class AdminCog(commands.Cog):
         await interaction.response.defer()
         try:
             await client.load_extension(f'cogs.{extension}')
+            await cluster.broadcast("extension", {"action": "load", "extension": extension})
             await interaction.followup.send(f'`Success: Loaded {extension}`')
             await perform_sync()
         except Exception as e:
@@ -141,6 +197,7 @@ class AdminCog(commands.Cog):
         await interaction.response.defer()
         try:
             await client.unload_extension(f'cogs.{extension}')
+            await cluster.broadcast("extension", {"action": "unload", "extension": extension})
             await interaction.followup.send(f'`Success: Unloaded {extension}`')
         except Exception as e:
             logger.exception("Error in unload")
@@ -161,6 +218,7 @@ class AdminCog(commands.Cog):
         try:
             await client.unload_extension(f'cogs.{extension}')
             await client.load_extension(f'cogs.{extension}')
+            await cluster.broadcast("extension", {"action": "reload", "extension": extension})
             await interaction.followup.send(f'Reloaded {extension}.')
             await perform_sync()
         except Exception as e:
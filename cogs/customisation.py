@@ -1,12 +1,13 @@
 import discord
 import logging
-import aiosqlite
 
 from discord import app_commands
 from discord.ext import commands
 
 from core.utils import log_command_usage, check_permissions, owner_check
-from config import DB_PATH
+from core.database import db
+from core.storage import storage
+from core.state import guild_states
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Logging Configuration
@@ -19,14 +20,11 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------------------------------------------------
 async def get_bio_settings():
     try:
-        async with aiosqlite.connect(DB_PATH) as conn:
-            async with conn.execute('SELECT value FROM customisation WHERE type = ?', ("activity_type",)) as cursor:
-                activity_type_doc = await cursor.fetchone()
-            async with conn.execute('SELECT value FROM customisation WHERE type = ?', ("bio",)) as cursor:
-                bio_doc = await cursor.fetchone()
-            if activity_type_doc and bio_doc:
-                return activity_type_doc[0], bio_doc[0]
-            return None, None
+        activity_type = await storage.find_customisation("activity_type")
+        bio = await storage.find_customisation("bio")
+        if activity_type and bio:
+            return activity_type, bio
+        return None, None
     except Exception as e:
         logger.error(f"Failed to retrieve bio settings: {e}")
         return None, None
@@ -70,42 +68,27 @@ class CustomisationCog(commands.Cog):
                                                     ephemeral=True)
             return
 
-        async with aiosqlite.connect(DB_PATH) as conn:
-            try:
-                if colour.startswith("#"):
-                    color = colour[1:]
-                else:
-                    color = colour
-
-                color_obj = discord.Color(int(color, 16))
-
-                async with conn.execute(
-                        'SELECT value FROM customisation WHERE type = ? AND guild_id = ?',
-                        ("embed_color", interaction.guild_id)) as cursor:
-                    embed_color_doc = await cursor.fetchone()
+        try:
+            if colour.startswith("#"):
+                color = colour[1:]
+            else:
+                color = colour
 
-                if not embed_color_doc:
-                    await conn.execute(
-                        'INSERT INTO customisation (guild_id, type, value) VALUES (?, ?, ?)',
-                        (interaction.guild_id, "embed_color", color))
-                else:
-                    await conn.execute(
-                        'UPDATE customisation SET value = ? WHERE type = ? AND guild_id = ?',
-                        (color, "embed_color", interaction.guild_id))
+            color_obj = discord.Color(int(color, 16))
 
-                await conn.commit()
+            await guild_states.update_embed_colour(interaction.guild_id, color)
 
-                await interaction.response.send_message(f"`Success: Embed color has been set to #{color}!`",
-                                                        ephemeral=True)
+            await interaction.response.send_message(f"`Success: Embed color has been set to #{color}!`",
+                                                    ephemeral=True)
 
-            except ValueError:
-                await interaction.response.send_message(
-                    "`Error: Invalid color format! Please provide a valid hexadecimal color value.`", ephemeral=True)
-            except Exception as e:
-                logger.error(f"An error occurred: {str(e)}")
-                await interaction.followup.send(f"`Error: {e}`", ephemeral=True)
-            finally:
-                await log_command_usage(self.bot, interaction)
+        except ValueError:
+            await interaction.response.send_message(
+                "`Error: Invalid color format! Please provide a valid hexadecimal color value.`", ephemeral=True)
+        except Exception as e:
+            logger.error(f"An error occurred: {str(e)}")
+            await interaction.followup.send(f"`Error: {e}`", ephemeral=True)
+        finally:
+            await log_command_usage(self.bot, interaction)
 
     # ---------------------------------------------------------------------------------------------------------------------
     @app_commands.command(description="Owner: Change Bot's Bio.")
@@ -115,39 +98,32 @@ class CustomisationCog(commands.Cog):
             await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
             return
 
-        async with aiosqlite.connect(DB_PATH) as conn:
-            try:
-                if activity_type.lower() == "playing":
-                    activity = discord.Game(name=bio)
-                elif activity_type.lower() == "listening":
-                    activity = discord.Activity(type=discord.ActivityType.listening, name=bio)
-                elif activity_type.lower() == "watching":
-                    activity = discord.Activity(type=discord.ActivityType.watching, name=bio)
-                else:
-                    await interaction.response.send_message(
-                        "`Error: Invalid activity type! Choose from playing, listening, or watching.`", ephemeral=True)
-                    return
-
-                await self.bot.change_presence(activity=activity)
-
-                # Store the bio settings in the database
-                await conn.execute('INSERT INTO customisation (guild_id, type, value) VALUES (?, ?, ?) '
-                                   'ON CONFLICT(guild_id, type) DO UPDATE SET value=excluded.value',
-                                   (interaction.guild_id, "activity_type", activity_type))
-                await conn.execute('INSERT INTO customisation (guild_id, type, value) VALUES (?, ?, ?) '
-                                   'ON CONFLICT(guild_id, type) DO UPDATE SET value=excluded.value',
-                                   (interaction.guild_id, "bio", bio))
-                await conn.commit()
-
-                # Send a confirmation message
+        try:
+            if activity_type.lower() == "playing":
+                activity = discord.Game(name=bio)
+            elif activity_type.lower() == "listening":
+                activity = discord.Activity(type=discord.ActivityType.listening, name=bio)
+            elif activity_type.lower() == "watching":
+                activity = discord.Activity(type=discord.ActivityType.watching, name=bio)
+            else:
                 await interaction.response.send_message(
-                    f"`Success: Bot's activity has been set to {activity_type} '{bio}'`", ephemeral=True)
+                    "`Error: Invalid activity type! Choose from playing, listening, or watching.`", ephemeral=True)
+                return
+
+            await self.bot.change_presence(activity=activity)
+
+            # Store the bio settings in the database
+            await storage.set_customisation(interaction.guild_id, {"activity_type": activity_type, "bio": bio})
 
-            except Exception as e:
-                logger.error(f"An error occurred: {str(e)}")
-                await interaction.followup.send(f"`Error: {e}`", ephemeral=True)
-            finally:
-                await log_command_usage(self.bot, interaction)
+            # Send a confirmation message
+            await interaction.response.send_message(
+                f"`Success: Bot's activity has been set to {activity_type} '{bio}'`", ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"An error occurred: {str(e)}")
+            await interaction.followup.send(f"`Error: {e}`", ephemeral=True)
+        finally:
+            await log_command_usage(self.bot, interaction)
 
     @set_bio.autocomplete("activity_type")
     async def activity_type_autocomplete(self, interaction: discord.Interaction, current: str):
@@ -160,7 +136,7 @@ class CustomisationCog(commands.Cog):
 # Setup Function
 # ---------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with db.writer() as conn:
         await conn.execute('''
         CREATE TABLE IF NOT EXISTS customisation (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -1,284 +1,356 @@
 import discord
+import asyncio
 import aiosqlite
 import random
 import logging
 import math
+import time
 
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 from datetime import datetime, timedelta
 from collections import defaultdict
 
-from core.utils import DB_PATH, get_embed_colour, log_command_usage, check_permissions
+from core.utils import get_embed_colour, log_command_usage, check_permissions
+from core.database import db, partitions
+from core.storage import storage, ensure_user_totals
+from core.state import guild_states, DEFAULT_SETTINGS
+from core.shards import ShardPartition, shard_for
+from core.cluster import cluster
+from core.stats_buffer import stats_buffer
+from core.metrics import latency, increment, set_gauge, track_cache
+from core.cache import LRUCache
+from core.leaderboard import leaderboards
+from core.names import user_names
+from core.rare_roles import rare_roles, RARE_ROLE_HOLDERS_SCHEMA
+from core.ratelimit import send_limiter
+from core.outbound import outbound, INTERACTION, DROP, DELETE
 from config import OWNER_ID
 
 logger = logging.getLogger(__name__)
 
+EXPIRY_MAX_SLEEP = 300
+DROP_CONCURRENCY = 20
+BULK_DELETE_MAX_AGE = timedelta(days=14, minutes=-5)
+
+# Columns /patch_item_settings adds to databases from before rare drops had their own text and images
+RARE_TEXT_COLUMNS = ("rare_default_text", "rare_claim_image", "rare_destroy_image", "rare_claim_text",
+                     "rare_destroy_text")
+
 
 async def patch_null_item_settings():
-    async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute('''
-            UPDATE item_settings
-            SET
-                message = COALESCE(message, 'Something dropped! Claim it or Destroy it!'),
-                image_url = COALESCE(image_url, 'https://imgur.com/VZtZTOm.png'),
-                claim_text = COALESCE(claim_text, '{user} claimed it!'),
-                destroy_text = COALESCE(destroy_text, '{user} destroyed it!'),
-                claim_image_url = COALESCE(claim_image_url, 'https://imgur.com/VZtZTOm.png'),
-                destroy_image_url = COALESCE(destroy_image_url, 'https://imgur.com/UtVm1W9.png'),
-                rare_message = COALESCE(rare_message, 'A rare item has appeared! Be the first to claim it!'),
-                rare_image_url = COALESCE(rare_image_url, 'https://imgur.com/GLszyDB.png'),
-                rare_default_text = COALESCE(rare_default_text, 'A rare event occurred!'),
-                rare_claim_image = COALESCE(rare_claim_image, NULL),
-                rare_destroy_image = COALESCE(rare_destroy_image, NULL),
-                rare_claim_text = COALESCE(rare_claim_text, '{user} claimed the rare item!'),
-                rare_destroy_text = COALESCE(rare_destroy_text, '{user} destroyed the rare item!'),
-                rare_role_id = COALESCE(rare_role_id, NULL),
-                drop_expiry_minutes = COALESCE(drop_expiry_minutes, 30)
-            WHERE
-                message IS NULL OR
-                image_url IS NULL OR
-                claim_text IS NULL OR
-                destroy_text IS NULL
-        ''')
-        await conn.commit()
+    defaults = {column: value for column, value in DEFAULT_SETTINGS.items() if value is not None}
+    await storage.fill_setting_defaults(defaults)
+    await guild_states.load_all()
+
+
+def record_interaction_latency(action: str, interaction: discord.Interaction, started: float):
+    """Records handler time and click-to-edit time (from the interaction's snowflake) for an item button."""
+    latency(f"{action}_handler").observe(time.perf_counter() - started)
+    latency(f"{action}_click_to_edit").observe(
+        max(0.0, (discord.utils.utcnow() - interaction.created_at).total_seconds())
+    )
 
 
 # -----------------------------------------------------------------------------------------------------------------
 # Game Buttons
 # -----------------------------------------------------------------------------------------------------------------
-class ItemView(discord.ui.View):
-    def __init__(self, author_id: int, bot: commands.Bot):
-        super().__init__(timeout=None)
-        self.claimed = False
-        self.bot = bot
+DROP_CUSTOM_ID = "collector:{action}:{rarity}"
+SETTLED_DROPS_MAX = 10_000
+
+ALREADY_SETTLED = "This item has already been collected or destroyed!"
+
+BUTTON_STYLES = {
+    "claim": ("Claim", discord.ButtonStyle.success),
+    "destroy": ("Destroy", discord.ButtonStyle.danger),
+}
+
+# Message id -> "claimed"/"destroyed" for drops this process has already settled
+settled_drops = track_cache("settled_drops", LRUCache(SETTLED_DROPS_MAX))
+
+def build_drop_view(rarity: str, disabled: bool = False) -> discord.ui.View:
+    """A view made only of dynamic items, which discord.py dispatches by custom_id without storing the view."""
+    view = discord.ui.View(timeout=None)
+    for action in BUTTON_STYLES:
+        view.add_item(DropButton(action, rarity, disabled=disabled))
+    return view
+
+
+async def settle_drop(message: discord.Message, status: str, user_id: int, expiry_minutes: int) -> bool:
+    """
+    Moves a drop out of the 'open' state in one conditional statement. Returns True for the single winner.
+
+    The insert branch covers a click that lands before drop_item has recorded the row; drop_item's later
+    INSERT OR IGNORE then leaves the settled row alone.
+    """
+    dropped_at = discord.utils.snowflake_time(message.id)
+    expires_at = int(dropped_at.timestamp()) + (expiry_minutes or 30) * 60
+
+    return await storage.settle_drop(
+        message.id, message.guild.id, message.channel.id,
+        dropped_at.replace(tzinfo=None).isoformat(), expires_at, status, user_id
+    )
+
+
+async def resolve_drop(interaction: discord.Interaction, action: str, is_rare: bool):
+    started = time.perf_counter()
+    verb = "claiming" if action == "claim" else "destroying"
+    try:
+        message_id = interaction.message.id
+        if message_id in settled_drops:
+            await outbound.submit(INTERACTION, interaction.response.send_message, ALREADY_SETTLED, ephemeral=True)
+            return
 
-    async def disable_all(self):
-        for child in self.children:
-            child.disabled = True
+        # Marked before the first await so later clicks in this process are refused without touching SQLite
+        status = "claimed" if action == "claim" else "destroyed"
+        settled_drops.put(message_id, status)
 
-    @discord.ui.button(label="Claim", style=discord.ButtonStyle.success, custom_id="item_claim")
-    async def claim(self, interaction: discord.Interaction, button: discord.ui.Button):
+        state = await guild_states.get(interaction.guild.id)
         try:
-            if self.claimed:
-                await interaction.response.send_message("This item has already been collected or destroyed!",
-                                                        ephemeral=True)
-                return
+            won = await settle_drop(interaction.message, status, interaction.user.id, state.drop_expiry_minutes)
+        except Exception:
+            settled_drops.pop(message_id)
+            raise
 
-            self.claimed = True
-            await self.disable_all()
-
-            embed = interaction.message.embeds[0]
-            is_rare = embed.author and "RARE DROP" in embed.author.name if embed.author else False
-
-            async with aiosqlite.connect(DB_PATH) as conn:
-                if is_rare:
-                    await conn.execute('''
-                        INSERT INTO item_stats (guild_id, user_id, items_collected, rare_drops_claimed)
-                        VALUES (?, ?, 1, 1)
-                        ON CONFLICT(guild_id, user_id)
-                        DO UPDATE SET 
-                            items_collected = items_collected + 1,
-                            rare_drops_claimed = rare_drops_claimed + 1
-                    ''', (interaction.guild.id, interaction.user.id))
-                else:
-                    await conn.execute('''
-                        INSERT INTO item_stats (guild_id, user_id, items_collected)
-                        VALUES (?, ?, 1)
-                        ON CONFLICT(guild_id, user_id)
-                        DO UPDATE SET items_collected = items_collected + 1
-                    ''', (interaction.guild.id, interaction.user.id))
-
-                cursor = await conn.execute(
-                    '''SELECT claim_text, claim_image_url, rare_claim_image, rare_role_id,
-                              rare_image_url, rare_claim_text
-                       FROM item_settings WHERE guild_id = ?''',
-                    (interaction.guild.id,)
-                )
-                row = await cursor.fetchone()
-                claim_text = (
-                    row[5] if is_rare and row and row[5]
-                    else row[0] if row else "{user} claimed it!"
-                )
-                claim_image = (
-                    row[2] if is_rare and row and row[2]
-                    else (row[4] if is_rare and row and row[4] else row[1])
-                )
-                rare_role_id = row[3] if row and len(row) > 3 else None
-
-                await conn.commit()
-
-            embed.description = claim_text.replace("{user}", interaction.user.mention)
+        if not won:
+            await outbound.submit(INTERACTION, interaction.response.send_message, ALREADY_SETTLED, ephemeral=True)
+            return
+
+        embed = interaction.message.embeds[0]
+
+        if action == "claim":
+            if is_rare:
+                text = state.rare_claim_text or state.claim_text
+                image = state.rare_claim_image or state.rare_image_url or state.claim_image_url
+            else:
+                text = state.claim_text
+                image = state.claim_image_url
+            text = text or "{user} claimed it!"
             embed.color = discord.Color.green()
             embed.set_footer(text=f"Claimed by {interaction.user.display_name}")
-            embed.timestamp = discord.utils.utcnow()
+        else:
+            if is_rare:
+                text = state.rare_destroy_text or state.destroy_text
+                image = state.rare_destroy_image or state.rare_image_url or state.destroy_image_url
+            else:
+                text = state.destroy_text
+                image = state.destroy_image_url
+            text = text or "{user} destroyed it!"
+            embed.color = discord.Color.red()
+            embed.set_footer(text=f"Destroyed by {interaction.user.display_name}")
 
-            if claim_image:
-                embed.set_image(url=claim_image)
+        embed.description = text.replace("{user}", interaction.user.mention)
+        embed.timestamp = discord.utils.utcnow()
+        if image:
+            embed.set_image(url=image)
+
+        # Respond first; everything below runs after Discord has the edit
+        view = build_drop_view("rare" if is_rare else "normal", disabled=True)
+        await outbound.submit(INTERACTION, interaction.response.edit_message, embed=embed, view=view)
+        record_interaction_latency(action, interaction, started)
+        increment("drops_settled", action=action, rarity="rare" if is_rare else "normal")
+
+        if action == "claim":
+            stats_buffer.record(interaction.guild.id, interaction.user.id, collected=1, rare=1 if is_rare else 0)
+            leaderboards.record_claim(interaction.guild.id, interaction.user.id)
+            if is_rare and state.rare_role_id:
+                rare_roles.assign(interaction.client, interaction.guild, interaction.user, state.rare_role_id)
+            logger.info(f"{interaction.user} claimed an item in guild {interaction.guild.id}")
+        else:
+            stats_buffer.record(interaction.guild.id, interaction.user.id, destroyed=1)
+            logger.info(f"{interaction.user} destroyed an item in guild {interaction.guild.id}")
 
-            await interaction.response.edit_message(embed=embed, view=self)
+    except Exception:
+        logger.exception(f"Error while {verb} item in guild {interaction.guild.id}")
+        if not interaction.response.is_done():
+            await interaction.response.send_message(f"Something went wrong while {verb} the item.", ephemeral=True)
 
-            if is_rare and rare_role_id:
-                role = interaction.guild.get_role(rare_role_id)
-                if role:
-                    try:
-                        # Remove rare role from all members who currently have it
-                        for member in role.members:
-                            if member != interaction.user:
-                                await member.remove_roles(role, reason="Reassigned rare drop role")
 
-                        # Assign the role to the current user
-                        await interaction.user.add_roles(role, reason="Claimed rare drop")
-                        logger.info(
-                            f"Assigned rare role {role.id} to {interaction.user} in guild {interaction.guild.id}")
+class DropButton(discord.ui.DynamicItem[discord.ui.Button],
+                 template=r"collector:(?P<action>claim|destroy):(?P<rarity>normal|rare)"):
+    """Claim/Destroy button whose custom_id carries everything needed to handle a click."""
 
-                    except discord.Forbidden:
-                        logger.warning(f"Missing permission to modify role {role.id} in guild {interaction.guild.id}")
-                    except Exception as e:
-                        logger.exception(f"Error managing rare role: {e}")
+    def __init__(self, action: str, rarity: str, disabled: bool = False):
+        label, style = BUTTON_STYLES[action]
+        super().__init__(discord.ui.Button(
+            label=label,
+            style=style,
+            custom_id=DROP_CUSTOM_ID.format(action=action, rarity=rarity),
+            disabled=disabled
+        ))
+        self.action = action
+        self.rarity = rarity
 
-            logger.info(f"{interaction.user} claimed an item in guild {interaction.guild.id}")
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["action"], match["rarity"])
 
-        except Exception as e:
-            logger.exception(f"Error while claiming item in guild {interaction.guild.id}")
-            await interaction.response.send_message("Something went wrong while claiming the item.", ephemeral=True)
+    async def callback(self, interaction: discord.Interaction):
+        await resolve_drop(interaction, self.action, self.rarity == "rare")
 
-    @discord.ui.button(label="Destroy", style=discord.ButtonStyle.danger, custom_id="item_destroy")
-    async def destroy(self, interaction: discord.Interaction, button: discord.ui.Button):
-        try:
-            if self.claimed:
-                await interaction.response.send_message("This item has already been collected or destroyed!",
-                                                        ephemeral=True)
-                return
 
-            self.claimed = True
-            await self.disable_all()
-
-            embed = interaction.message.embeds[0]
-            is_rare = embed.author and "RARE DROP" in embed.author.name if embed.author else False
-
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('''
-                    INSERT INTO item_stats (guild_id, user_id, items_destroyed)
-                    VALUES (?, ?, 1)
-                    ON CONFLICT(guild_id, user_id)
-                    DO UPDATE SET items_destroyed = items_destroyed + 1
-                ''', (interaction.guild.id, interaction.user.id))
-
-                cursor = await conn.execute(
-                    '''SELECT destroy_text, destroy_image_url, rare_destroy_image,
-                              rare_image_url, rare_destroy_text
-                       FROM item_settings WHERE guild_id = ?''',
-                    (interaction.guild.id,)
-                )
-                row = await cursor.fetchone()
-                destroy_text = (
-                    row[4] if is_rare and row and row[4]
-                    else row[0] if row else "{user} destroyed it!"
-                )
-                destroy_image = (
-                    row[2] if is_rare and row and row[2]
-                    else (row[3] if is_rare and row and row[3] else row[1])
-                )
-
-                await conn.commit()
-
-            embed.description = destroy_text.replace("{user}", interaction.user.mention)
-            embed.color = discord.Color.red()
-            embed.set_footer(text=f"Destroyed by {interaction.user.display_name}")
-            embed.timestamp = discord.utils.utcnow()
+class LegacyDropButton(discord.ui.DynamicItem[discord.ui.Button], template=r"item_(?P<action>claim|destroy)"):
+    """Buttons on drops posted before the rarity was encoded in the custom_id."""
 
-            if destroy_image:
-                embed.set_image(url=destroy_image)
+    def __init__(self, action: str):
+        label, style = BUTTON_STYLES[action]
+        super().__init__(discord.ui.Button(label=label, style=style, custom_id=f"item_{action}"))
+        self.action = action
 
-            await interaction.response.edit_message(embed=embed, view=self)
-            logger.info(f"{interaction.user} destroyed an item in guild {interaction.guild.id}")
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["action"])
 
-        except Exception as e:
-            logger.exception(f"Error while destroying item in guild {interaction.guild.id}")
-            await interaction.response.send_message("Something went wrong while destroying the item.", ephemeral=True)
+    async def callback(self, interaction: discord.Interaction):
+        embeds = interaction.message.embeds
+        author = embeds[0].author.name if embeds and embeds[0].author else None
+        await resolve_drop(interaction, self.action, bool(author and "RARE DROP" in author))
 
 
 # -----------------------------------------------------------------------------------------------------------------
 # Leaderboard View
 # -----------------------------------------------------------------------------------------------------------------
+METRIC_LABELS = {
+    "collected": ("Collected", "Top Collectors!"),
+    "destroyed": ("Destroyed", "Top Destroyers!"),
+    "rare": ("Rare Drops", "Top Rare Hunters!"),
+}
+
+
 class LeaderboardView(discord.ui.View):
+    """
+    Paged leaderboard. Each page remembers the key of its last row and the next page seeks from there.
+
+    Every page, for every metric, ranks stored totals plus unflushed claims, so paging never shows a user twice
+    or skips one between flushes.
+    """
+
     def __init__(self, bot, guild_id):
         super().__init__(timeout=60)
         self.bot = bot
         self.guild_id = guild_id
         self.global_view = False
+        self.metric = "collected"
+        self.cursors = [None]
+        self.has_next = False
+        self.last_key = None
+
+    @property
+    def page_number(self) -> int:
+        return len(self.cursors)
 
     async def start(self, interaction: discord.Interaction, ephemeral: bool = False):
         try:
             embed = await self.build_leaderboard_embed(interaction)
-            await interaction.response.send_message(embed=embed, view=self, ephemeral=ephemeral)
+            await outbound.submit(INTERACTION, interaction.response.send_message,
+                                  embed=embed, view=self, ephemeral=ephemeral)
         except Exception as e:
             logger.exception("Error while sending leaderboard.")
             await interaction.response.send_message("Failed to display leaderboard.", ephemeral=True)
 
-    @discord.ui.button(label="🌐 View Global", style=discord.ButtonStyle.secondary)
+    async def refresh(self, interaction: discord.Interaction):
+        embed = await self.build_leaderboard_embed(interaction)
+        await outbound.submit(INTERACTION, interaction.response.edit_message, embed=embed, view=self)
+
+    @discord.ui.select(
+        placeholder="Rank by...",
+        row=0,
+        options=[discord.SelectOption(label=label, value=metric, default=metric == "collected")
+                 for metric, (label, _) in METRIC_LABELS.items()]
+    )
+    async def select_metric(self, interaction: discord.Interaction, select: discord.ui.Select):
+        try:
+            self.metric = select.values[0]
+            for option in select.options:
+                option.default = option.value == self.metric
+            self.cursors = [None]
+            await self.refresh(interaction)
+        except Exception as e:
+            logger.exception("Error changing leaderboard metric.")
+            await interaction.response.send_message("Failed to update leaderboard view.", ephemeral=True)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary, row=1, disabled=True)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            if len(self.cursors) > 1:
+                self.cursors.pop()
+            await self.refresh(interaction)
+        except Exception as e:
+            logger.exception("Error paging leaderboard.")
+            await interaction.response.send_message("Failed to update leaderboard view.", ephemeral=True)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary, row=1, disabled=True)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            if self.has_next:
+                self.cursors.append(self.last_key)
+            await self.refresh(interaction)
+        except Exception as e:
+            logger.exception("Error paging leaderboard.")
+            await interaction.response.send_message("Failed to update leaderboard view.", ephemeral=True)
+
+    @discord.ui.button(label="🌐 View Global", style=discord.ButtonStyle.secondary, row=1)
     async def toggle_view(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
             self.global_view = not self.global_view
+            self.cursors = [None]
             button.label = "🏠 View Local" if self.global_view else "🌐 View Global"
-            embed = await self.build_leaderboard_embed(interaction)
-            await interaction.response.edit_message(embed=embed, view=self)
+            await self.refresh(interaction)
             logger.info(f"{interaction.user} toggled to {'global' if self.global_view else 'local'} leaderboard in guild {interaction.guild.id}")
         except Exception as e:
             logger.exception("Error toggling leaderboard view.")
             await interaction.response.send_message("Failed to update leaderboard view.", ephemeral=True)
 
+    @discord.ui.button(label="📍 My Rank", style=discord.ButtonStyle.primary, row=1)
+    async def my_rank(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            scope = None if self.global_view else self.guild_id
+            result = await leaderboards.rank(interaction.user.id, scope, self.metric)
+            label = METRIC_LABELS[self.metric][0].lower()
+            where = "globally" if self.global_view else "in this server"
+
+            if result is None:
+                message = f"You aren't ranked {where} for {label} yet."
+            else:
+                position, value = result
+                message = f"You are **#{position}** {where} for {label} with `{value}`."
+            await interaction.response.send_message(message, ephemeral=True)
+        except Exception as e:
+            logger.exception("Error looking up leaderboard rank.")
+            await interaction.response.send_message("Failed to look up your rank.", ephemeral=True)
+
+    async def fetch_rows(self):
+        scope = None if self.global_view else self.guild_id
+        rows = await leaderboards.page(scope, self.metric, after=self.cursors[-1], limit=leaderboards.k + 1)
+        return rows[:leaderboards.k], len(rows) > leaderboards.k
+
     async def build_leaderboard_embed(self, interaction: discord.Interaction) -> discord.Embed:
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                if self.global_view:
-                    query = '''
-                        SELECT user_id, SUM(items_collected)
-                        FROM item_stats
-                        GROUP BY user_id
-                        ORDER BY SUM(items_collected) DESC
-                        LIMIT 10
-                    '''
-                    params = ()
-                else:
-                    query = '''
-                        SELECT user_id, items_collected
-                        FROM item_stats
-                        WHERE guild_id = ?
-                        ORDER BY items_collected DESC
-                        LIMIT 10
-                    '''
-                    params = (self.guild_id,)
-
-                cursor = await conn.execute(query, params)
-                rows = await cursor.fetchall()
+            rows, self.has_next = await self.fetch_rows()
+            self.last_key = (rows[-1][1], rows[-1][0]) if rows else None
+            self.previous_page.disabled = self.page_number == 1
+            self.next_page.disabled = not self.has_next
 
+            label, footer = METRIC_LABELS[self.metric]
             if not rows:
-                desc = "No one has collected anything yet!" if not self.global_view else "No global collections yet!"
+                if self.page_number > 1:
+                    desc = "No more entries."
+                else:
+                    desc = "No one has collected anything yet!" if not self.global_view else "No global collections yet!"
             else:
+                names = await user_names.resolve(self.bot, interaction.guild, [user_id for user_id, _ in rows])
                 desc = ""
-                for i, (user_id, total) in enumerate(rows, 1):
-                    user = interaction.guild.get_member(user_id)
-                    if not user:
-                        user = self.bot.get_user(user_id)
-                    if not user:
-                        try:
-                            user = await self.bot.fetch_user(user_id)
-                        except Exception:
-                            user = None
-
-                    name = user.display_name if isinstance(user, discord.Member) else str(
-                        user) if user else f"<@{user_id}>"
-                    desc += f"**{i}.** {name} — `{total}`\n"
+                offset = (self.page_number - 1) * leaderboards.k
+                for i, (user_id, total) in enumerate(rows, offset + 1):
+                    desc += f"**{i}.** {names[user_id]} — `{total}`\n"
 
             embed = discord.Embed(
-                title="🌐 Global Leaderboard" if self.global_view else "🏠 Local Leaderboard",
+                title=f"{'🌐 Global' if self.global_view else '🏠 Local'} Leaderboard — {label}",
                 description=desc,
                 color=await get_embed_colour(self.guild_id)
             )
             embed.set_thumbnail(url=self.bot.user.display_avatar.url)
-            embed.set_footer(text="Top Collectors!")
+            embed.set_footer(text=f"Page {self.page_number} • {footer}")
             embed.timestamp = discord.utils.utcnow()
             return embed
 
@@ -295,208 +367,327 @@ class ItemDrop(commands.Cog):
         self.bot = bot
         self.drop_chance_denominator = 120
         self.drop_interval = 60
-        self.next_drop_times = defaultdict(lambda: datetime.utcnow())
+        self.rate_overrides = {}
+        self.partitions = {}
         self.start_time = datetime.utcnow()
-
-    def cog_unload(self):
+        # Wall clock for drop expiry; the simulator swaps in a virtual one
+        self.clock = time.time
+        self._initialised = False
+        self._init_lock = asyncio.Lock()
+
+    async def cog_load(self):
+        self.bot.add_dynamic_items(DropButton, LegacyDropButton)
+        stats_buffer.add_listener(leaderboards.on_flush)
+        stats_buffer.add_listener(self.share_flush)
+        stats_buffer.start()
+        cluster.on("stats_flush", self.apply_remote_flush)
+        cluster.on("drop_chance", self.apply_drop_chance)
+
+    async def cog_unload(self):
         try:
-            self.item_drop_task.cancel()
-            logger.info("ItemDrop cog unloaded and task cancelled.")
+            for partition in self.partitions.values():
+                partition.stop()
+            # Runs before the client closes its HTTP session, so in-flight drops can still be recorded
+            for partition in self.partitions.values():
+                await partition.finish_tick()
+            self.bot.remove_dynamic_items(DropButton, LegacyDropButton)
+            await stats_buffer.stop()
+            stats_buffer.remove_listener(leaderboards.on_flush)
+            stats_buffer.remove_listener(self.share_flush)
+            cluster.off("stats_flush")
+            cluster.off("drop_chance")
+            logger.info("ItemDrop cog unloaded and tasks cancelled.")
         except Exception:
             logger.exception("Error during cog_unload.")
 
+    # -----------------------------------------------------------------------------------------------------------------
+    # Shard Partitions
+    # -----------------------------------------------------------------------------------------------------------------
+    @property
+    def shard_count(self) -> int:
+        return self.bot.shard_count or 1
+
+    def owned_shards(self):
+        shards = getattr(self.bot, "shards", None)
+        return sorted(shards) if shards else [0]
+
+    def partition_for(self, guild_id: int):
+        """The partition running this guild's drops, or None if another process owns its shard."""
+        return self.partitions.get(shard_for(guild_id, self.shard_count))
+
+    def rate_for(self, guild_id: int) -> int:
+        return self.rate_overrides.get(guild_id, self.drop_chance_denominator)
+
+    async def initialise(self):
+        """One-time setup shared by every shard: drop chance settings and the guild state cache."""
+        async with self._init_lock:
+            if self._initialised:
+                return
+
+            self.drop_chance_denominator = int(await storage.setdefault_config("drop_chance_denominator", "120"))
+            logger.info(f"Loaded drop chance denominator: 1 in {self.drop_chance_denominator}")
+
+            for key, value in (await storage.configs_with_prefix("drop_chance_denominator:")).items():
+                self.rate_overrides[int(key.split(":", 1)[1])] = int(value)
+
+            shards = getattr(self.bot, "shards", None)
+            guild_states.configure_shards(self.owned_shards() if shards else None, self.shard_count)
+            await guild_states.load_all()
+            self._initialised = True
+
+    async def start_partition(self, shard_id: int):
+        partition = self.partitions.get(shard_id)
+        if partition is None:
+            partition = ShardPartition(shard_id, self.shard_count, self.drop_interval, self.drop_chance_denominator)
+            for guild_id, denominator in self.rate_overrides.items():
+                if shard_for(guild_id, self.shard_count) == shard_id:
+                    partition.scheduler.set_rate(guild_id, denominator)
+            self.partitions[shard_id] = partition
+
+        # A shard that reconnected may have joined guilds while it was away
+        guild_ids = [guild.id for guild in self.bot.guilds
+                     if guild.shard_id == shard_id and guild.id not in partition.scheduler]
+        if guild_ids:
+            await guild_states.ensure(guild_ids)
+            partition.scheduler.schedule_many(guild_ids)
+
+        if not partition.running:
+            await self.refresh_next_expiry(partition)
+            partition.start(self.item_drop_task, self.cleanup_expired_drops)
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Cluster Events
+    # -----------------------------------------------------------------------------------------------------------------
+    async def share_flush(self, batch):
+        """Tells the other processes whose collected counts just changed, so their global boards stay exact."""
+        changed = [[guild_id, user_id, deltas[0]] for (guild_id, user_id), deltas in batch.items() if deltas[0]]
+        if changed:
+            await cluster.broadcast_chunks("stats_flush", changed)
+
+    async def apply_remote_flush(self, changed):
+        batch = {(guild_id, user_id): [collected, 0, 0] for guild_id, user_id, collected in changed}
+        await leaderboards.on_flush(batch)
+
+    async def apply_drop_chance(self, data):
+        """Applies a drop chance change made in any process; a guild id of None changes the default."""
+        guild_id, chance = data["guild_id"], data["chance"]
+        if guild_id is None:
+            self.drop_chance_denominator = chance
+            for partition in self.partitions.values():
+                partition.scheduler.set_denominator(chance)
+            return
+
+        if chance:
+            self.rate_overrides[guild_id] = chance
+        else:
+            self.rate_overrides.pop(guild_id, None)
+
+        partition = self.partition_for(guild_id)
+        if partition:
+            partition.scheduler.set_rate(guild_id, chance or None)
+
+    @commands.Cog.listener()
+    async def on_shard_ready(self, shard_id: int):
+        try:
+            await self.initialise()
+            await self.start_partition(shard_id)
+        except Exception:
+            logger.exception(f"Error initializing ItemDrop for shard {shard_id}.")
+
     @commands.Cog.listener()
     async def on_ready(self):
-        if not hasattr(self.bot, '_itemdrop_started'):
-            self.bot._itemdrop_started = True
+        try:
+            await self.initialise()
+            for shard_id in self.owned_shards():
+                await self.start_partition(shard_id)
+            logger.info(f"ItemDrop initialized for {len(self.partitions)} shard(s).")
 
-            try:
-                self.bot.add_view(ItemView(bot=self.bot, author_id=self.bot.user.id))
-                logger.info("ItemView registered for persistent button support.")
-
-                async with aiosqlite.connect(DB_PATH) as conn:
-                    await conn.execute('''
-                        CREATE TABLE IF NOT EXISTS item_config (
-                            key TEXT PRIMARY KEY,
-                            value TEXT
-                        )
-                    ''')
-                    await conn.execute('''
-                        INSERT OR IGNORE INTO item_config (key, value)
-                        VALUES ('drop_chance_denominator', '120')
-                    ''')
-
-                    cursor = await conn.execute("SELECT value FROM item_config WHERE key = 'drop_chance_denominator'")
-                    row = await cursor.fetchone()
-                    self.drop_chance_denominator = int(row[0]) if row else 120
-                    logger.info(f"Loaded drop chance denominator: 1 in {self.drop_chance_denominator}")
-
-                    for guild in self.bot.guilds:
-                        await conn.execute('''
-                            INSERT OR IGNORE INTO item_settings (
-                                guild_id, drop_channel_id, message, image_url,
-                                claim_text, destroy_text, claim_image_url, destroy_image_url,
-                                rare_message, rare_image_url,
-                                rare_default_text, rare_claim_image, rare_destroy_image,
-                                rare_claim_text, rare_destroy_text,
-                                rare_role_id, drop_expiry_minutes
-                            ) VALUES (?, NULL,
-                                'Something dropped! Claim it or Destroy it!',
-                                'https://imgur.com/VZtZTOm.png',
-                                '{user} claimed it!',
-                                '{user} destroyed it!',
-                                'https://imgur.com/VZtZTOm.png',
-                                'https://imgur.com/UtVm1W9.png',
-                                'A rare item has appeared! Be the first to claim it!',
-                                'https://imgur.com/GLszyDB.png',
-                                'A rare event occurred!',
-                                NULL,
-                                NULL,
-                                '{user} claimed the rare item!',
-                                '{user} destroyed the rare item!',
-                                NULL,
-                                30
-                            )
-                            ''', (guild.id,))
-
-                    await conn.commit()
-
-                self.item_drop_task.change_interval(seconds=self.drop_interval)
-                self.item_drop_task.start()
-                self.cleanup_expired_drops.start()
-                logger.info("ItemDrop and cleanup tasks started.")
-                logger.info("ItemDrop initialized for all joined guilds.")
+        except Exception:
+            logger.exception("Error initializing ItemDrop during on_ready.")
 
-            except Exception:
-                logger.exception("Error initializing ItemDrop during on_ready.")
+    async def item_drop_task(self, partition: ShardPartition):
+        await partition.scheduler.wait(max_sleep=self.drop_interval * 5)
 
-    @tasks.loop(seconds=0)
-    async def item_drop_task(self):
-        logger.info(f"[Tick] item_drop_task at {datetime.utcnow()}")
+        due = partition.scheduler.pop_due()
+        if not due:
+            return
 
-        for guild in self.bot.guilds:
+        logger.info(f"[Tick] shard {partition.shard_id}: {len(due)} guild(s) due at {datetime.utcnow()}")
+        guilds = []
+        for guild_id in due:
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                partition.scheduler.remove(guild_id)
+                continue
+            guilds.append(guild)
+
+        # Shielded so that a shutdown cancelling the loop lets posted drops be recorded; see cog_unload
+        with latency("drop_tick").time():
+            partition.tick = asyncio.ensure_future(self.drop_items(partition, guilds))
+            await asyncio.shield(partition.tick)
+
+    async def drop_items(self, partition: ShardPartition, guilds):
+        """Sends every due drop concurrently, then records them in one active_drops transaction per database."""
+        semaphore = asyncio.Semaphore(DROP_CONCURRENCY)
+
+        async def send(guild):
+            async with semaphore:
+                return await self.drop_item(guild)
+
+        records = [record for record in await asyncio.gather(*(send(guild) for guild in guilds)) if record]
+        if not records:
+            return
+
+        recorded = []
+        for group in storage.groups(records, guild_of=lambda record: record[1]):
             try:
-                if random.randint(1, self.drop_chance_denominator) != 1:
-                    continue
-
-                drop_type = "normal"
-                if random.randint(1, 50) == 1:
-                    drop_type = "rare"
-
-                async with aiosqlite.connect(DB_PATH) as conn:
-                    cursor = await conn.execute('''
-                        SELECT drop_channel_id, message, image_url,
-                               rare_message, rare_image_url, rare_default_text
-                        FROM item_settings WHERE guild_id = ?
-                    ''', (guild.id,))
-                    settings = await cursor.fetchone()
-
-                channel_id = None
-                if settings:
-                    (channel_id, msg, img, rare_msg, rare_img, rare_default_text) = settings
-                    if drop_type == "rare":
-                        message_text = rare_msg or rare_default_text or "✨ A rare item has appeared!"
-                        image_url = rare_img or "https://imgur.com/RgP7g0K.png"
-                    else:
-                        message_text = msg or "An item has appeared!"
-                        image_url = img or ""
-                else:
-                    message_text = "An item has appeared!"
-                    image_url = ""
+                await storage.record_drops(group)
+                recorded.extend(group)
+            except Exception:
+                logger.exception(f"Failed to record {len(group)} dropped item(s).")
 
-                bot_member = guild.me or guild.get_member(self.bot.user.id)
-                if not bot_member:
-                    logger.warning(f"Bot member not found in guild {guild.id}")
-                    continue
+        if recorded:
+            partition.expiries.push(min(record[4] for record in recorded))
 
-                if not channel_id:
-                    valid = [c for c in guild.text_channels if c.permissions_for(bot_member).send_messages]
-                    channel = random.choice(valid) if valid else None
-                else:
-                    channel = self.bot.get_channel(channel_id)
+    async def drop_item(self, guild: discord.Guild):
+        """Posts one drop and returns its active_drops row, or None if nothing was sent."""
+        try:
+            drop_type = "normal"
+            if random.randint(1, 50) == 1:
+                drop_type = "rare"
+
+            state = await guild_states.get(guild.id)
+            channel_id = state.drop_channel_id
+            if drop_type == "rare":
+                message_text = state.rare_message or state.rare_default_text or "✨ A rare item has appeared!"
+                image_url = state.rare_image_url or "https://imgur.com/RgP7g0K.png"
+            else:
+                message_text = state.message or "An item has appeared!"
+                image_url = state.image_url or ""
 
-                if not channel or not channel.permissions_for(bot_member).send_messages:
-                    logger.warning(f"Cannot drop item in guild {guild.id}.")
-                    continue
+            bot_member = guild.me or guild.get_member(self.bot.user.id)
+            if not bot_member:
+                logger.warning(f"Bot member not found in guild {guild.id}")
+                return
 
-                colour = await get_embed_colour(guild.id)
-                embed = discord.Embed(description=message_text, color=colour)
-                embed.timestamp = discord.utils.utcnow()
-                if image_url:
-                    embed.set_image(url=image_url)
+            if not channel_id:
+                valid = [c for c in guild.text_channels if c.permissions_for(bot_member).send_messages]
+                channel = random.choice(valid) if valid else None
+            else:
+                channel = self.bot.get_channel(channel_id)
 
-                view = ItemView(author_id=self.bot.user.id, bot=self.bot)
-                message = await channel.send(embed=embed, view=view)
+            if not channel or not channel.permissions_for(bot_member).send_messages:
+                logger.warning(f"Cannot drop item in guild {guild.id}.")
+                return
 
-                async with aiosqlite.connect(DB_PATH) as conn:
-                    await conn.execute('''
-                        INSERT OR IGNORE INTO active_drops (message_id, guild_id, channel_id, drop_time)
-                        VALUES (?, ?, ?, ?)
-                    ''', (message.id, guild.id, channel.id, datetime.utcnow().isoformat()))
-                    await conn.commit()
+            embed = discord.Embed(description=message_text, color=state.colour)
+            embed.timestamp = discord.utils.utcnow()
+            if image_url:
+                embed.set_image(url=image_url)
 
-                logger.info(f"[DROP-{drop_type.upper()}] Item dropped in guild {guild.id} in channel {channel.id}")
+            await send_limiter.acquire(channel.id)
+            with latency("drop_send").time():
+                message = await outbound.submit(DROP, channel.send, embed=embed, view=build_drop_view(drop_type))
 
-            except Exception:
-                logger.exception(f"Error during item drop for guild {guild.id}")
+            dropped_at = datetime.utcnow()
+            expires_at = int(self.clock()) + (state.drop_expiry_minutes or 30) * 60
 
-    @tasks.loop(minutes=1)
-    async def cleanup_expired_drops(self):
-        try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                # Load all drop_expiry_minutes settings
-                cursor = await conn.execute("SELECT guild_id, drop_expiry_minutes FROM item_settings")
-                guild_expiries = {gid: expiry or 30 for gid, expiry in await cursor.fetchall()}
-
-                # Load all active drops
-                cursor = await conn.execute("SELECT message_id, guild_id, channel_id, drop_time FROM active_drops")
-                rows = await cursor.fetchall()
-
-                expired = []
-                now = datetime.utcnow()
-
-                for message_id, guild_id, channel_id, drop_time_str in rows:
-                    drop_time = datetime.fromisoformat(drop_time_str)
-                    expiry_minutes = guild_expiries.get(guild_id, 30)
-                    if drop_time + timedelta(minutes=expiry_minutes) <= now:
-                        expired.append((message_id, guild_id, channel_id))
-
-                # Try to delete messages and clean up records
-                for message_id, guild_id, channel_id in expired:
-                    guild = self.bot.get_guild(guild_id)
-                    channel = guild.get_channel(channel_id) if guild else None
-                    if not channel:
-                        continue
-                    try:
-                        msg = await channel.fetch_message(message_id)
-                        await msg.delete()
-                        logger.info(f"[CLEANUP] Deleted expired item in guild {guild_id}, channel {channel_id}")
-                    except Exception:
-                        logger.warning(f"[CLEANUP] Failed to delete message {message_id} in guild {guild_id}")
-
-                if expired:
-                    ids = [msg_id for msg_id, *_ in expired]
-                    await conn.executemany("DELETE FROM active_drops WHERE message_id = ?", [(mid,) for mid in ids])
-                    await conn.commit()
+            increment("drops_posted", rarity=drop_type)
+            logger.info(f"[DROP-{drop_type.upper()}] Item dropped in guild {guild.id} in channel {channel.id}")
+            return message.id, guild.id, channel.id, dropped_at.isoformat(), expires_at
 
         except Exception:
-            logger.exception("Error during expired item cleanup task.")
+            logger.exception(f"Error during item drop for guild {guild.id}")
 
-    @item_drop_task.before_loop
-    async def before_item_drop_task(self):
-        try:
-            await self.bot.wait_until_ready()
-            logger.info("ItemDrop task is waiting until bot is ready.")
-        except Exception:
-            logger.exception("Error during before_item_drop_task")
+    async def refresh_next_expiry(self, partition: ShardPartition):
+        """Seeds the partition's deadline heap with the earliest expiry still in active_drops for its shard."""
+        earliest = await storage.next_expiry([partition.shard_id], partition.shard_count)
+        if earliest is not None:
+            partition.expiries.push(earliest)
+
+    async def cleanup_expired_drops(self, partition: ShardPartition):
+        await partition.expiries.wait(max_sleep=EXPIRY_MAX_SLEEP)
+
+        now = int(self.clock())
+        if not partition.expiries.pop_due(now):
+            return
 
-    @cleanup_expired_drops.before_loop
-    async def before_cleanup_expired_drops(self):
         try:
-            await self.bot.wait_until_ready()
-            logger.info("Cleanup task is waiting until bot is ready.")
+            expired = await storage.due_drops(now, [partition.shard_id], partition.shard_count)
+            set_gauge("cleanup_backlog", len(expired), shard=partition.shard_id)
+
+            # Try to delete messages and clean up records
+            if expired:
+                deleted, skipped, failed = await self.delete_expired_messages(expired)
+                partition.cleanup_totals["deleted"] += deleted
+                partition.cleanup_totals["skipped"] += skipped
+                partition.cleanup_totals["failed"] += failed
+                for result, count in (("deleted", deleted), ("skipped", skipped), ("failed", failed)):
+                    increment("cleanup_drops", count, result=result)
+                logger.info(f"[CLEANUP] shard {partition.shard_id}: {len(expired)} expired drop(s): "
+                            f"{deleted} deleted, {skipped} skipped, {failed} failed")
+
+                for group in storage.groups(expired, guild_of=lambda row: row[1]):
+                    await storage.delete_drops(group)
+
+            await self.refresh_next_expiry(partition)
+
         except Exception:
-            logger.exception("Error during before_cleanup_expired_drops")
+            logger.exception("Error during expired item cleanup task.")
+
+    async def delete_expired_messages(self, expired):
+        """Deletes expired drop messages grouped by channel. Returns (deleted, skipped, failed)."""
+        by_channel = defaultdict(list)
+        skipped = 0
+
+        for message_id, guild_id, channel_id in expired:
+            guild = self.bot.get_guild(guild_id)
+            channel = guild.get_channel(channel_id) if guild else None
+            if not channel:
+                skipped += 1
+                continue
+            by_channel[channel].append(message_id)
+
+        # Concurrency is capped by the outbound scheduler's deletion class
+        results = await asyncio.gather(
+            *(self._purge_channel(channel, ids) for channel, ids in by_channel.items())
+        )
+
+        deleted = sum(result[0] for result in results)
+        skipped += sum(result[1] for result in results)
+        failed = sum(result[2] for result in results)
+        return deleted, skipped, failed
+
+    async def _purge_channel(self, channel, message_ids):
+        deleted = skipped = failed = 0
+        bulk_cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        recent = [mid for mid in message_ids if discord.utils.snowflake_time(mid) > bulk_cutoff]
+        single = [mid for mid in message_ids if discord.utils.snowflake_time(mid) <= bulk_cutoff]
+
+        for start in range(0, len(recent), 100):
+            chunk = recent[start:start + 100]
+            if len(chunk) < 2:
+                single.extend(chunk)
+                continue
+            try:
+                await outbound.submit(DELETE, channel.delete_messages, [discord.Object(id=mid) for mid in chunk],
+                                      reason="Expired item drops")
+                deleted += len(chunk)
+            except (discord.Forbidden, discord.HTTPException):
+                # Bulk delete needs Manage Messages; our own messages can still be removed one by one
+                single.extend(chunk)
+
+        for message_id in single:
+            try:
+                await outbound.submit(DELETE, channel.get_partial_message(message_id).delete)
+                deleted += 1
+            except discord.NotFound:
+                skipped += 1
+            except Exception:
+                failed += 1
+                logger.warning(f"[CLEANUP] Failed to delete message {message_id} in channel {channel.id}")
+
+        return deleted, skipped, failed
 
 # -----------------------------------------------------------------------------------------------------------------
 # Game Commands
@@ -512,18 +703,36 @@ class ItemDrop(commands.Cog):
             await interaction.response.send_message("Please provide a value between 30 and 500.", ephemeral=True)
             return
 
-        async with aiosqlite.connect(DB_PATH) as conn:
-            await conn.execute('''
-                INSERT INTO item_config (key, value)
-                VALUES ('drop_chance_denominator', ?)
-                ON CONFLICT(key) DO UPDATE SET value = excluded.value
-            ''', (str(chance),))
-            await conn.commit()
+        await storage.set_config("drop_chance_denominator", chance)
 
-        self.drop_chance_denominator = chance
+        change = {"guild_id": None, "chance": chance}
+        await self.apply_drop_chance(change)
+        await cluster.broadcast("drop_chance", change)
         logger.info(f"Drop chance updated to 1 in {chance} by {interaction.user}.")
         await interaction.response.send_message(f"Drop chance updated to `1 in {chance}`.", ephemeral=True)
 
+    @app_commands.command(description="Owner: Override the 1-in-X drop chance for one server (0 to clear)")
+    @app_commands.describe(guild_id="The server ID to override", chance="1-in-X chance per minute (0 clears)")
+    async def set_guild_drop_chance(self, interaction: discord.Interaction, guild_id: str, chance: int):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+            return
+
+        if not guild_id.isdigit() or chance < 0 or chance > 500:
+            await interaction.response.send_message("Please provide a server ID and a value between 0 and 500.",
+                                                    ephemeral=True)
+            return
+
+        await storage.set_config(f"drop_chance_denominator:{guild_id}", chance or None)
+
+        change = {"guild_id": int(guild_id), "chance": chance}
+        await self.apply_drop_chance(change)
+        await cluster.broadcast("drop_chance", change)
+        logger.info(f"Drop chance override for guild {guild_id} set to {chance or 'default'} by {interaction.user}.")
+        await interaction.response.send_message(
+            f"Drop chance for `{guild_id}` set to `1 in {chance}`." if chance
+            else f"Drop chance override for `{guild_id}` cleared.", ephemeral=True)
+
     @app_commands.command(description="Admin: Set how long (in minutes) item drops last before auto-deletion.")
     @app_commands.describe(minutes="Expiration time in minutes (5 - 1440)")
     async def set_expiry_time(self, interaction: discord.Interaction, minutes: int):
@@ -536,12 +745,12 @@ class ItemDrop(commands.Cog):
             return
 
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute(
-                    "UPDATE item_settings SET drop_expiry_minutes = ? WHERE guild_id = ?",
-                    (minutes, interaction.guild.id)
-                )
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, drop_expiry_minutes=minutes)
+
+            await storage.reschedule_drops(interaction.guild.id, minutes)
+            partition = self.partition_for(interaction.guild.id)
+            if partition:
+                await self.refresh_next_expiry(partition)
 
             await interaction.response.send_message(f"Drops will now expire after `{minutes}` minutes.", ephemeral=True)
             logger.info(f"Set drop expiry to {minutes} for guild {interaction.guild.id}")
@@ -560,13 +769,7 @@ class ItemDrop(commands.Cog):
                 await interaction.response.send_message("You don't have permission.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('''
-                    INSERT INTO item_settings (guild_id, drop_channel_id)
-                    VALUES (?, ?)
-                    ON CONFLICT(guild_id) DO UPDATE SET drop_channel_id = excluded.drop_channel_id
-                ''', (interaction.guild.id, channel.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, drop_channel_id=channel.id)
 
             logger.info(f"Set item drop channel to {channel.id} in guild {interaction.guild.id}")
             await interaction.response.send_message(f"Drop channel set to {channel.mention}.", ephemeral=True)
@@ -586,9 +789,7 @@ class ItemDrop(commands.Cog):
                 await interaction.response.send_message("You don't have permission.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('UPDATE item_settings SET message = ? WHERE guild_id = ?', (message, interaction.guild.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, message=message)
 
             logger.info(f"Updated item message in guild {interaction.guild.id}: {message}")
             await interaction.response.send_message("Drop message updated.", ephemeral=True)
@@ -606,9 +807,7 @@ class ItemDrop(commands.Cog):
                 await interaction.response.send_message("You don't have permission.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('UPDATE item_settings SET image_url = ? WHERE guild_id = ?', (image_url, interaction.guild.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, image_url=image_url)
 
             logger.info(f"Updated item image URL in guild {interaction.guild.id}: {image_url}")
             await interaction.response.send_message("Image URL updated.", ephemeral=True)
@@ -630,10 +829,7 @@ class ItemDrop(commands.Cog):
                 await interaction.response.send_message("You don't have permission.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('UPDATE item_settings SET claim_image_url = ? WHERE guild_id = ?',
-                                   (image_url, interaction.guild.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, claim_image_url=image_url)
 
             logger.info(f"Updated claim image URL in guild {interaction.guild.id}: {image_url}")
             await interaction.response.send_message("Claim image URL updated.", ephemeral=True)
@@ -651,9 +847,7 @@ class ItemDrop(commands.Cog):
                 await interaction.response.send_message("You don't have permission.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('UPDATE item_settings SET claim_text = ? WHERE guild_id = ?', (text, interaction.guild.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, claim_text=text)
 
             logger.info(f"Updated claim text in guild {interaction.guild.id}: {text}")
             await interaction.response.send_message("Claim text updated.", ephemeral=True)
@@ -671,10 +865,7 @@ class ItemDrop(commands.Cog):
                 await interaction.response.send_message("You don't have permission.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('UPDATE item_settings SET destroy_image_url = ? WHERE guild_id = ?',
-                                   (image_url, interaction.guild.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, destroy_image_url=image_url)
 
             logger.info(f"Updated destroy image URL in guild {interaction.guild.id}: {image_url}")
             await interaction.response.send_message("Destroy image URL updated.", ephemeral=True)
@@ -691,9 +882,7 @@ class ItemDrop(commands.Cog):
                 await interaction.response.send_message("You don't have permission.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('UPDATE item_settings SET destroy_text = ? WHERE guild_id = ?', (text, interaction.guild.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, destroy_text=text)
 
             logger.info(f"Updated destroy text in guild {interaction.guild.id}: {text}")
             await interaction.response.send_message("Destroy text updated.", ephemeral=True)
@@ -713,12 +902,7 @@ class ItemDrop(commands.Cog):
                 await interaction.response.send_message("You don't have permission.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute(
-                    'UPDATE item_settings SET rare_image_url = ? WHERE guild_id = ?',
-                    (image_url, interaction.guild.id)
-                )
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, rare_image_url=image_url)
 
             logger.info(f"Updated rare image URL in guild {interaction.guild.id}: {image_url}")
             await interaction.response.send_message("Rare drop image URL updated.", ephemeral=True)
@@ -736,10 +920,7 @@ class ItemDrop(commands.Cog):
             return
 
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('UPDATE item_settings SET rare_default_text = ? WHERE guild_id = ?',
-                                   (text, interaction.guild.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, rare_default_text=text)
             await interaction.response.send_message("Rare default text updated.", ephemeral=True)
             logger.info(f"Updated rare_default_text for {interaction.guild.id}")
         except Exception:
@@ -755,12 +936,7 @@ class ItemDrop(commands.Cog):
             return
 
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute(
-                    'UPDATE item_settings SET rare_claim_text = ? WHERE guild_id = ?',
-                    (text, interaction.guild.id)
-                )
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, rare_claim_text=text)
             await interaction.response.send_message("Rare claim text updated.", ephemeral=True)
         except Exception:
             logger.exception("Failed to update rare claim text.")
@@ -775,12 +951,7 @@ class ItemDrop(commands.Cog):
             return
 
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute(
-                    'UPDATE item_settings SET rare_destroy_text = ? WHERE guild_id = ?',
-                    (text, interaction.guild.id)
-                )
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, rare_destroy_text=text)
             await interaction.response.send_message("Rare destroy text updated.", ephemeral=True)
         except Exception:
             logger.exception("Failed to update rare destroy text.")
@@ -795,10 +966,7 @@ class ItemDrop(commands.Cog):
             return
 
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('UPDATE item_settings SET rare_claim_image = ? WHERE guild_id = ?',
-                                   (image_url, interaction.guild.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, rare_claim_image=image_url)
             await interaction.response.send_message("Rare claim image updated.", ephemeral=True)
             logger.info(f"Updated rare_claim_image for {interaction.guild.id}")
         except Exception:
@@ -814,10 +982,7 @@ class ItemDrop(commands.Cog):
             return
 
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('UPDATE item_settings SET rare_destroy_image = ? WHERE guild_id = ?',
-                                   (image_url, interaction.guild.id))
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, rare_destroy_image=image_url)
             await interaction.response.send_message("Rare destroy image updated.", ephemeral=True)
             logger.info(f"Updated rare_destroy_image for {interaction.guild.id}")
         except Exception:
@@ -834,12 +999,7 @@ class ItemDrop(commands.Cog):
             return
 
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute(
-                    'UPDATE item_settings SET rare_role_id = ? WHERE guild_id = ?',
-                    (role.id, interaction.guild.id)
-                )
-                await conn.commit()
+            await guild_states.update_settings(interaction.guild.id, rare_role_id=role.id)
 
             await interaction.response.send_message(f"Rare drop role set to {role.mention}.", ephemeral=True)
             logger.info(f"Set rare role to {role.id} in guild {interaction.guild.id}")
@@ -855,38 +1015,28 @@ class ItemDrop(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def view_settings(self, interaction: discord.Interaction):
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                cursor = await conn.execute('''
-                    SELECT drop_channel_id, message, image_url,
-                           claim_text, destroy_text,
-                           claim_image_url, destroy_image_url,
-                           rare_message, rare_image_url,
-                           rare_default_text, rare_claim_image, rare_destroy_image,
-                           rare_claim_text, rare_destroy_text,
-                           rare_role_id, drop_expiry_minutes
-                    FROM item_settings WHERE guild_id = ?
-                ''', (interaction.guild.id,))
-                row = await cursor.fetchone()
-
-                if not row:
-                    await interaction.response.send_message("No settings found for this guild.", ephemeral=True)
-                    return
-
-                (channel_id, message, image_url,
-                 claim_text, destroy_text,
-                 claim_image_url, destroy_image_url,
-                 rare_message, rare_image_url,
-                 rare_default_text, rare_claim_image, rare_destroy_image,
-                 rare_claim_text, rare_destroy_text,
-                 rare_role_id, drop_expiry_minutes) = row
-
-                cursor = await conn.execute('SELECT value FROM item_config WHERE key = "drop_chance_denominator"')
-                chance_row = await cursor.fetchone()
-                drop_chance = int(chance_row[0]) if chance_row else 120
+            state = await guild_states.get(interaction.guild.id)
+
+            (channel_id, message, image_url,
+             claim_text, destroy_text,
+             claim_image_url, destroy_image_url,
+             rare_message, rare_image_url,
+             rare_default_text, rare_claim_image, rare_destroy_image,
+             rare_claim_text, rare_destroy_text,
+             rare_role_id, drop_expiry_minutes) = (
+                state.drop_channel_id, state.message, state.image_url,
+                state.claim_text, state.destroy_text,
+                state.claim_image_url, state.destroy_image_url,
+                state.rare_message, state.rare_image_url,
+                state.rare_default_text, state.rare_claim_image, state.rare_destroy_image,
+                state.rare_claim_text, state.rare_destroy_text,
+                state.rare_role_id, state.drop_expiry_minutes
+            )
+
+            drop_chance = self.rate_for(interaction.guild.id)
 
             drop_interval = getattr(self, "drop_interval", 180)
             attempts_per_hour = round(3600 / drop_interval)
-            import math
             approx_hourly_chance = 1 - math.pow((drop_chance - 1) / drop_chance, attempts_per_hour)
             approx_percent = round(approx_hourly_chance * 100, 2)
 
@@ -952,41 +1102,35 @@ class ItemDrop(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild):
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('''
-                    INSERT OR IGNORE INTO item_settings (
-                        guild_id, drop_channel_id, message, image_url,
-                        claim_text, destroy_text, claim_image_url, destroy_image_url,
-                        rare_message, rare_image_url,
-                        rare_default_text, rare_claim_image, rare_destroy_image,
-                        rare_claim_text, rare_destroy_text,
-                        rare_role_id, drop_expiry_minutes
-                    ) VALUES (?, NULL,
-                        'Something dropped! Claim it or Destroy it!',
-                        'https://imgur.com/VZtZTOm.png',
-                        '{user} claimed it!',
-                        '{user} destroyed it!',
-                        'https://imgur.com/VZtZTOm.png',
-                        'https://imgur.com/UtVm1W9.png',
-                        'A rare item has appeared! Be the first to claim it!',
-                        'https://imgur.com/GLszyDB.png',
-                        'A rare event occurred!',
-                        NULL,
-                        NULL,
-                        '{user} claimed the rare item!',
-                        '{user} destroyed the rare item!',
-                        NULL,
-                        30
-                    )
-                ''', (guild.id,))
-
-                await conn.commit()
-
+            await guild_states.ensure([guild.id])
+            partition = self.partition_for(guild.id)
+            if partition:
+                # A guild that left and came back keeps its /set_guild_drop_chance rate
+                if guild.id in self.rate_overrides:
+                    partition.scheduler.set_rate(guild.id, self.rate_overrides[guild.id])
+                partition.scheduler.schedule(guild.id)
             logger.info(f"Initialized item_settings for new guild {guild.id}")
 
         except Exception:
             logger.exception(f"Failed to initialize settings for new guild {guild.id}")
 
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        user_names.refresh(after)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        # Former members drop out of guild.get_member; keep their name for leaderboards
+        user_names.remember(member)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        partition = self.partition_for(guild.id)
+        if partition:
+            partition.scheduler.remove(guild.id)
+        rare_roles.forget(guild.id)
+        logger.info(f"Stopped scheduling drops for removed guild {guild.id}")
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Patch Commands
 # ---------------------------------------------------------------------------------------------------------------------
@@ -998,34 +1142,8 @@ class ItemDrop(commands.Cog):
             return
 
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                # Attempt to add each new column
-                new_columns = [
-                    "rare_default_text",
-                    "rare_claim_image",
-                    "rare_destroy_image",
-                    "rare_claim_text",
-                    "rare_destroy_text"
-                ]
-
-                for column in new_columns:
-                    try:
-                        await conn.execute(f"ALTER TABLE item_settings ADD COLUMN {column} TEXT")
-                    except aiosqlite.OperationalError:
-                        pass  # Column already exists
-
-                # Fill defaults where values are still NULL
-                await conn.execute('''
-                    UPDATE item_settings
-                    SET
-                        rare_default_text = COALESCE(rare_default_text, 'A rare event occurred!'),
-                        rare_claim_image = COALESCE(rare_claim_image, NULL),
-                        rare_destroy_image = COALESCE(rare_destroy_image, NULL),
-                        rare_claim_text = COALESCE(rare_claim_text, '{user} claimed the rare item!'),
-                        rare_destroy_text = COALESCE(rare_destroy_text, '{user} destroyed the rare item!')
-                ''')
-                await conn.commit()
-
+            await storage.fill_setting_defaults({column: DEFAULT_SETTINGS[column] for column in RARE_TEXT_COLUMNS})
+            await guild_states.load_all()
             await interaction.response.send_message("`item_settings` table successfully patched!", ephemeral=True)
             logger.info(f"{interaction.user} patched item_settings table in guild {interaction.guild.id}")
 
@@ -1053,8 +1171,64 @@ class ItemDrop(commands.Cog):
 # ---------------------------------------------------------------------------------------------------------------------
 # Setup
 # ---------------------------------------------------------------------------------------------------------------------
+BACKFILL_EXPIRES_AT = '''
+    UPDATE active_drops
+    SET expires_at = CAST(strftime('%s', drop_time) AS INTEGER) + 60 * COALESCE(
+        (SELECT drop_expiry_minutes FROM item_settings WHERE item_settings.guild_id = active_drops.guild_id),
+        30
+    )
+    WHERE expires_at IS NULL
+'''
+
+# Partition files hold no item_settings, so their legacy rows fall back to the default expiry
+BACKFILL_EXPIRES_AT_DEFAULT = '''
+    UPDATE active_drops
+    SET expires_at = CAST(strftime('%s', drop_time) AS INTEGER) + 60 * 30
+    WHERE expires_at IS NULL
+'''
+
+
+async def ensure_guild_tables(conn, with_settings: bool = True):
+    """Creates the guild-keyed tables (item_stats, active_drops, user_totals) on one database."""
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS item_stats (
+            guild_id INTEGER,
+            user_id INTEGER,
+            items_collected INTEGER DEFAULT 0,
+            items_destroyed INTEGER DEFAULT 0,
+            rare_drops_claimed INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    ''')
+
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS active_drops (
+            message_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            drop_time TEXT NOT NULL,
+            expires_at INTEGER,
+            status TEXT NOT NULL DEFAULT 'open',
+            resolved_by INTEGER
+        )
+    ''')
+
+    for column in ("expires_at INTEGER", "status TEXT NOT NULL DEFAULT 'open'", "resolved_by INTEGER"):
+        try:
+            await conn.execute(f"ALTER TABLE active_drops ADD COLUMN {column}")
+        except aiosqlite.OperationalError:
+            pass  # Column already exists
+
+    # Backfill drops recorded before expires_at existed
+    await conn.execute(BACKFILL_EXPIRES_AT if with_settings else BACKFILL_EXPIRES_AT_DEFAULT)
+
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_active_drops_expires_at ON active_drops (expires_at)")
+
+    await ensure_user_totals(conn)
+
+
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with db.writer() as conn:
         await conn.execute('''
             CREATE TABLE IF NOT EXISTS item_config (
                 key TEXT PRIMARY KEY,
@@ -1084,28 +1258,15 @@ async def setup(bot):
             )
             ''')
 
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS item_stats (
-                guild_id INTEGER,
-                user_id INTEGER,
-                items_collected INTEGER DEFAULT 0,
-                items_destroyed INTEGER DEFAULT 0,
-                rare_drops_claimed INTEGER DEFAULT 0,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        ''')
-
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS active_drops (
-                message_id INTEGER PRIMARY KEY,
-                guild_id INTEGER NOT NULL,
-                channel_id INTEGER NOT NULL,
-                drop_time TEXT NOT NULL
-            )
-        ''')
+        await conn.execute(RARE_ROLE_HOLDERS_SCHEMA)
 
         await conn.commit()
 
+    for pool in partitions.pools:
+        async with pool.writer() as conn:
+            await ensure_guild_tables(conn, with_settings=pool is db)
+            await conn.commit()
+
     logger.info("ItemDrop setup completed. Tables ensured.")
     await bot.add_cog(ItemDrop(bot))
 
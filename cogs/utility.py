@@ -1,6 +1,5 @@
 import discord
 import logging
-import aiosqlite
 import psutil
 import inspect
 
@@ -9,7 +8,15 @@ from discord import app_commands
 from discord.ui import View, Button
 from datetime import datetime
 
-from core.utils import log_command_usage, check_permissions, get_embed_colour, DB_PATH
+from core.utils import log_command_usage, check_permissions, get_embed_colour
+from core.database import db
+from core.storage import storage
+from core.stats_buffer import stats_buffer
+from core.metrics import latency
+from core.audit import audit_log
+from core.outbound import outbound
+from core.shards import shard_tracker, format_shard_summary
+from core.cluster import cluster
 from config import OWNER_ID
 
 # ---------------------------------------------------------------------------------------------------------------------
@@ -34,15 +41,13 @@ class SuggestionModal(discord.ui.Modal):
         current_time = discord.utils.utcnow()
         formatted_time = current_time.strftime("%d/%m/%Y")
 
-        async with aiosqlite.connect(DB_PATH) as conn:
-            cursor = await conn.execute("SELECT 1 FROM blacklist WHERE user_id = ?", (interaction.user.id,))
-            if await cursor.fetchone():
-                support_url = "https://discord.gg/SXmXmteyZ3"  # Your support server link
-                response_message = ("You are blacklisted from making suggestions. "
-                                    f"If you believe this is a mistake, please contact us: [Support Server]({support_url}).")
-                await interaction.response.send_message(response_message, ephemeral=True)
-                return
-            colour = await get_embed_colour(interaction.guild.id)
+        if await storage.is_blacklisted(interaction.user.id):
+            support_url = "https://discord.gg/SXmXmteyZ3"  # Your support server link
+            response_message = ("You are blacklisted from making suggestions. "
+                                f"If you believe this is a mistake, please contact us: [Support Server]({support_url}).")
+            await interaction.response.send_message(response_message, ephemeral=True)
+            return
+        colour = await get_embed_colour(interaction.guild.id)
 
         channel = self.bot.get_channel(1268168019297697914)
         if channel:
@@ -71,9 +76,7 @@ class BlacklistButton(discord.ui.Button):
         self.user_id = user_id
 
     async def callback(self, interaction: discord.Interaction):
-        async with aiosqlite.connect(DB_PATH) as conn:
-            await conn.execute("INSERT OR IGNORE INTO blacklist (user_id) VALUES (?)", (self.user_id,))
-            await conn.commit()
+        await storage.add_to_blacklist(self.user_id)
         await interaction.response.send_message("User has been blacklisted from making suggestions.", ephemeral=True)
 
 # ---------------------------------------------------------------------------------------------------------------------
@@ -141,13 +144,8 @@ class UtilityCog(commands.Cog):
         if interaction.user.guild_permissions.administrator:
             return True
 
-        async with aiosqlite.connect(DB_PATH) as conn:
-            cursor = await conn.execute('''
-                SELECT can_use_commands FROM permissions WHERE guild_id = ? AND user_id = ?
-            ''', (interaction.guild.id, interaction.user.id))
-            permission = await cursor.fetchone()
-            if permission and permission[0]:
-                return True
+        if await storage.can_use_commands(interaction.guild.id, interaction.user.id):
+            return True
 
         if "Admin" in command.description or "Owner" in command.description:
             return False
@@ -278,16 +276,21 @@ class UtilityCog(commands.Cog):
         colour = await get_embed_colour(interaction.guild.id)
 
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                cursor = await conn.execute("SELECT SUM(items_collected) FROM item_stats")
-                total_collected = (await cursor.fetchone())[0] or 0
+            total_collected, total_destroyed = await storage.totals()
 
-                cursor = await conn.execute("SELECT SUM(items_destroyed) FROM item_stats")
-                total_destroyed = (await cursor.fetchone())[0] or 0
+            pending_collected, pending_destroyed, _ = stats_buffer.pending_totals()
+            total_collected += pending_collected
+            total_destroyed += pending_destroyed
 
             total_servers = len(self.bot.guilds)
             total_users = sum(len(guild.members) for guild in self.bot.guilds)
 
+            # In cluster mode the coordinator has every process's counts
+            cluster_totals = await cluster.aggregate()
+            if cluster_totals:
+                total_servers = cluster_totals["guilds"]
+                total_users = cluster_totals["users"]
+
             bot_ping = round(self.bot.latency * 1000)
             bot_uptime = datetime.utcnow() - self.bot_start_time
             days, remainder = divmod(bot_uptime.total_seconds(), 86400)
@@ -311,6 +314,8 @@ class UtilityCog(commands.Cog):
 
             cpu = psutil.cpu_percent()
             memory = psutil.virtual_memory().percent
+            pool = db.stats()
+            db_checkouts = pool["reader_checkouts"] + pool["writer_checkouts"]
 
             embed = discord.Embed(title="", description="",
                                   color=colour)
@@ -324,6 +329,22 @@ class UtilityCog(commands.Cog):
             embed.add_field(name="‍💻 CPU", value=f"┕ `{cpu}%`", inline=True)
             embed.add_field(name="💾 Memory", value=f"┕ `{memory}%`", inline=True)
             embed.add_field(name="⏳ Uptime", value=f"┕ `{uptime_display}`", inline=True)
+            embed.add_field(name="🗄️ DB Checkouts", value=f"┕ `{db_checkouts}`", inline=True)
+            embed.add_field(name="⌛ DB Read Wait", value=f"┕ `{pool['reader_wait_avg_ms']} ms`", inline=True)
+            embed.add_field(name="✍️ DB Write Wait", value=f"┕ `{pool['writer_wait_avg_ms']} ms`", inline=True)
+            claim = latency("claim_click_to_edit").summary()
+            embed.add_field(name="⚡ Claim p50 / p99",
+                            value=f"┕ `{claim['p50_ms']} / {claim['p99_ms']} ms`", inline=True)
+            audit = audit_log.stats()
+            embed.add_field(name="📜 Audit Queue / Dropped",
+                            value=f"┕ `{audit['queued']} / {audit['dropped']}`", inline=True)
+            embed.add_field(name="📤 Outbound Queue", value=f"┕ `{outbound.queued()}`", inline=True)
+            shards = format_shard_summary(shard_tracker.summary(self.bot))
+            embed.add_field(name="🧩 Shards", value=f"```{shards}```", inline=False)
+            if cluster_totals:
+                embed.add_field(name="🖥️ Processes",
+                                value=f"┕ `{cluster_totals['connected']} / {cluster_totals['expected']}` "
+                                      f"(this is #{cluster.cluster_id})", inline=True)
 
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -339,12 +360,7 @@ class UtilityCog(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def authorise(self, interaction: discord.Interaction, user: discord.User):
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('''
-                    INSERT INTO permissions (guild_id, user_id, can_use_commands) VALUES (?, ?, 1)
-                    ON CONFLICT(guild_id, user_id) DO UPDATE SET can_use_commands = 1
-                ''', (interaction.guild.id, user.id))
-                await conn.commit()
+            await storage.set_can_use_commands(interaction.guild.id, user.id, True)
             await interaction.response.send_message(f"{user.display_name} has been authorized.", ephemeral=True)
 
         except Exception as e:
@@ -361,11 +377,7 @@ class UtilityCog(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def unauthorise(self, interaction: discord.Interaction, user: discord.User):
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('''
-                    UPDATE permissions SET can_use_commands = 0 WHERE guild_id = ? AND user_id = ?
-                ''', (interaction.guild.id, user.id))
-                await conn.commit()
+            await storage.set_can_use_commands(interaction.guild.id, user.id, False)
             await interaction.response.send_message(f"{user.display_name} has been unauthorized.", ephemeral=True)
         except Exception as e:
             logger.error(f"Failed to unauthorise user: {e}")
@@ -379,7 +391,7 @@ class UtilityCog(commands.Cog):
 # Setup Function
 # ---------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with db.writer() as conn:
         await conn.execute('''
             CREATE TABLE IF NOT EXISTS blacklist (
                 user_id INTEGER PRIMARY KEY
@@ -7,6 +7,10 @@ from discord.ext import commands
 from dotenv import load_dotenv
 from discord.ext.commands import Context, is_owner
 
+from core.shards import parse_shard_ids
+from core.metrics import rest_trace
+from core.db_config import DB_DIR, DB_PATH, DB_PARTITIONS, DB_PARTITION_PATHS, STORAGE_BACKEND
+
 # Load environment variables
 load_dotenv(".env")
 
@@ -14,6 +18,21 @@ DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 OWNER_ID = int(os.getenv("OWNER_ID", 0))
 TEST_GUILD_ID = int(os.getenv("TEST_GUILD_ID", 0)) or None
 
+# Leave both unset to let Discord pick the shard count; set SHARD_IDS (e.g. "0-3") to run part of a fleet
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 0)) or None
+SHARD_IDS = parse_shard_ids(os.getenv("SHARD_IDS", ""))
+
+if SHARD_IDS is not None and SHARD_COUNT is None:
+    raise ValueError("SHARD_IDS requires SHARD_COUNT to be set.")
+
+# Set by launcher.py for each process in cluster mode
+CLUSTER_ID = os.getenv("CLUSTER_ID")
+
+# Optional Prometheus endpoint at http://METRICS_HOST:METRICS_PORT/metrics; in cluster mode each process
+# listens on METRICS_PORT + its CLUSTER_ID. Set METRICS_HOST to 0.0.0.0 to scrape from outside a container.
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0)) or None
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
 
 DISCORD_PREFIX = "!"
 LAUNCH_TIME = datetime.utcnow()
@@ -22,8 +41,6 @@ LAUNCH_TIME = datetime.utcnow()
 # ---------------------------------------------------------------------------------------------------------------------
 # Logging Configuration
 # ---------------------------------------------------------------------------------------------------------------------
-DB_DIR = os.path.join('data', 'databases')
-DB_PATH = os.path.join(DB_DIR, 'collector.db')
 os.makedirs(DB_DIR, exist_ok=True)
 
 # ---------------------------------------------------------------------------------------------------------------------
@@ -32,11 +49,13 @@ os.makedirs(DB_DIR, exist_ok=True)
 os.makedirs("data/logs", exist_ok=True)
 os.makedirs("data/databases", exist_ok=True)
 
+LOG_FILE = f"data/logs/discord-{CLUSTER_ID}.log" if CLUSTER_ID is not None else "data/logs/discord.log"
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     handlers=[
-        logging.FileHandler("data/logs/discord.log", encoding="utf-8", mode="w"),
+        logging.FileHandler(LOG_FILE, encoding="utf-8", mode="w"),
         logging.StreamHandler()
     ]
 )
@@ -50,10 +69,13 @@ intents = discord.Intents.default()
 intents.guilds = True
 intents.message_content = True
 
-client = commands.Bot(
+client = commands.AutoShardedBot(
     command_prefix=DISCORD_PREFIX,
     intents=intents,
+    shard_count=SHARD_COUNT,
+    shard_ids=SHARD_IDS,
     help_command=None,
+    http_trace=rest_trace,
     activity=discord.Activity(type=discord.ActivityType.playing, name="games -- /help")
 )
 
@@ -0,0 +1,229 @@
+import asyncio
+import discord
+import logging
+import aiosqlite
+
+from collections import defaultdict
+
+from core.cache import TTLCache
+from core.metrics import track_cache
+from core.storage import storage
+from core.outbound import outbound, AUDIT
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Audit Log Settings
+# ---------------------------------------------------------------------------------------------------------------------
+FLUSH_INTERVAL = 3.0
+QUEUE_MAX = 5000
+DESTINATION_CACHE_MAX = 10_000
+DESTINATION_TTL = 15 * 60
+FALLBACK_CHANNEL_NAME = "collector_logs"
+
+OPTIONS_MAX = 200
+DESCRIPTION_MAX = 4000
+MESSAGE_MAX = 5800
+EMBEDS_PER_MESSAGE = 10
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Audit Log
+# ---------------------------------------------------------------------------------------------------------------------
+class AuditLog:
+    """
+    Queues command usage records and posts them to each guild's log channel in batches.
+
+    Recording never awaits anything, so commands pay neither the destination lookup nor the send. Log channels
+    are resolved once per guild and cached; records arriving while the queue is full are dropped and counted.
+    """
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, max_queue: int = QUEUE_MAX):
+        self.flush_interval = flush_interval
+        self.bot = None
+
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._destinations = track_cache("audit_destinations", TTLCache(DESTINATION_CACHE_MAX, DESTINATION_TTL))
+        self._task = None
+        self._window = []
+
+        self.recorded = 0
+        self.dropped = 0
+        self.sent_messages = 0
+        self.failed_sends = 0
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def record(self, interaction: discord.Interaction):
+        if interaction.command is None:
+            logger.error("Interaction does not have a valid command associated with it.")
+            return
+
+        options = ", ".join(
+            f"{option['name']}: {option.get('value', 'Not provided')}"
+            for option in (interaction.data or {}).get("options", [])
+        )
+        if len(options) > OPTIONS_MAX:
+            options = options[:OPTIONS_MAX - 1] + "…"
+
+        user = interaction.user
+        entry = {
+            "guild_id": interaction.guild.id if interaction.guild else None,
+            "command": interaction.command.name,
+            "options": options,
+            "user": f"{user.mention} (`{user.id}`)" if user else "Unknown",
+            "channel": interaction.channel.mention if interaction.channel else "DM",
+            "timestamp": int(interaction.created_at.timestamp()),
+        }
+
+        try:
+            self._queue.put_nowait(entry)
+            self.recorded += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logger.warning(f"Audit log queue full; {self.dropped} record(s) dropped so far.")
+
+    def invalidate(self, guild_id: int):
+        """Forgets a guild's cached log channel, e.g. after its channels change."""
+        self._destinations.pop(guild_id)
+
+    async def destination(self, guild: discord.Guild):
+        channel_id = self._destinations.get(guild.id)
+        if channel_id is None:
+            channel_id = await self._lookup(guild)
+            self._destinations.put(guild.id, channel_id)
+        return self.bot.get_channel(channel_id) if channel_id else None
+
+    async def _lookup(self, guild: discord.Guild) -> int:
+        """The configured log channel id, else the fallback channel's id, else 0."""
+        try:
+            channel_id = await storage.log_channel_id(guild.id)
+            if channel_id:
+                return int(channel_id)
+        except (aiosqlite.Error, TypeError, ValueError) as e:
+            logger.debug(f"No configured log channel for guild {guild.id}: {e}")
+
+        channel = discord.utils.get(guild.text_channels, name=FALLBACK_CHANNEL_NAME)
+        return channel.id if channel else 0
+
+    async def flush(self, entries=None) -> int:
+        entries = list(entries or ())
+        while not self._queue.empty():
+            entries.append(self._queue.get_nowait())
+        if not entries:
+            return 0
+
+        by_channel = defaultdict(list)
+        for entry in entries:
+            guild = self.bot.get_guild(entry["guild_id"]) if entry["guild_id"] else None
+            channel = await self.destination(guild) if guild else None
+            if channel:
+                by_channel[channel].append(entry)
+
+        for channel, channel_entries in by_channel.items():
+            for embeds in build_log_messages(channel_entries):
+                try:
+                    await outbound.submit(AUDIT, channel.send, embeds=embeds)
+                    self.sent_messages += 1
+                except (discord.Forbidden, discord.NotFound):
+                    self.failed_sends += 1
+                    self.invalidate(channel.guild.id)
+                    logger.warning(f"Cannot post command logs to channel {channel.id}; re-resolving next time.")
+                    break
+                except discord.HTTPException as e:
+                    self.failed_sends += 1
+                    logger.error(f"Failed to post command logs to channel {channel.id}: {e}")
+
+        return len(entries)
+
+    async def _run(self):
+        while True:
+            # Sleep until there is something to log, then let a window of records collect behind it
+            self._window = [await self._queue.get()]
+            await asyncio.sleep(self.flush_interval)
+
+            window, self._window = self._window, []
+            try:
+                await self.flush(window)
+            except Exception:
+                logger.exception("Failed to flush command logs.")
+
+    def start(self, bot):
+        self.bot = bot
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Audit log started (interval {self.flush_interval}s, queue {self._queue.maxsize}).")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        window, self._window = self._window, []
+        if self.bot is None or self.bot.is_closed():
+            if window or len(self):
+                logger.info(f"Audit log stopped; discarded {len(window) + len(self)} record(s) after disconnect.")
+            return
+
+        flushed = await self.flush(window)
+        logger.info(f"Audit log stopped; flushed {flushed} record(s).")
+
+    def stats(self):
+        return {
+            "queued": len(self) + len(self._window),
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "sent_messages": self.sent_messages,
+            "failed_sends": self.failed_sends,
+        }
+
+
+def format_entry(entry) -> str:
+    line = f"<t:{entry['timestamp']}:T> `/{entry['command']}` — {entry['user']} in {entry['channel']}"
+    if entry["options"]:
+        line += f"\n> {entry['options']}"
+    return line
+
+
+def build_log_messages(entries):
+    """Packs entries into messages of up to ten embeds, staying inside Discord's description and message limits."""
+    descriptions = []
+    current = ""
+    for entry in entries:
+        line = format_entry(entry)
+        if current and len(current) + len(line) + 1 > DESCRIPTION_MAX:
+            descriptions.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        descriptions.append(current)
+
+    messages = []
+    embeds = []
+    size = 0
+    for description in descriptions:
+        if embeds and (size + len(description) > MESSAGE_MAX or len(embeds) == EMBEDS_PER_MESSAGE):
+            messages.append(embeds)
+            embeds = []
+            size = 0
+
+        embed = discord.Embed(title="Command Log", description=description, color=discord.Color.blue())
+        embed.timestamp = discord.utils.utcnow()
+        embeds.append(embed)
+        size += len(description) + len(embed.title)
+
+    if embeds:
+        messages.append(embeds)
+    return messages
+
+
+audit_log = AuditLog()
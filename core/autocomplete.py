@@ -1,9 +1,8 @@
 import os
-import aiosqlite
 import logging
 
 from discord import app_commands, Interaction
-from config import DB_PATH
+from core.database import db, partitions, PARTITIONED_TABLES
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Logging Configuration
@@ -37,10 +36,13 @@ async def cog_autocomplete(interaction: Interaction, current: str):
 async def table_name_autocomplete(interaction: Interaction, current: str):
     """Suggests table names from the SQLite database."""
     try:
-        async with aiosqlite.connect(DB_PATH()) as conn:
+        async with db.reader() as conn:
             cursor = await conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
             tables = [row[0] for row in await cursor.fetchall()]
 
+        if partitions.enabled:
+            tables = sorted(set(tables) | set(PARTITIONED_TABLES))
+
         filtered = [
             app_commands.Choice(name=table, value=table)
             for table in tables if current.lower() in table.lower()
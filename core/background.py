@@ -0,0 +1,52 @@
+import asyncio
+import logging
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Background Tasks
+# ---------------------------------------------------------------------------------------------------------------------
+class BackgroundTasks:
+    """Keeps strong references to fire-and-forget tasks and logs any that fail."""
+
+    def __init__(self):
+        self._tasks = set()
+        self.spawned = 0
+        self.failures = 0
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def spawn(self, coro, name: str = None) -> asyncio.Task:
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        self.spawned += 1
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+
+        exc = task.exception()
+        if exc is not None:
+            self.failures += 1
+            logger.error(f"Background task {task.get_name()} failed: {exc}", exc_info=exc)
+
+    async def drain(self, timeout: float = 10.0):
+        """Waits for outstanding tasks to finish, cancelling any still running after the timeout."""
+        if not self._tasks:
+            return
+
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        logger.info(f"Drained background tasks: {len(done)} finished, {len(pending)} cancelled.")
+
+
+background = BackgroundTasks()
@@ -0,0 +1,96 @@
+import time
+
+from collections import OrderedDict
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# LRU Cache
+# ---------------------------------------------------------------------------------------------------------------------
+class LRUCache:
+    """A size-bounded mapping that evicts the least recently used key once it is full."""
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# TTL Cache
+# ---------------------------------------------------------------------------------------------------------------------
+class TTLCache(LRUCache):
+    """An LRUCache whose entries also expire a fixed number of seconds after they were stored."""
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.clock = clock
+
+    def __contains__(self, key):
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > self.clock()
+
+    def get(self, key, default=None):
+        entry = super().get(key)
+        if entry is None:
+            return default
+
+        value, expires = entry
+        if expires <= self.clock():
+            del self._data[key]
+            self.hits -= 1
+            self.misses += 1
+            return default
+        return value
+
+    def put(self, key, value, ttl: float = None):
+        super().put(key, (value, self.clock() + (self.ttl if ttl is None else ttl)))
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
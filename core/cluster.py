@@ -0,0 +1,295 @@
+import os
+import json
+import math
+import time
+import asyncio
+import logging
+import itertools
+
+from core.background import background
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Cluster Settings
+# ---------------------------------------------------------------------------------------------------------------------
+DEFAULT_SOCKET_PATH = os.path.join("data", "cluster.sock")
+STREAM_LIMIT = 16 * 1024 * 1024
+REPORT_INTERVAL = 15.0
+REQUEST_TIMEOUT = 2.0
+RECONNECT_DELAY = 1.0
+RECONNECT_DELAY_MAX = 30.0
+BROADCAST_CHUNK = 1000
+
+
+def encode(message) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line: bytes):
+    return json.loads(line)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Coordinator
+# ---------------------------------------------------------------------------------------------------------------------
+class Coordinator:
+    """
+    Local hub for a cluster of bot processes, served on a Unix socket by the launcher.
+
+    Messages are JSON objects, one per line. Workers send a hello with their cluster id, then periodic reports of
+    their guild and user counts. The coordinator answers aggregate requests from those reports and relays
+    broadcast events to every other worker. It keeps no state worth persisting and is never in a request's
+    critical path: a worker that cannot reach it carries on alone.
+    """
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, expected: int = 0):
+        self.path = path
+        self.expected = expected
+        self._server = None
+        self._writers = {}
+        self._reports = {}
+
+        self.relayed = 0
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Left behind by a previous launcher
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path, limit=STREAM_LIMIT)
+        logger.info(f"Cluster coordinator listening on {self.path} for {self.expected} process(es).")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers.values()):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def aggregate(self):
+        processes = {}
+        for cluster_id, report in sorted(self._reports.items()):
+            processes[str(cluster_id)] = dict(report, connected=cluster_id in self._writers)
+
+        connected = [report for cluster_id, report in self._reports.items() if cluster_id in self._writers]
+        return {
+            "expected": self.expected,
+            "connected": len(self._writers),
+            "guilds": sum(report.get("guilds", 0) for report in connected),
+            "users": sum(report.get("users", 0) for report in connected),
+            "shards": sum(len(report.get("shards", ())) for report in connected),
+            "processes": processes,
+        }
+
+    async def _send(self, writer, message):
+        try:
+            writer.write(encode(message))
+            await writer.drain()
+        except (ConnectionError, RuntimeError):
+            pass  # The reader loop notices the disconnect and cleans up
+
+    async def _handle(self, reader, writer):
+        cluster_id = None
+        try:
+            while line := await reader.readline():
+                message = decode(line)
+                op = message.get("op")
+
+                if op == "hello":
+                    cluster_id = message["cluster"]
+                    self._writers[cluster_id] = writer
+                    logger.info(f"Cluster process {cluster_id} connected.")
+
+                elif op == "report":
+                    self._reports[cluster_id] = dict(message["stats"], updated=time.time())
+
+                elif op == "aggregate":
+                    await self._send(writer, {"op": "reply", "id": message["id"], "result": self.aggregate()})
+
+                elif op == "broadcast":
+                    self.relayed += 1
+                    event = {"op": "event", "event": message["event"], "data": message.get("data"),
+                             "origin": cluster_id}
+                    await asyncio.gather(*(
+                        self._send(other, event) for other_id, other in list(self._writers.items())
+                        if other_id != cluster_id
+                    ))
+
+        except (ConnectionError, ValueError, KeyError) as e:
+            logger.warning(f"Dropping cluster connection from process {cluster_id}: {e}")
+        finally:
+            if cluster_id is not None and self._writers.get(cluster_id) is writer:
+                del self._writers[cluster_id]
+                logger.warning(f"Cluster process {cluster_id} disconnected.")
+            writer.close()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Cluster Client
+# ---------------------------------------------------------------------------------------------------------------------
+class ClusterClient:
+    """
+    A bot process's link to the coordinator.
+
+    Outside cluster mode (no CLUSTER_SOCKET in the environment), or while the coordinator is unreachable,
+    broadcasts are no-ops and aggregate() returns None. Callers then fall back to their local numbers.
+    """
+
+    def __init__(self, cluster_id=None, path=None):
+        self.cluster_id = cluster_id
+        self.path = path
+        self.bot = None
+
+        self._handlers = {}
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._writer = None
+        self._task = None
+        self._report_task = None
+
+        self.received = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    def on(self, event: str, handler):
+        """Registers the coroutine called with the data of every event broadcast by another process."""
+        self._handlers[event] = handler
+
+    def off(self, event: str):
+        self._handlers.pop(event, None)
+
+    def start(self, bot):
+        self.bot = bot
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._report_task, self._task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._report_task = None
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def broadcast(self, event: str, data=None):
+        """Sends an event to every other process; a no-op outside cluster mode."""
+        if not self.connected:
+            return
+        try:
+            await self._send({"op": "broadcast", "event": event, "data": data})
+        except ConnectionError as e:
+            logger.warning(f"Failed to broadcast {event!r} to the cluster: {e}")
+
+    async def broadcast_chunks(self, event: str, items):
+        """Broadcasts a long list in several events, keeping each line a reasonable size."""
+        for start in range(0, len(items), BROADCAST_CHUNK):
+            await self.broadcast(event, items[start:start + BROADCAST_CHUNK])
+
+    async def aggregate(self):
+        """Cluster-wide totals from the coordinator, or None if they are not available."""
+        if not self.connected:
+            return None
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._send({"op": "aggregate", "id": request_id})
+            return await asyncio.wait_for(future, timeout=REQUEST_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
+        finally:
+            self._pending.pop(request_id, None)
+
+    def local_stats(self):
+        bot = self.bot
+        shards = getattr(bot, "shards", None) or {}
+        return {
+            "guilds": len(bot.guilds),
+            "users": sum(len(guild.members) for guild in bot.guilds),
+            "shards": sorted(shards),
+            "latency_ms": round(bot.latency * 1000) if math.isfinite(bot.latency) else None,
+            "pid": os.getpid(),
+        }
+
+    async def _send(self, message):
+        self._writer.write(encode(message))
+        await self._writer.drain()
+
+    async def _run(self):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self.path, limit=STREAM_LIMIT)
+                await self._send({"op": "hello", "cluster": self.cluster_id})
+                logger.info(f"Connected to cluster coordinator as process {self.cluster_id}.")
+                delay = RECONNECT_DELAY
+
+                self._report_task = asyncio.create_task(self._report())
+                while line := await reader.readline():
+                    await self._dispatch(decode(line))
+
+            except (ConnectionError, FileNotFoundError, ValueError) as e:
+                logger.warning(f"Cluster coordinator unavailable ({e}); retrying in {delay:.0f}s.")
+            finally:
+                if self._report_task is not None:
+                    self._report_task.cancel()
+                    self._report_task = None
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_DELAY_MAX)
+
+    async def _report(self):
+        while True:
+            if self.bot is not None and self.bot.is_ready():
+                await self._send({"op": "report", "stats": self.local_stats()})
+            await asyncio.sleep(REPORT_INTERVAL)
+
+    async def _dispatch(self, message):
+        op = message.get("op")
+        if op == "reply":
+            future = self._pending.get(message["id"])
+            if future is not None and not future.done():
+                future.set_result(message["result"])
+
+        elif op == "event":
+            self.received += 1
+            handler = self._handlers.get(message["event"])
+            if handler is not None:
+                # Handlers run off the read loop so a slow one cannot hold up replies
+                background.spawn(self._handle_event(handler, message), name=f"cluster-{message['event']}")
+
+    async def _handle_event(self, handler, message):
+        try:
+            await handler(message.get("data"))
+        except Exception:
+            logger.exception(f"Cluster event handler for {message['event']!r} failed.")
+
+
+def _cluster_id():
+    value = os.getenv("CLUSTER_ID")
+    return int(value) if value is not None else None
+
+
+cluster = ClusterClient(_cluster_id(), os.getenv("CLUSTER_SOCKET"))
@@ -0,0 +1,198 @@
+import time
+import zlib
+import asyncio
+import logging
+import aiosqlite
+
+from contextlib import asynccontextmanager
+
+from core.db_config import DB_PATH, DB_PARTITION_PATHS
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Connection Settings
+# ---------------------------------------------------------------------------------------------------------------------
+READER_COUNT = 4
+PARTITION_READER_COUNT = 2
+
+# Tables whose rows are keyed by guild and move to the partition files in partitioned mode
+PARTITIONED_TABLES = ("item_stats", "user_totals", "active_drops")
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 134217728",
+    "PRAGMA foreign_keys = ON",
+)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Database Pool
+# ---------------------------------------------------------------------------------------------------------------------
+class DatabasePool:
+    """A bounded pool of long-lived aiosqlite connections: one writer and N readers."""
+
+    def __init__(self, path, readers: int = READER_COUNT):
+        self.path = path
+        self.reader_count = max(1, readers)
+
+        self._writer = None
+        self._writer_lock = asyncio.Lock()
+        self._readers = asyncio.Queue()
+        self._all = []
+        self._open_lock = asyncio.Lock()
+        self._opened = False
+
+        self.checkouts = {"reader": 0, "writer": 0}
+        self.wait_time = {"reader": 0.0, "writer": 0.0}
+        self.max_wait = {"reader": 0.0, "writer": 0.0}
+
+    async def _connect(self, isolation_level: str = ""):
+        conn = await aiosqlite.connect(self.path, isolation_level=isolation_level)
+        for pragma in PRAGMAS:
+            await conn.execute(pragma)
+        self._all.append(conn)
+        return conn
+
+    async def open(self):
+        async with self._open_lock:
+            if self._opened:
+                return
+
+            # Take the write lock when a transaction starts, so writers in other processes queue on busy_timeout
+            # instead of failing with SQLITE_BUSY when a deferred transaction tries to upgrade
+            self._writer = await self._connect(isolation_level="IMMEDIATE")
+            for _ in range(self.reader_count):
+                self._readers.put_nowait(await self._connect())
+
+            self._opened = True
+            logger.info(f"Opened database pool at {self.path} (1 writer, {self.reader_count} readers)")
+
+    async def close(self):
+        async with self._open_lock:
+            if not self._opened:
+                return
+
+            async with self._writer_lock:
+                for conn in self._all:
+                    try:
+                        await conn.close()
+                    except Exception:
+                        logger.exception("Error closing pooled connection.")
+
+            self._all.clear()
+            self._readers = asyncio.Queue()
+            self._writer = None
+            self._opened = False
+            logger.info("Closed database pool.")
+
+    def _record(self, kind, started):
+        waited = time.perf_counter() - started
+        self.checkouts[kind] += 1
+        self.wait_time[kind] += waited
+        if waited > self.max_wait[kind]:
+            self.max_wait[kind] = waited
+
+    @asynccontextmanager
+    async def reader(self):
+        """Borrow a read-only connection. Never commit on it."""
+        if not self._opened:
+            await self.open()
+
+        started = time.perf_counter()
+        conn = await self._readers.get()
+        self._record("reader", started)
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def writer(self):
+        """Borrow the single writer connection. Uncommitted work is rolled back on error."""
+        if not self._opened:
+            await self.open()
+
+        started = time.perf_counter()
+        async with self._writer_lock:
+            self._record("writer", started)
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
+    def stats(self):
+        """Returns checkout counts and wait times (in ms) for monitoring."""
+        result = {"readers_idle": self._readers.qsize(), "readers_total": self.reader_count}
+        for kind in ("reader", "writer"):
+            count = self.checkouts[kind]
+            result[f"{kind}_checkouts"] = count
+            result[f"{kind}_wait_avg_ms"] = round(self.wait_time[kind] / count * 1000, 3) if count else 0.0
+            result[f"{kind}_wait_max_ms"] = round(self.max_wait[kind] * 1000, 3)
+        return result
+
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Partitions
+# ---------------------------------------------------------------------------------------------------------------------
+def partition_index(guild_id: int, count: int) -> int:
+    """Stable guild -> partition mapping; crc32 rather than hash() so it is the same in every process."""
+    if count <= 1:
+        return 0
+    return zlib.crc32(int(guild_id).to_bytes(8, "big")) % count
+
+
+class PartitionSet:
+    """
+    Where the guild-keyed tables live.
+
+    By default that is the main pool, and everything behaves as a single database. With DB_PARTITIONS set, each
+    guild's item_stats and active_drops rows live in one of K files chosen by hashing its id. Each file has its own
+    writer, so drop bursts in different guilds no longer queue on one write lock. user_totals is kept per
+    partition too, and global views merge the per-partition summaries.
+    """
+
+    def __init__(self, main: DatabasePool, paths=()):
+        self.main = main
+        self.pools = [DatabasePool(path, readers=PARTITION_READER_COUNT) for path in paths] or [main]
+
+    def __len__(self):
+        return len(self.pools)
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.pools) > 1
+
+    def index_for(self, guild_id: int) -> int:
+        return partition_index(guild_id, len(self.pools))
+
+    def for_guild(self, guild_id: int) -> DatabasePool:
+        return self.pools[self.index_for(guild_id)]
+
+    def split(self, items, guild_of=lambda item: item[0]):
+        """Groups items by the pool that owns their guild, preserving order within each group."""
+        groups = {}
+        for item in items:
+            groups.setdefault(self.for_guild(guild_of(item)), []).append(item)
+        return groups
+
+    async def close(self):
+        for pool in self.pools:
+            if pool is not self.main:
+                await pool.close()
+
+    def stats(self):
+        return [pool.stats() for pool in self.pools]
+
+
+db = DatabasePool(DB_PATH)
+partitions = PartitionSet(db, DB_PARTITION_PATHS)
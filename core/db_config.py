@@ -0,0 +1,21 @@
+import os
+
+from dotenv import load_dotenv
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Database Settings
+# ---------------------------------------------------------------------------------------------------------------------
+# Kept apart from config.py, which configures logging and builds the bot on import, so offline tools such as
+# repartition.py can read these without touching the running bot's log file
+load_dotenv(".env")
+
+DB_DIR = os.path.join('data', 'databases')
+DB_PATH = os.path.join(DB_DIR, 'collector.db')
+
+# Optional: spread item_stats, user_totals and active_drops across this many files, keyed by guild
+DB_PARTITIONS = int(os.getenv("DB_PARTITIONS", 0))
+DB_PARTITION_PATHS = [os.path.join(DB_DIR, f'collector-p{index}.db') for index in range(DB_PARTITIONS)] \
+    if DB_PARTITIONS > 1 else []
+
+# Where settings, drops and stats live: "sqlite" (default) or "memory" for tests and benchmarks
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
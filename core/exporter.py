@@ -0,0 +1,228 @@
+import math
+import logging
+
+from aiohttp import web
+
+from config import METRICS_HOST, METRICS_PORT
+from core import metrics
+from core.metrics import HISTOGRAM_BUCKETS
+from core.database import db, partitions
+from core.storage import storage
+from core.outbound import outbound, CLASS_NAMES
+from core.audit import audit_log
+from core.stats_buffer import stats_buffer
+from core.cluster import cluster
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Exporter Settings
+# ---------------------------------------------------------------------------------------------------------------------
+PREFIX = "collector"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Families without an entry here are published with a TYPE line only
+HELP = {
+    "drops_posted_total": "Drops sent to a channel, by rarity.",
+    "drops_settled_total": "Drops claimed or destroyed, counting only the click that won.",
+    "cleanup_drops_total": "Expired drop messages handled by cleanup, by result.",
+    "cleanup_backlog": "Expired drops found by the shard's most recent cleanup pass.",
+    "active_drops": "Rows in active_drops, open or settled, that cleanup has not removed yet.",
+    "rest_rate_limited_total": "429 responses from the Discord API by route, including the ones the library retried.",
+    "gateway_latency_seconds": "Heartbeat round trip per shard.",
+    "guilds": "Guilds this process can see.",
+    "db_query_seconds": "Storage operation duration, by method.",
+    "drop_tick_seconds": "Time to send and record every drop due on a shard's tick.",
+    "drop_send_seconds": "Time for one drop message to be sent, including queueing behind the send limiter.",
+    "claim_handler_seconds": "Claim button handler duration.",
+    "claim_click_to_edit_seconds": "Time from a claim click to the drop message being edited.",
+    "destroy_handler_seconds": "Destroy button handler duration.",
+    "destroy_click_to_edit_seconds": "Time from a destroy click to the drop message being edited.",
+    "db_checkouts_total": "Database connections borrowed, by pool and kind.",
+    "db_checkout_wait_seconds_total": "Time spent waiting to borrow a database connection.",
+    "cache_hits_total": "Cache lookups that found their key.",
+    "cache_misses_total": "Cache lookups that did not.",
+    "cache_evictions_total": "Entries evicted to stay within the cache's size.",
+    "cache_entries": "Entries currently held.",
+    "outbound_queued": "REST calls waiting for an outbound slot, by class.",
+    "outbound_in_flight": "REST calls holding an outbound slot, by class.",
+    "outbound_dispatched_total": "REST calls released by the outbound scheduler, by class.",
+    "audit_queued": "Command usage entries waiting to be posted to log channels.",
+    "audit_dropped_total": "Command usage entries dropped because the audit queue was full.",
+    "stats_buffer_flushes_total": "Stat buffer flushes written to the database.",
+    "stats_buffer_rows_flushed_total": "Rows written by stat buffer flushes.",
+}
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if math.isnan(value):
+            return "NaN"
+        return repr(value)
+    return str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(str(value))}"' for label, value in pairs) + "}"
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Text Format
+# ---------------------------------------------------------------------------------------------------------------------
+class MetricFamilies:
+    """Collects samples by family, since the text format needs each family's samples under one TYPE line."""
+
+    def __init__(self):
+        self._families = {}
+
+    def add(self, name: str, kind: str, value, labels=(), suffix: str = ""):
+        _, samples = self._families.setdefault(name, (kind, []))
+        samples.append(f"{PREFIX}_{name}{suffix}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name: str, recorder, labels=()):
+        cumulative = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS + (math.inf,), recorder.buckets):
+            cumulative += count
+            self.add(name, "histogram", cumulative, tuple(labels) + (("le", _number(bound)),), "_bucket")
+        self.add(name, "histogram", recorder.total, labels, "_sum")
+        self.add(name, "histogram", recorder.count, labels, "_count")
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, samples) in self._families.items():
+            if name in HELP:
+                lines.append(f"# HELP {PREFIX}_{name} {HELP[name]}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Metrics Exporter
+# ---------------------------------------------------------------------------------------------------------------------
+class MetricsExporter:
+    """
+    Serves /metrics in the Prometheus text format from a small aiohttp server of its own.
+
+    Everything is read at scrape time from the registry in core.metrics and from the singletons that already keep
+    counts for /stats, so the bot pays nothing for the endpoint between scrapes. It is off unless METRICS_PORT is
+    set, and a port that cannot be bound is logged and skipped rather than stopping the bot.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port=None):
+        self.host = host
+        self.port = port
+        self.bot = None
+        self._runner = None
+
+        self.scrapes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.port is not None
+
+    async def start(self, bot):
+        self.bot = bot
+        if not self.enabled or self._runner is not None:
+            return
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as e:
+            logger.error(f"Metrics exporter could not listen on {self.host}:{self.port}: {e}")
+            await runner.cleanup()
+            return
+
+        self._runner = runner
+        logger.info(f"Metrics exporter listening on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request):
+        self.scrapes += 1
+        try:
+            body = await self.render()
+        except Exception:
+            logger.exception("Failed to render metrics.")
+            raise web.HTTPInternalServerError()
+        return web.Response(body=body.encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def render(self) -> str:
+        families = MetricFamilies()
+
+        for (name, labels), value in metrics.counters():
+            families.add(f"{name}_total", "counter", value, labels)
+        for (name, labels), value in metrics.gauges():
+            families.add(name, "gauge", value, labels)
+        for (name, labels), recorder in metrics.latencies():
+            families.histogram(f"{name}_seconds", recorder, labels)
+
+        try:
+            families.add("active_drops", "gauge", await storage.active_drop_count())
+        except Exception as e:
+            logger.warning(f"Metrics scrape could not count active drops: {e}")
+
+        if self.bot is not None:
+            families.add("guilds", "gauge", len(self.bot.guilds))
+            for shard_id, seconds in self.bot.latencies:
+                if math.isfinite(seconds):
+                    families.add("gateway_latency_seconds", "gauge", seconds, (("shard", shard_id),))
+
+        pools = [("main", db)]
+        if partitions.enabled:
+            pools += [(f"p{index}", pool) for index, pool in enumerate(partitions.pools)]
+        for pool_name, pool in pools:
+            for kind in ("reader", "writer"):
+                labels = (("pool", pool_name), ("kind", kind))
+                families.add("db_checkouts_total", "counter", pool.checkouts[kind], labels)
+                families.add("db_checkout_wait_seconds_total", "counter", pool.wait_time[kind], labels)
+
+        for cache_name, cache in metrics.caches():
+            labels = (("cache", cache_name),)
+            families.add("cache_hits_total", "counter", cache.hits, labels)
+            families.add("cache_misses_total", "counter", cache.misses, labels)
+            families.add("cache_evictions_total", "counter", cache.evictions, labels)
+            families.add("cache_entries", "gauge", len(cache), labels)
+
+        queues = outbound.stats()
+        for class_name in CLASS_NAMES:
+            labels = (("class", class_name),)
+            families.add("outbound_queued", "gauge", queues[class_name]["queued"], labels)
+            families.add("outbound_in_flight", "gauge", queues[class_name]["in_flight"], labels)
+            families.add("outbound_dispatched_total", "counter", queues[class_name]["dispatched"], labels)
+
+        audit = audit_log.stats()
+        families.add("audit_queued", "gauge", audit["queued"])
+        families.add("audit_dropped_total", "counter", audit["dropped"])
+        families.add("stats_buffer_flushes_total", "counter", stats_buffer.flushes)
+        families.add("stats_buffer_rows_flushed_total", "counter", stats_buffer.rows_flushed)
+
+        return families.render()
+
+
+def _port():
+    """In cluster mode each process gets its own port, offset from METRICS_PORT by its cluster id."""
+    if METRICS_PORT is None:
+        return None
+    return METRICS_PORT + (cluster.cluster_id or 0)
+
+
+exporter = MetricsExporter(METRICS_HOST, _port())
@@ -3,6 +3,10 @@ import logging
 
 from discord.ext import commands
 from core.utils import get_bio_settings
+from core.audit import audit_log
+from core.shards import shard_tracker
+from core.cluster import cluster
+from core.exporter import exporter
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Logging Configuration
@@ -18,6 +22,49 @@ class BotCore(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        audit_log.start(self.bot)
+        cluster.start(self.bot)
+        await exporter.start(self.bot)
+
+    async def cog_unload(self):
+        await exporter.stop()
+        await cluster.stop()
+        await audit_log.stop()
+
+    # Cached log destinations follow channel changes
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        audit_log.invalidate(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        audit_log.invalidate(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if before.name != after.name:
+            audit_log.invalidate(after.guild.id)
+
+    # Shard state for /stats
+    @commands.Cog.listener()
+    async def on_shard_connect(self, shard_id):
+        shard_tracker.mark(shard_id, "connected")
+
+    @commands.Cog.listener()
+    async def on_shard_ready(self, shard_id):
+        shard_tracker.mark(shard_id, "ready")
+        logger.info(f"Shard {shard_id} ready.")
+
+    @commands.Cog.listener()
+    async def on_shard_resumed(self, shard_id):
+        shard_tracker.mark(shard_id, "resumed")
+
+    @commands.Cog.listener()
+    async def on_shard_disconnect(self, shard_id):
+        shard_tracker.mark(shard_id, "disconnected")
+        logger.warning(f"Shard {shard_id} disconnected.")
+
     @commands.Cog.listener()
     async def on_ready(self):
         print(f'Logged on as {self.bot.user}...')
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+
+from core.cache import LRUCache
+from core.metrics import track_cache
+from core.storage import storage, STAT_COLUMNS
+from core.stats_buffer import stats_buffer
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Leaderboard Settings
+# ---------------------------------------------------------------------------------------------------------------------
+LEADERBOARD_SIZE = 10
+LEADERBOARD_SLACK = 15
+GUILD_BOARDS_MAX = 1000
+
+# Metric name -> column, shared by item_stats and user_totals
+METRICS = {
+    "collected": "items_collected",
+    "destroyed": "items_destroyed",
+    "rare": "rare_drops_claimed",
+}
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Top-K
+# ---------------------------------------------------------------------------------------------------------------------
+class TopK:
+    """
+    The K highest scores offered so far.
+
+    Collection counts only ever go up, so a user who falls out can only get back in through a later offer with
+    their new total. That keeps the set exact without ever looking at the users below it. Callers keep K above
+    what they display so users just below the cut can still be bumped between offers.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._scores = {}
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, user_id):
+        return user_id in self._scores
+
+    def offer(self, user_id: int, score: int):
+        if user_id in self._scores or len(self._scores) < self.k:
+            self._scores[user_id] = score
+            return
+
+        lowest = min(self._scores, key=self._scores.get)
+        if score > self._scores[lowest]:
+            del self._scores[lowest]
+            self._scores[user_id] = score
+
+    def bump(self, user_id: int, amount: int = 1):
+        if user_id in self._scores:
+            self._scores[user_id] += amount
+
+    def top(self, limit: int = None):
+        return sorted(self._scores.items(), key=lambda row: (-row[1], row[0]))[:limit]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Leaderboards
+# ---------------------------------------------------------------------------------------------------------------------
+class Leaderboards:
+    """Global and per-guild top-K boards, loaded lazily from the ranking indexes and kept current in memory."""
+
+    def __init__(self, k: int = LEADERBOARD_SIZE, slack: int = LEADERBOARD_SLACK,
+                 guild_boards: int = GUILD_BOARDS_MAX):
+        self.k = k
+        self.capacity = k + slack
+        self._global = None
+        self._guilds = track_cache("leaderboards", LRUCache(guild_boards))
+        self._load_lock = asyncio.Lock()
+
+    async def top(self, guild_id: int = None, limit: int = None):
+        """(user_id, items_collected) pairs, highest first, for one guild or (with None) globally."""
+        board = self._global if guild_id is None else self._guilds.get(guild_id)
+        if board is None:
+            board = await self._load(guild_id)
+        return board.top(limit or self.k)
+
+    async def _load(self, guild_id):
+        async with self._load_lock:
+            board = self._global if guild_id is None else self._guilds.get(guild_id)
+            if board is not None:
+                return board
+
+            rows = await storage.top("items_collected", self.capacity, guild_id)
+
+            pending = stats_buffer.pending_by_user(guild_id)
+            board = TopK(self.capacity)
+            for user_id, total in rows:
+                board.offer(user_id, (total or 0) + pending.get(user_id, (0,))[0])
+
+            if guild_id is None:
+                self._global = board
+            else:
+                self._guilds.put(guild_id, board)
+            return board
+
+    def record_claim(self, guild_id: int, user_id: int, amount: int = 1):
+        """Bumps users already on a loaded board; anyone else is picked up by the next flush."""
+        if self._global is not None:
+            self._global.bump(user_id, amount)
+
+        board = self._guilds.get(guild_id)
+        if board is not None:
+            board.bump(user_id, amount)
+
+    async def on_flush(self, batch):
+        """Re-offers every user whose collected count was just written, using their stored totals."""
+        by_guild = {}
+        for (guild_id, user_id), deltas in batch.items():
+            if deltas[0]:
+                by_guild.setdefault(guild_id, set()).add(user_id)
+        if not by_guild:
+            return
+
+        if self._global is not None:
+            totals = await storage.stat_values("items_collected", set().union(*by_guild.values()))
+            pending = stats_buffer.pending_by_user()
+            for user_id, total in totals.items():
+                self._global.offer(user_id, total + pending.get(user_id, (0,))[0])
+
+        for guild_id, users in by_guild.items():
+            board = self._guilds.get(guild_id)
+            if board is None:
+                continue
+
+            pending = stats_buffer.pending_by_user(guild_id)
+            totals = await storage.stat_values("items_collected", users, guild_id)
+            for user_id, total in totals.items():
+                board.offer(user_id, total + pending.get(user_id, (0,))[0])
+
+    async def page(self, guild_id: int = None, metric: str = "collected", after=None, limit: int = LEADERBOARD_SIZE):
+        """
+        One page of (user_id, value) rows ordered by value then user id, for one guild or (with None) globally.
+
+        Values are stored totals plus unflushed deltas, on every page, so consecutive pages never overlap or skip
+        a user. `after` is the (value, user_id) of the last row on the previous page, and pages are found by
+        seeking from that key rather than by offset. Users with pending deltas can only move up, so the seek
+        reads one extra row per such user and their own values are fetched by primary key and merged in. With
+        nothing pending, the first page by collected comes straight from the in-memory board.
+        """
+        column = METRICS[metric]
+        index = STAT_COLUMNS.index(column)
+        pending = {user_id: deltas[index] for user_id, deltas in stats_buffer.pending_by_user(guild_id).items()
+                   if deltas[index]}
+
+        if not pending:
+            if metric == "collected" and after is None and limit <= self.capacity:
+                return await self.top(guild_id, limit)
+            return await storage.page(column, after, limit, guild_id)
+
+        rows = await storage.page(column, after, limit + len(pending), guild_id)
+        stored = await storage.stat_values(column, pending, guild_id)
+
+        merged = {user_id: value for user_id, value in rows if user_id not in pending}
+        for user_id, delta in pending.items():
+            merged[user_id] = stored.get(user_id, 0) + delta
+
+        ordered = sorted(merged.items(), key=lambda row: (-row[1], row[0]))
+        if after is not None:
+            ordered = [row for row in ordered if (-row[1], row[0]) > (-after[0], after[1])]
+        return ordered[:limit]
+
+    async def rank(self, user_id: int, guild_id: int = None, metric: str = "collected"):
+        """(rank, value) for one user, or None if they have no row."""
+        return await storage.rank(METRICS[metric], user_id, guild_id)
+
+    def invalidate(self):
+        """Forgets every board; the next lookup reloads from the database."""
+        self._global = None
+        self._guilds.clear()
+
+    async def rebuild(self):
+        """Recomputes user_totals from item_stats, for use after either table has been reset or dropped."""
+        await storage.rebuild_totals()
+        self.invalidate()
+        logger.info("Rebuilt user_totals from item_stats.")
+
+
+leaderboards = Leaderboards()
@@ -0,0 +1,167 @@
+import re
+import time
+import logging
+import aiohttp
+
+from bisect import bisect_left
+from collections import deque, defaultdict
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Metric Settings
+# ---------------------------------------------------------------------------------------------------------------------
+# Histogram bucket upper bounds in seconds, Prometheus' defaults
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Latency Recorder
+# ---------------------------------------------------------------------------------------------------------------------
+class LatencyRecorder:
+    """
+    Keeps the most recent latency samples (in seconds) and reports percentiles over them.
+
+    Every sample is also counted into fixed histogram buckets that are never reset, which is what the metrics
+    exporter publishes: percentiles over a recent window suit /stats, cumulative buckets suit a scraper.
+    """
+
+    def __init__(self, size: int = 2048):
+        self._samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        # One slot per bound in HISTOGRAM_BUCKETS, then one for +Inf
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect_left(HISTOGRAM_BUCKETS, seconds)] += 1
+
+    def time(self):
+        return _Timer(self)
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(50) * 1000, 1),
+            "p99_ms": round(self.percentile(99) * 1000, 1),
+        }
+
+
+class _Timer:
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.observe(time.perf_counter() - self.started)
+        return False
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------------------------------------------------
+# Every metric is keyed by (name, labels), with labels a sorted tuple of (label, value) pairs
+_latencies = {}
+_counters = defaultdict(int)
+_gauges = {}
+_caches = {}
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def latency(name: str, **labels) -> LatencyRecorder:
+    key = _key(name, labels)
+    recorder = _latencies.get(key)
+    if recorder is None:
+        recorder = _latencies[key] = LatencyRecorder()
+    return recorder
+
+
+def increment(name: str, amount: float = 1, **labels):
+    _counters[_key(name, labels)] += amount
+
+
+def set_gauge(name: str, value: float, **labels):
+    _gauges[_key(name, labels)] = value
+
+
+def track_cache(name: str, cache):
+    """Publishes an LRUCache's hit, miss and eviction counts under this name."""
+    _caches[name] = cache
+    return cache
+
+
+def latency_summaries() -> dict:
+    summaries = {}
+    for (name, labels), recorder in _latencies.items():
+        if labels:
+            name += ":" + ",".join(value for _, value in labels)
+        summaries[name] = recorder.summary()
+    return summaries
+
+
+def latencies():
+    return _latencies.items()
+
+
+def counters():
+    return _counters.items()
+
+
+def gauges():
+    return _gauges.items()
+
+
+def caches():
+    return _caches.items()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# REST Responses
+# ---------------------------------------------------------------------------------------------------------------------
+# Snowflakes, then the token that follows an interaction or webhook id
+_SNOWFLAKE = re.compile(r"/\d{15,21}(?=/|$)")
+_TOKEN = re.compile(r"/(interactions|webhooks)/\{id\}/[^/]+")
+_API_VERSION = re.compile(r"^/api/v\d+")
+
+
+def route_template(path: str) -> str:
+    """Turns a request path into a bounded label, e.g. /channels/{id}/messages/{id}."""
+    path = _API_VERSION.sub("", path)
+    path = _SNOWFLAKE.sub("/{id}", path)
+    path = _TOKEN.sub(r"/\1/{id}/{token}", path)
+    return re.sub(r"/reactions/[^/]+", "/reactions/{emoji}", path)
+
+
+async def _on_request_end(session, context, params):
+    if params.response.status == 429:
+        scope = params.response.headers.get("X-RateLimit-Scope", "unknown")
+        increment("rest_rate_limited", method=params.method, route=route_template(params.url.path), scope=scope)
+
+
+def create_rest_trace() -> aiohttp.TraceConfig:
+    """Counts every 429 the library receives, including the ones it retries on its own, by route."""
+    trace = aiohttp.TraceConfig()
+    trace.on_request_end.append(_on_request_end)
+    return trace
+
+
+rest_trace = create_rest_trace()
@@ -0,0 +1,125 @@
+import asyncio
+import discord
+import logging
+
+from core.cache import TTLCache
+from core.metrics import track_cache
+from core.background import background
+from core.outbound import outbound, LOOKUP
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Name Cache Settings
+# ---------------------------------------------------------------------------------------------------------------------
+NAME_CACHE_MAX = 50_000
+NAME_TTL = 6 * 60 * 60
+MISSING_NAME_TTL = 10 * 60
+FETCH_CONCURRENCY = 5
+RESOLVE_DEADLINE = 1.5
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Name Resolver
+# ---------------------------------------------------------------------------------------------------------------------
+class NameResolver:
+    """
+    Resolves user ids to display names for rendering.
+
+    Guild members come straight from the gateway cache. Everyone else goes through a TTL cache and, on a miss,
+    a REST lookup. Lookups run concurrently and share in-flight requests. Any still running at the deadline are
+    shown as mentions, and they keep going so the next render finds them cached.
+    """
+
+    def __init__(self, maxsize: int = NAME_CACHE_MAX, ttl: float = NAME_TTL,
+                 concurrency: int = FETCH_CONCURRENCY, deadline: float = RESOLVE_DEADLINE):
+        self.deadline = deadline
+        self._cache = track_cache("user_names", TTLCache(maxsize, ttl))
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight = {}
+
+        self.fetches = 0
+        self.timeouts = 0
+
+    def remember(self, user: discord.abc.User):
+        self._cache.put(user.id, str(user))
+
+    def refresh(self, user: discord.abc.User):
+        """Updates a name only if it is already cached, so gateway traffic cannot flush useful entries."""
+        if user.id in self._cache:
+            self.remember(user)
+
+    def local_name(self, bot, guild: discord.Guild, user_id: int):
+        member = guild.get_member(user_id) if guild else None
+        if member:
+            return member.display_name
+
+        name = self._cache.get(user_id)
+        if name is not None:
+            return name
+
+        user = bot.get_user(user_id)
+        if user:
+            self.remember(user)
+            return str(user)
+        return None
+
+    async def resolve(self, bot, guild: discord.Guild, user_ids) -> dict:
+        """Maps every id to a name, using a mention for anyone not resolved within the deadline."""
+        names = {}
+        missing = []
+        for user_id in user_ids:
+            name = self.local_name(bot, guild, user_id)
+            if name is None:
+                missing.append(user_id)
+            else:
+                names[user_id] = name
+
+        if missing:
+            lookups = {user_id: self._lookup(bot, user_id) for user_id in missing}
+            done, pending = await asyncio.wait(set(lookups.values()), timeout=self.deadline)
+            self.timeouts += len(pending)
+
+            for user_id, task in lookups.items():
+                # A fetch that failed unexpectedly has already been logged by the background runner
+                name = None
+                if task in done and not task.cancelled() and task.exception() is None:
+                    name = task.result()
+                names[user_id] = name or f"<@{user_id}>"
+
+        return names
+
+    def _lookup(self, bot, user_id: int) -> asyncio.Task:
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = background.spawn(self._fetch(bot, user_id), name=f"fetch-user-{user_id}")
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        return task
+
+    async def _fetch(self, bot, user_id: int):
+        async with self._semaphore:
+            self.fetches += 1
+            try:
+                user = await outbound.submit(LOOKUP, bot.fetch_user, user_id)
+            except discord.NotFound:
+                # Deleted accounts would otherwise be fetched on every render
+                self._cache.put(user_id, f"<@{user_id}>", ttl=MISSING_NAME_TTL)
+                return None
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to fetch user {user_id}: {e}")
+                return None
+
+        self.remember(user)
+        return str(user)
+
+    def stats(self):
+        result = self._cache.stats()
+        result.update(inflight=len(self._inflight), fetches=self.fetches, timeouts=self.timeouts)
+        return result
+
+
+user_names = NameResolver()
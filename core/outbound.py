@@ -0,0 +1,127 @@
+import time
+import asyncio
+import logging
+
+from collections import deque
+from contextlib import asynccontextmanager
+
+from core.metrics import latency
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Priority Classes
+# ---------------------------------------------------------------------------------------------------------------------
+INTERACTION = 0
+DROP = 1
+ROLE = 2
+DELETE = 3
+AUDIT = 4
+LOOKUP = 5
+
+CLASS_NAMES = ("interaction", "drop", "role", "delete", "audit", "lookup")
+
+# Shared by the bulk classes. Interaction replies are uncapped (None): Discord's 3 second callback deadline does
+# not wait for a queue, so they only go through the scheduler to be counted. User lookups for leaderboard names
+# come last: a render that runs out of time shows mentions instead.
+MAX_IN_FLIGHT = 16
+CLASS_CAPS = (None, 10, 2, 3, 1, 2)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Outbound Scheduler
+# ---------------------------------------------------------------------------------------------------------------------
+class OutboundScheduler:
+    """
+    Orders outbound REST work by priority class.
+
+    Each capped class has its own FIFO queue and concurrency cap, and together they share a global limit. A free
+    slot always goes to the most urgent class that is under its cap. Uncapped classes (interaction replies) never
+    wait and do not count against the shared limit, so bulk work such as deletions or audit posts can queue up
+    without ever delaying a user-facing response, and a burst of clicks cannot back up behind each other.
+    """
+
+    def __init__(self, limit: int = MAX_IN_FLIGHT, caps=CLASS_CAPS):
+        self.limit = limit
+        self.caps = tuple(caps)
+
+        self._waiting = [deque() for _ in CLASS_NAMES]
+        self._in_flight = [0] * len(CLASS_NAMES)
+        self._total = 0
+
+        self.dispatched = [0] * len(CLASS_NAMES)
+        self._wait_latency = [latency(f"outbound_wait_{name}") for name in CLASS_NAMES]
+
+    def _has_room(self, priority: int) -> bool:
+        cap = self.caps[priority]
+        return cap is None or (self._total < self.limit and self._in_flight[priority] < cap)
+
+    def _reserve(self, priority: int):
+        self._in_flight[priority] += 1
+        if self.caps[priority] is not None:
+            self._total += 1
+        self.dispatched[priority] += 1
+
+    def _release(self, priority: int):
+        self._in_flight[priority] -= 1
+        if self.caps[priority] is not None:
+            self._total -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        for priority, waiting in enumerate(self._waiting):
+            while waiting and self._has_room(priority):
+                future = waiting.popleft()
+                if future.done():
+                    continue  # The waiter was cancelled
+                self._reserve(priority)
+                future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        """Holds one outbound slot of the given class for the duration of the block."""
+        started = time.perf_counter()
+        queued_ahead = any(self._waiting[p] for p in range(priority + 1))
+
+        if not queued_ahead and self._has_room(priority):
+            self._reserve(priority)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiting[priority].append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release(priority)  # Granted just as we were cancelled
+                raise
+
+        self._wait_latency[priority].observe(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    async def submit(self, priority: int, func, *args, **kwargs):
+        """Runs await func(*args, **kwargs) inside a slot of the given class and returns its result."""
+        async with self.slot(priority):
+            return await func(*args, **kwargs)
+
+    def stats(self):
+        result = {"in_flight": sum(self._in_flight)}
+        for priority, name in enumerate(CLASS_NAMES):
+            result[name] = {
+                "queued": sum(1 for future in self._waiting[priority] if not future.done()),
+                "in_flight": self._in_flight[priority],
+                "dispatched": self.dispatched[priority],
+                "wait_p99_ms": self._wait_latency[priority].summary()["p99_ms"],
+            }
+        return result
+
+    def queued(self) -> int:
+        return sum(len(waiting) for waiting in self._waiting)
+
+
+outbound = OutboundScheduler()
@@ -0,0 +1,142 @@
+import time
+import asyncio
+import discord
+import logging
+
+from core.storage import storage
+from core.background import background
+from core.outbound import outbound, ROLE
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------------------------------------------------
+RARE_ROLE_HOLDERS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS rare_role_holders (
+        guild_id INTEGER PRIMARY KEY,
+        role_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL
+    )
+'''
+
+# Minimum seconds between background passes that strip the role from stray holders in one guild
+RECONCILE_INTERVAL = 3600.0
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Rare Role Tracker
+# ---------------------------------------------------------------------------------------------------------------------
+class RareRoleTracker:
+    """
+    Remembers who holds each guild's rare role, so handing it on is one remove and one add.
+
+    Reassignments for a guild run one at a time in claim order. A reassignment that has already been superseded
+    by a newer claim is skipped, so a burst of rare claims costs two calls rather than two per claim. Holders that
+    only the member cache knows about (drift from manual edits or a lost record) are left to a separate pass, run
+    at most once per RECONCILE_INTERVAL per guild, so a reassignment never costs more than one remove and one add.
+    """
+
+    def __init__(self):
+        self._holders = {}
+        self._wanted = {}
+        self._locks = {}
+        self._reconciled_at = {}
+
+        self.reassignments = 0
+        self.superseded = 0
+        self.reconciled = 0
+
+    def assign(self, bot, guild: discord.Guild, member: discord.Member, role_id: int) -> asyncio.Task:
+        """Queues a reassignment off the interaction path and returns its task."""
+        self._wanted[guild.id] = member.id
+        return background.spawn(self._assign(bot, guild, member, role_id), name=f"rare-role-{guild.id}")
+
+    async def holder(self, guild_id: int, role_id: int):
+        """The user id recorded as holding role_id in this guild, or None."""
+        if guild_id not in self._holders:
+            self._holders[guild_id] = await storage.rare_role_holder(guild_id)
+
+        record = self._holders[guild_id]
+        return record[1] if record and record[0] == role_id else None
+
+    async def _assign(self, bot, guild: discord.Guild, member: discord.Member, role_id: int):
+        lock = self._locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            if self._wanted.get(guild.id) != member.id:
+                self.superseded += 1
+                return
+
+            role = guild.get_role(role_id)
+            if not role:
+                return
+
+            holder_id = await self.holder(guild.id, role_id)
+
+            try:
+                if holder_id is not None and holder_id != member.id:
+                    try:
+                        await outbound.submit(ROLE, bot.http.remove_role, guild.id, holder_id, role.id,
+                                              reason="Reassigned rare drop role")
+                    except discord.NotFound:
+                        pass  # Holder already left the guild
+
+                if not member.get_role(role.id):
+                    await outbound.submit(ROLE, member.add_roles, role, reason="Claimed rare drop")
+
+            except discord.Forbidden:
+                logger.warning(f"Missing permission to modify role {role.id} in guild {guild.id}")
+                return
+
+            await storage.set_rare_role_holder(guild.id, role.id, member.id)
+
+            self._holders[guild.id] = (role.id, member.id)
+            self.reassignments += 1
+            logger.info(f"Assigned rare role {role.id} to {member} in guild {guild.id}")
+
+        if self._wanted.get(guild.id) == member.id:
+            self._wanted.pop(guild.id, None)
+
+        # The member cache may not have seen the previous holder's removal yet
+        replaced = {member.id, holder_id}
+        if any(holder.id not in replaced for holder in role.members):
+            now = time.monotonic()
+            if now - self._reconciled_at.get(guild.id, -RECONCILE_INTERVAL) >= RECONCILE_INTERVAL:
+                self._reconciled_at[guild.id] = now
+                background.spawn(self.reconcile(bot, guild, role.id, exclude=replaced),
+                                 name=f"rare-role-reconcile-{guild.id}")
+
+    async def reconcile(self, bot, guild: discord.Guild, role_id: int, exclude=()):
+        """Removes the role from every cached member except the recorded holder, checking the holder per call."""
+        role = guild.get_role(role_id)
+        if not role:
+            return
+
+        for user_id in [holder.id for holder in role.members if holder.id not in exclude]:
+            record = self._holders.get(guild.id)
+            if record is None or record[0] != role_id or user_id in (record[1], self._wanted.get(guild.id)):
+                continue
+            try:
+                await outbound.submit(ROLE, bot.http.remove_role, guild.id, user_id, role_id,
+                                      reason="Removed stray rare drop role")
+                self.reconciled += 1
+            except discord.NotFound:
+                pass  # Already left the guild
+            except discord.Forbidden:
+                logger.warning(f"Missing permission to modify role {role_id} in guild {guild.id}")
+                return
+
+    def forget(self, guild_id: int):
+        self._holders.pop(guild_id, None)
+        self._wanted.pop(guild_id, None)
+        self._reconciled_at.pop(guild_id, None)
+        # A running reassignment still holds this lock; replacing it would let the next one run alongside
+        lock = self._locks.get(guild_id)
+        if lock is not None and not lock.locked():
+            del self._locks[guild_id]
+
+
+rare_roles = RareRoleTracker()
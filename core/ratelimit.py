@@ -0,0 +1,93 @@
+import time
+import asyncio
+import logging
+
+from core.cache import LRUCache
+from core.metrics import track_cache
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Rate Limit Settings
+# ---------------------------------------------------------------------------------------------------------------------
+# Kept under Discord's documented limits (50 requests/s globally, 5 messages per 5s per channel) so the
+# library's own 429 handling stays a fallback rather than the normal path.
+GLOBAL_RATE = 40.0
+CHANNEL_RATE = 1.0
+CHANNEL_BURST = 5
+CHANNEL_BUCKETS_MAX = 10_000
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Token Bucket
+# ---------------------------------------------------------------------------------------------------------------------
+class TokenBucket:
+    """Classic token bucket; acquire() waits, first come first served, until a token is available."""
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+        self.acquired = 0
+        self.waited = 0.0
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+
+            self._tokens -= 1
+            self.acquired += 1
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Send Limiter
+# ---------------------------------------------------------------------------------------------------------------------
+class SendLimiter:
+    """A global bucket plus one bucket per channel, held in an LRU so idle channels are forgotten."""
+
+    def __init__(self, global_rate: float = GLOBAL_RATE, channel_rate: float = CHANNEL_RATE,
+                 channel_burst: int = CHANNEL_BURST, max_channels: int = CHANNEL_BUCKETS_MAX, clock=time.monotonic):
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, global_rate, clock)
+        self._channels = track_cache("channel_buckets", LRUCache(max_channels))
+
+    def bucket_for(self, channel_id: int) -> TokenBucket:
+        bucket = self._channels.get(channel_id)
+        if bucket is None:
+            bucket = TokenBucket(self.channel_rate, self.channel_burst, self.clock)
+            self._channels.put(channel_id, bucket)
+        return bucket
+
+    async def acquire(self, channel_id: int):
+        await self.bucket_for(channel_id).acquire()
+        await self.global_bucket.acquire()
+
+    def stats(self):
+        return {
+            "channels": len(self._channels),
+            "global_acquired": self.global_bucket.acquired,
+            "global_waited_s": round(self.global_bucket.waited, 3),
+        }
+
+
+send_limiter = SendLimiter()
@@ -0,0 +1,189 @@
+import math
+import time
+import heapq
+import itertools
+import random
+import asyncio
+import logging
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Drop Scheduler
+# ---------------------------------------------------------------------------------------------------------------------
+class DropScheduler:
+    """
+    Min-heap of per-guild drop times.
+
+    The old loop rolled a 1-in-N chance for every guild on every tick. The number of ticks until a guild's next
+    drop under that rule is geometric, so it is sampled once per drop instead and the loop only wakes when the
+    earliest guild is due.
+    """
+
+    def __init__(self, interval: float, denominator: int, clock=time.monotonic, rng=None):
+        self.interval = interval
+        self.denominator = denominator
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        self._heap = []
+        self._generation = {}
+        self._counter = itertools.count(1)
+        self._overrides = {}
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._generation)
+
+    def __contains__(self, guild_id):
+        return guild_id in self._generation
+
+    def rate_for(self, guild_id: int) -> int:
+        return self._overrides.get(guild_id, self.denominator)
+
+    def sample_delay(self, denominator: int) -> float:
+        """Seconds until the next drop for a 1-in-denominator chance per tick."""
+        if denominator <= 1:
+            return self.interval
+
+        u = 1.0 - self.rng.random()
+        ticks = 1 + int(math.log(u) / math.log1p(-1.0 / denominator))
+        return ticks * self.interval
+
+    def schedule(self, guild_id: int, now: float = None):
+        now = self.clock() if now is None else now
+        generation = next(self._counter)
+        self._generation[guild_id] = generation
+
+        entry = (now + self.sample_delay(self.rate_for(guild_id)), guild_id, generation)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wakeup.set()
+        return entry[0]
+
+    def schedule_many(self, guild_ids, now: float = None):
+        now = self.clock() if now is None else now
+        for guild_id in guild_ids:
+            self.schedule(guild_id, now)
+
+    def remove(self, guild_id: int):
+        """Unschedules a guild, keeping any rate override for when it returns; its heap entry is discarded lazily."""
+        self._generation.pop(guild_id, None)
+        self._compact()
+
+    def set_denominator(self, denominator: int):
+        """Changes the default rate and resamples every guild without an override."""
+        self.denominator = denominator
+        now = self.clock()
+        for guild_id in list(self._generation):
+            if guild_id not in self._overrides:
+                self.schedule(guild_id, now)
+        self._compact()
+
+    def set_rate(self, guild_id: int, denominator: int = None):
+        """Sets or clears (with None) a per-guild 1-in-N override."""
+        if denominator is None:
+            self._overrides.pop(guild_id, None)
+        else:
+            self._overrides[guild_id] = denominator
+
+        if guild_id in self._generation:
+            self.schedule(guild_id)
+            self._compact()
+
+    def next_due(self):
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float = None):
+        """Returns every guild whose drop is due and schedules its following drop."""
+        now = self.clock() if now is None else now
+        due = []
+
+        while self._heap and self._heap[0][0] <= now:
+            _, guild_id, generation = heapq.heappop(self._heap)
+            if self._generation.get(guild_id) != generation:
+                continue
+            due.append(guild_id)
+            self.schedule(guild_id, now)
+
+        return due
+
+    async def wait(self, max_sleep: float = None):
+        """Sleeps until the earliest drop is due, or until the schedule changes."""
+        self._wakeup.clear()
+        next_due = self.next_due()
+        timeout = max_sleep if next_due is None else max(0.0, next_due - self.clock())
+        if max_sleep is not None:
+            timeout = min(timeout, max_sleep)
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _discard_stale(self):
+        while self._heap and self._generation.get(self._heap[0][1]) != self._heap[0][2]:
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        if len(self._heap) > 2 * len(self._generation) + 64:
+            self._heap = [entry for entry in self._heap if self._generation.get(entry[1]) == entry[2]]
+            heapq.heapify(self._heap)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Deadline Queue
+# ---------------------------------------------------------------------------------------------------------------------
+class DeadlineQueue:
+    """
+    Min-heap of wall-clock deadlines used to decide when the next expiry pass should run.
+
+    Entries are only wake-up hints: the caller re-checks the database when it wakes, so a stale entry costs a
+    spurious wake-up and nothing else.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._heap = []
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, deadline: float):
+        heapq.heappush(self._heap, deadline)
+        if self._heap[0] == deadline:
+            self._wakeup.set()
+
+    def next_deadline(self):
+        return self._heap[0] if self._heap else None
+
+    def pop_due(self, now: float = None) -> int:
+        """Drops every deadline that has passed and returns how many there were."""
+        now = self.clock() if now is None else now
+        count = 0
+        while self._heap and self._heap[0] <= now:
+            heapq.heappop(self._heap)
+            count += 1
+        return count
+
+    def clear(self):
+        self._heap.clear()
+
+    async def wait(self, max_sleep: float = None):
+        """Sleeps until the earliest deadline passes, or until an earlier one is pushed."""
+        self._wakeup.clear()
+        deadline = self.next_deadline()
+        timeout = max_sleep if deadline is None else max(0.0, deadline - self.clock())
+        if max_sleep is not None:
+            timeout = min(timeout, max_sleep)
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,153 @@
+import math
+import time
+import asyncio
+import logging
+
+from discord.ext import tasks
+
+from core.scheduler import DropScheduler, DeadlineQueue
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Shard Helpers
+# ---------------------------------------------------------------------------------------------------------------------
+STATS_SHARDS_SHOWN = 16
+# Longest a shutdown waits for a drop tick that is already sending
+TICK_DRAIN_TIMEOUT = 15.0
+
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """Discord's shard formula: (guild_id >> 22) % shard_count."""
+    return (guild_id >> 22) % shard_count if shard_count and shard_count > 1 else 0
+
+
+def shard_filter(shard_ids, shard_count, column: str = "guild_id"):
+    """SQL condition and parameters matching rows whose guild lives on one of shard_ids."""
+    if not shard_count or shard_count <= 1 or shard_ids is None:
+        return "1", ()
+
+    shard_ids = list(shard_ids)
+    placeholders = ", ".join("?" for _ in shard_ids)
+    return f"(({column} >> 22) % ?) IN ({placeholders})", (shard_count, *shard_ids)
+
+
+def parse_shard_ids(value: str):
+    """Parses "0-3,8" style shard lists; an empty value means "all shards"."""
+    if not value or not value.strip():
+        return None
+
+    shard_ids = set()
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = (int(bound) for bound in part.split("-", 1))
+            shard_ids.update(range(first, last + 1))
+        elif part:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Shard Partition
+# ---------------------------------------------------------------------------------------------------------------------
+class ShardPartition:
+    """
+    Drop schedule, expiry deadlines and loops for the guilds on one shard.
+
+    Each shard runs its own drop and cleanup loops, so a slow or reconnecting shard only delays its own guilds,
+    and a process given an explicit shard range never touches drops that belong to another process.
+    """
+
+    def __init__(self, shard_id: int, shard_count: int, interval: float, denominator: int):
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+        self.scheduler = DropScheduler(interval, denominator)
+        self.expiries = DeadlineQueue()
+        self.cleanup_totals = {"deleted": 0, "skipped": 0, "failed": 0}
+
+        self.drop_loop = None
+        self.cleanup_loop = None
+        # The drop tick currently sending and recording, shielded from the loop's cancellation
+        self.tick = None
+
+    @property
+    def running(self) -> bool:
+        return self.drop_loop is not None and self.drop_loop.is_running()
+
+    def start(self, drop_tick, cleanup_tick):
+        """Starts one loop per coroutine; each is called with this partition on every iteration."""
+        self.drop_loop = tasks.loop(seconds=0)(drop_tick)
+        self.cleanup_loop = tasks.loop(seconds=0)(cleanup_tick)
+        self.drop_loop.start(self)
+        self.cleanup_loop.start(self)
+        logger.info(f"Started drop and cleanup loops for shard {self.shard_id} ({len(self.scheduler)} guild(s)).")
+
+    def stop(self):
+        for loop in (self.drop_loop, self.cleanup_loop):
+            if loop is not None:
+                loop.cancel()
+
+    async def finish_tick(self, timeout: float = TICK_DRAIN_TIMEOUT):
+        """Waits for a drop tick that was already sending, so drops it posted are recorded and later expire."""
+        if self.tick is None or self.tick.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self.tick), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Drop tick for shard {self.shard_id} still running after {timeout}s at shutdown.")
+        except Exception:
+            pass  # drop_items logs its own failures
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Shard Tracker
+# ---------------------------------------------------------------------------------------------------------------------
+class ShardTracker:
+    """Remembers the last gateway event seen for each shard, for /stats."""
+
+    def __init__(self):
+        self._states = {}
+
+    def mark(self, shard_id: int, state: str):
+        self._states[shard_id] = (state, time.time())
+
+    def state(self, shard_id: int) -> str:
+        return self._states.get(shard_id, ("starting", None))[0]
+
+    def summary(self, bot):
+        """One dict per shard this process runs: id, state, latency_ms and guild count."""
+        shards = getattr(bot, "shards", None) or {}
+        guild_counts = {}
+        for guild in bot.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+        result = []
+        for shard_id in sorted(shards or {0: None}):
+            info = shards.get(shard_id)
+            shard_latency = info.latency if info else bot.latency
+            result.append({
+                "id": shard_id,
+                "state": "closed" if info and info.is_closed() else self.state(shard_id),
+                "latency_ms": round(shard_latency * 1000) if math.isfinite(shard_latency) else None,
+                "guilds": guild_counts.get(shard_id, 0),
+            })
+        return result
+
+
+def format_shard_summary(summary) -> str:
+    """Compact /stats text; large shard counts are summarised rather than listed."""
+    ready = sum(1 for shard in summary if shard["state"] in ("ready", "resumed"))
+    lines = [f"{ready}/{len(summary)} ready"]
+    for shard in summary[:STATS_SHARDS_SHOWN]:
+        shard_latency = f"{shard['latency_ms']} ms" if shard["latency_ms"] is not None else "n/a"
+        lines.append(f"#{shard['id']} {shard['state']} · {shard_latency} · {shard['guilds']} guilds")
+    if len(summary) > STATS_SHARDS_SHOWN:
+        lines.append(f"… {len(summary) - STATS_SHARDS_SHOWN} more")
+    return "\n".join(lines)
+
+
+shard_tracker = ShardTracker()
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+
+from core.storage import storage
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Defaults
+# ---------------------------------------------------------------------------------------------------------------------
+DEFAULT_EMBED_COLOUR = 0xc4a7ec
+
+DEFAULT_SETTINGS = {
+    "drop_channel_id": None,
+    "drop_expiry_minutes": 30,
+    "message": "Something dropped! Claim it or Destroy it!",
+    "image_url": "https://imgur.com/VZtZTOm.png",
+    "claim_text": "{user} claimed it!",
+    "destroy_text": "{user} destroyed it!",
+    "claim_image_url": "https://imgur.com/VZtZTOm.png",
+    "destroy_image_url": "https://imgur.com/UtVm1W9.png",
+    "rare_message": "A rare item has appeared! Be the first to claim it!",
+    "rare_image_url": "https://imgur.com/GLszyDB.png",
+    "rare_default_text": "A rare event occurred!",
+    "rare_claim_image": None,
+    "rare_destroy_image": None,
+    "rare_claim_text": "{user} claimed the rare item!",
+    "rare_destroy_text": "{user} destroyed the rare item!",
+    "rare_role_id": None,
+}
+
+SETTINGS_COLUMNS = tuple(DEFAULT_SETTINGS)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Guild State
+# ---------------------------------------------------------------------------------------------------------------------
+class GuildState:
+    """Cached copy of one guild's item_settings row and embed colour."""
+
+    __slots__ = ("guild_id", "embed_colour") + SETTINGS_COLUMNS
+
+    def __init__(self, guild_id: int, embed_colour=None, **settings):
+        self.guild_id = guild_id
+        self.embed_colour = embed_colour
+        for column in SETTINGS_COLUMNS:
+            setattr(self, column, settings.get(column, DEFAULT_SETTINGS[column]))
+
+    @property
+    def colour(self) -> int:
+        return self.embed_colour if self.embed_colour is not None else DEFAULT_EMBED_COLOUR
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Guild State Registry
+# ---------------------------------------------------------------------------------------------------------------------
+class GuildStateRegistry:
+    """In-process registry of GuildState objects, loaded in bulk and kept current by write-through updates."""
+
+    def __init__(self):
+        self._states = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._shards = (None, None)
+
+    def __len__(self):
+        return len(self._states)
+
+    async def load_all(self, if_needed: bool = False):
+        async with self._load_lock:
+            if if_needed and self._loaded:
+                return
+
+            rows, colours = await storage.load_guild_settings(SETTINGS_COLUMNS, *self._shards)
+
+            states = {}
+            for guild_id, settings in rows:
+                states[guild_id] = GuildState(guild_id, **settings)
+
+            for guild_id, value in colours:
+                state = states.setdefault(guild_id, GuildState(guild_id))
+                state.embed_colour = _parse_colour(value)
+
+            self._states = states
+            self._loaded = True
+            logger.info(f"Loaded guild state for {len(states)} guild(s).")
+
+    def configure_shards(self, shard_ids, shard_count):
+        """Limits bulk loads to guilds on the given shards; None loads every guild."""
+        if (shard_ids, shard_count) != self._shards:
+            self._shards = (list(shard_ids) if shard_ids is not None else None, shard_count)
+            self.invalidate()
+
+    def invalidate(self):
+        """Drops every cached state; the next lookup reloads from the database."""
+        self._states = {}
+        self._loaded = False
+
+    def peek(self, guild_id: int):
+        return self._states.get(guild_id)
+
+    async def get(self, guild_id: int) -> GuildState:
+        if not self._loaded:
+            await self.load_all(if_needed=True)
+
+        state = self._states.get(guild_id)
+        if state is None:
+            state = self._states[guild_id] = GuildState(guild_id)
+        return state
+
+    async def ensure(self, guild_ids):
+        """Inserts default item_settings rows for the given guilds and registers their state."""
+        guild_ids = list(guild_ids)
+        await storage.insert_default_settings(guild_ids, DEFAULT_SETTINGS)
+
+        for guild_id in guild_ids:
+            await self.get(guild_id)
+
+    async def update_settings(self, guild_id: int, **fields):
+        """Writes item_settings columns and updates the cached state in the same step."""
+        unknown = set(fields) - set(SETTINGS_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown item_settings column(s): {', '.join(sorted(unknown))}")
+
+        state = await self.get(guild_id)
+        current = {column: getattr(state, column) for column in SETTINGS_COLUMNS}
+        await storage.save_settings(guild_id, fields, current)
+
+        for column, value in fields.items():
+            setattr(state, column, value)
+        return state
+
+    async def update_embed_colour(self, guild_id: int, colour: str):
+        """Stores a hex colour string in customisation and updates the cached state."""
+        state = await self.get(guild_id)
+
+        await storage.set_customisation(guild_id, {"embed_color": colour})
+
+        state.embed_colour = _parse_colour(colour)
+        return state
+
+
+def _parse_colour(value):
+    try:
+        return int(value, 16) if value else None
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid embed colour value: {value!r}")
+        return None
+
+
+guild_states = GuildStateRegistry()
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+
+from core.storage import storage
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Buffer Settings
+# ---------------------------------------------------------------------------------------------------------------------
+FLUSH_INTERVAL = 5.0
+MAX_PENDING = 500
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Stats Buffer
+# ---------------------------------------------------------------------------------------------------------------------
+class StatsBuffer:
+    """Write-behind accumulator for item_stats and user_totals counters, flushed in one transaction per partition."""
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, max_pending: int = MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending = {}
+        self._flushing = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+        self._task = None
+        self._stopping = False
+        self._listeners = []
+
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, guild_id: int, user_id: int, collected: int = 0, destroyed: int = 0, rare: int = 0):
+        deltas = self._pending.get((guild_id, user_id))
+        if deltas is None:
+            deltas = self._pending[(guild_id, user_id)] = [0, 0, 0]
+
+        deltas[0] += collected
+        deltas[1] += destroyed
+        deltas[2] += rare
+
+        if len(self._pending) >= self.max_pending:
+            self._flush_requested.set()
+
+    def pending_for(self, guild_id: int, user_id: int):
+        """Unflushed (collected, destroyed, rare) deltas for one user in one guild."""
+        totals = [0, 0, 0]
+        for source in (self._flushing, self._pending):
+            deltas = source.get((guild_id, user_id))
+            if deltas:
+                for i in range(3):
+                    totals[i] += deltas[i]
+        return tuple(totals)
+
+    def pending_by_user(self, guild_id: int = None):
+        """Unflushed deltas summed per user, for one guild or (with None) across every guild."""
+        totals = {}
+        for source in (self._flushing, self._pending):
+            for (gid, user_id), deltas in source.items():
+                if guild_id is not None and gid != guild_id:
+                    continue
+                user_totals = totals.setdefault(user_id, [0, 0, 0])
+                for i in range(3):
+                    user_totals[i] += deltas[i]
+        return totals
+
+    def pending_totals(self):
+        """Unflushed (collected, destroyed, rare) deltas summed over everything."""
+        totals = [0, 0, 0]
+        for source in (self._flushing, self._pending):
+            for deltas in source.values():
+                for i in range(3):
+                    totals[i] += deltas[i]
+        return tuple(totals)
+
+    def add_listener(self, callback):
+        """Registers an async callback that receives each committed batch as {(guild_id, user_id): deltas}."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch = self._flushing = self._pending
+            self._pending = {}
+            rows = [(gid, uid, *deltas) for (gid, uid), deltas in batch.items()]
+
+            groups = storage.groups(rows)
+            written = {}
+            error = None
+            writes = [asyncio.ensure_future(storage.record_stats(group)) for group in groups]
+            try:
+                await asyncio.gather(*writes, return_exceptions=True)
+            finally:
+                # Also runs when the flush itself is cancelled: gather has cancelled (and rolled back) any write
+                # that had not committed, and those rows go back to _pending rather than being lost
+                for group, write in zip(groups, writes):
+                    if write.done() and not write.cancelled() and write.exception() is None:
+                        for gid, uid, *deltas in group:
+                            written[(gid, uid)] = deltas
+                        continue
+
+                    # Put this partition's rows back so the next flush retries them
+                    if write.done() and not write.cancelled():
+                        error = write.exception()
+                    for gid, uid, *deltas in group:
+                        current = self._pending.setdefault((gid, uid), [0, 0, 0])
+                        for i in range(3):
+                            current[i] += deltas[i]
+                self._flushing = {}
+
+            if written:
+                self.flushes += 1
+                self.rows_flushed += len(written)
+
+                for listener in self._listeners:
+                    try:
+                        await listener(written)
+                    except Exception:
+                        logger.exception("Stats flush listener failed.")
+
+            if error is not None:
+                raise error
+            return len(written)
+
+    async def _run(self):
+        # stop() sets _stopping and wakes the loop instead of cancelling it, so a flush already writing finishes
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush buffered item_stats; will retry.")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Stats buffer started (interval {self.flush_interval}s, threshold {self.max_pending}).")
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping = True
+            self._flush_requested.set()
+            await self._task
+            self._task = None
+
+        flushed = await self.flush()
+        logger.info(f"Stats buffer stopped; flushed {flushed} pending row(s).")
+
+
+stats_buffer = StatsBuffer()
@@ -0,0 +1,917 @@
+import math
+import heapq
+import inspect
+import logging
+import functools
+import aiosqlite
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+from core.db_config import STORAGE_BACKEND
+from core.database import db, partitions
+from core.shards import shard_for, shard_filter
+from core.metrics import latency
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Storage Settings
+# ---------------------------------------------------------------------------------------------------------------------
+QUERY_CHUNK = 500
+MERGE_SLACK = 15
+
+# Counter columns shared by item_stats and user_totals, in the order rows carry them
+STAT_COLUMNS = ("items_collected", "items_destroyed", "rare_drops_claimed")
+
+INDEX_SUFFIXES = {"items_collected": "collected", "items_destroyed": "destroyed", "rare_drops_claimed": "rare"}
+
+USER_TOTALS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS user_totals (
+        user_id INTEGER PRIMARY KEY,
+        items_collected INTEGER DEFAULT 0,
+        items_destroyed INTEGER DEFAULT 0,
+        rare_drops_claimed INTEGER DEFAULT 0
+    )
+'''
+
+RANKING_INDEXES = tuple(
+    f"CREATE INDEX IF NOT EXISTS idx_user_totals_{suffix} ON user_totals ({column} DESC, user_id)"
+    for column, suffix in INDEX_SUFFIXES.items()
+) + tuple(
+    f"CREATE INDEX IF NOT EXISTS idx_item_stats_guild_{suffix} ON item_stats (guild_id, {column} DESC, user_id)"
+    for column, suffix in INDEX_SUFFIXES.items()
+)
+
+BACKFILL_USER_TOTALS = '''
+    INSERT INTO user_totals (user_id, items_collected, items_destroyed, rare_drops_claimed)
+    SELECT user_id, SUM(items_collected), SUM(items_destroyed), SUM(rare_drops_claimed)
+    FROM item_stats
+    GROUP BY user_id
+'''
+
+UPSERT_STATS = '''
+    INSERT INTO item_stats (guild_id, user_id, items_collected, items_destroyed, rare_drops_claimed)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id, user_id)
+    DO UPDATE SET
+        items_collected = items_collected + excluded.items_collected,
+        items_destroyed = items_destroyed + excluded.items_destroyed,
+        rare_drops_claimed = rare_drops_claimed + excluded.rare_drops_claimed
+'''
+
+UPSERT_TOTALS = '''
+    INSERT INTO user_totals (user_id, items_collected, items_destroyed, rare_drops_claimed)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id)
+    DO UPDATE SET
+        items_collected = items_collected + excluded.items_collected,
+        items_destroyed = items_destroyed + excluded.items_destroyed,
+        rare_drops_claimed = rare_drops_claimed + excluded.rare_drops_claimed
+'''
+
+INSERT_DROP = '''
+    INSERT OR IGNORE INTO active_drops (message_id, guild_id, channel_id, drop_time, expires_at)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+SETTLE_DROP = '''
+    INSERT INTO active_drops (message_id, guild_id, channel_id, drop_time, expires_at, status, resolved_by)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(message_id) DO UPDATE SET
+        status = excluded.status,
+        resolved_by = excluded.resolved_by
+    WHERE active_drops.status = 'open'
+'''
+
+UPSERT_CONFIG = '''
+    INSERT INTO item_config (key, value)
+    VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+'''
+
+UPSERT_CUSTOMISATION = '''
+    INSERT INTO customisation (guild_id, type, value) VALUES (?, ?, ?)
+    ON CONFLICT(guild_id, type) DO UPDATE SET value = excluded.value
+'''
+
+UPSERT_HOLDER = '''
+    INSERT INTO rare_role_holders (guild_id, role_id, user_id)
+    VALUES (?, ?, ?)
+    ON CONFLICT(guild_id) DO UPDATE SET role_id = excluded.role_id, user_id = excluded.user_id
+'''
+
+
+async def ensure_user_totals(conn):
+    """Creates user_totals and the ranking indexes, backfilling user_totals the first time it appears."""
+    await conn.execute(USER_TOTALS_SCHEMA)
+    for statement in RANKING_INDEXES:
+        await conn.execute(statement)
+
+    cursor = await conn.execute("SELECT EXISTS (SELECT 1 FROM user_totals)")
+    if not (await cursor.fetchone())[0]:
+        await conn.execute(BACKFILL_USER_TOTALS)
+
+
+def _ranked(rows):
+    return sorted(rows, key=lambda row: (-row[1], row[0]))
+
+
+def _after(rows, after):
+    """Rows strictly after the (value, user_id) key of a ranking ordered by value desc, then user id."""
+    if after is None:
+        return rows
+    return [row for row in rows if (-row[1], row[0]) > (-after[0], after[1])]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Storage Interface
+# ---------------------------------------------------------------------------------------------------------------------
+class Storage(ABC):
+    """
+    The typed operations the bot performs on its data, independent of where that data lives.
+
+    Settings, drops and stats go through these methods instead of inline SQL, so a backend can be swapped
+    without touching the cogs. Writes that must land together take rows from one group of groups(). A backend
+    with several independent stores (partitioned SQLite) commits each group on its own, and callers handle a
+    group failing without losing the others. Schema creation and the owner's table tools stay SQLite-specific.
+    """
+
+    name = "abstract"
+
+    def groups(self, items, guild_of=lambda item: item[0]):
+        """Splits rows into groups that are each written atomically; one group unless the backend is partitioned."""
+        items = list(items)
+        return [items] if items else []
+
+    # Drop configuration
+    @abstractmethod
+    async def get_config(self, key: str):
+        ...
+
+    @abstractmethod
+    async def set_config(self, key: str, value):
+        """Stores an item_config value; None deletes the key."""
+
+    @abstractmethod
+    async def setdefault_config(self, key: str, value: str) -> str:
+        """Stores value only if key is unset, and returns whichever value is now stored."""
+
+    @abstractmethod
+    async def configs_with_prefix(self, prefix: str) -> dict:
+        ...
+
+    # Guild settings and customisation
+    @abstractmethod
+    async def load_guild_settings(self, columns, shard_ids=None, shard_count=None):
+        """([(guild_id, {column: value})], [(guild_id, embed colour)]) for guilds on the given shards."""
+
+    @abstractmethod
+    async def insert_default_settings(self, guild_ids, defaults: dict):
+        ...
+
+    @abstractmethod
+    async def save_settings(self, guild_id: int, fields: dict, current: dict):
+        """Writes the changed columns, inserting current overlaid with fields if the guild has no row yet."""
+
+    @abstractmethod
+    async def fill_setting_defaults(self, defaults: dict):
+        """Sets each of these columns to its default wherever it is NULL, in every guild's settings."""
+
+    @abstractmethod
+    async def set_customisation(self, guild_id: int, values: dict):
+        ...
+
+    @abstractmethod
+    async def find_customisation(self, kind: str):
+        """The value of any stored customisation of this kind, or None."""
+
+    # Permissions, blacklist and per-guild lookups
+    @abstractmethod
+    async def can_use_commands(self, guild_id: int, user_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def set_can_use_commands(self, guild_id: int, user_id: int, allowed: bool):
+        """Grants creates the row if needed; revoking only clears an existing grant."""
+
+    @abstractmethod
+    async def is_blacklisted(self, user_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def add_to_blacklist(self, user_id: int):
+        ...
+
+    @abstractmethod
+    async def rare_role_holder(self, guild_id: int):
+        """(role_id, user_id) recorded for the guild, or None."""
+
+    @abstractmethod
+    async def set_rare_role_holder(self, guild_id: int, role_id: int, user_id: int):
+        ...
+
+    @abstractmethod
+    async def log_channel_id(self, guild_id: int):
+        ...
+
+    # Active drops
+    @abstractmethod
+    async def record_drops(self, records):
+        """Inserts (message_id, guild_id, channel_id, drop_time, expires_at) rows from one group."""
+
+    @abstractmethod
+    async def settle_drop(self, message_id: int, guild_id: int, channel_id: int, drop_time: str, expires_at: int,
+                          status: str, user_id: int) -> bool:
+        """Moves a drop out of 'open', creating it if needed. True only for the call that settled it."""
+
+    @abstractmethod
+    async def next_expiry(self, shard_ids=None, shard_count=None):
+        ...
+
+    @abstractmethod
+    async def due_drops(self, now: int, shard_ids=None, shard_count=None):
+        """(message_id, guild_id, channel_id) for every drop on the given shards expiring at or before now."""
+
+    @abstractmethod
+    async def delete_drops(self, drops):
+        """Deletes drops given as rows starting (message_id, guild_id), all from one group."""
+
+    @abstractmethod
+    async def reschedule_drops(self, guild_id: int, minutes: int):
+        """Recomputes every drop's expiry in a guild from its drop time."""
+
+    @abstractmethod
+    async def active_drop_count(self) -> int:
+        ...
+
+    # Stats
+    @abstractmethod
+    async def record_stats(self, rows):
+        """Adds (guild_id, user_id, collected, destroyed, rare) deltas from one group to the stats and totals."""
+
+    @abstractmethod
+    async def stat_values(self, column: str, user_ids, guild_id: int = None) -> dict:
+        """user_id -> stored value for users with a row, in one guild or (with None) globally."""
+
+    @abstractmethod
+    async def top(self, column: str, limit: int, guild_id: int = None):
+        """The highest (user_id, value) rows, ordered by value then user id."""
+
+    @abstractmethod
+    async def page(self, column: str, after, limit: int, guild_id: int = None):
+        """Rows after the (value, user_id) key of the previous page, in top() order."""
+
+    @abstractmethod
+    async def rank(self, column: str, user_id: int, guild_id: int = None):
+        """(rank, value) for one user, or None if they have no row."""
+
+    @abstractmethod
+    async def totals(self):
+        """(items collected, items destroyed) across every user."""
+
+    @abstractmethod
+    async def rebuild_totals(self):
+        """Recomputes user_totals from item_stats."""
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# SQLite Storage
+# ---------------------------------------------------------------------------------------------------------------------
+class SQLiteStorage(Storage):
+    """The production backend: the main database pool plus, when configured, the guild-keyed partition files."""
+
+    name = "sqlite"
+
+    def __init__(self, main, partition_set):
+        self.db = main
+        self.partitions = partition_set
+
+    def groups(self, items, guild_of=lambda item: item[0]):
+        return list(self.partitions.split(items, guild_of=guild_of).values())
+
+    def _pool(self, guild_id):
+        return self.partitions.pools[0] if guild_id is None else self.partitions.for_guild(guild_id)
+
+    # Drop configuration
+    async def get_config(self, key: str):
+        async with self.db.reader() as conn:
+            cursor = await conn.execute("SELECT value FROM item_config WHERE key = ?", (key,))
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def set_config(self, key: str, value):
+        async with self.db.writer() as conn:
+            if value is None:
+                await conn.execute("DELETE FROM item_config WHERE key = ?", (key,))
+            else:
+                await conn.execute(UPSERT_CONFIG, (key, str(value)))
+            await conn.commit()
+
+    async def setdefault_config(self, key: str, value: str) -> str:
+        async with self.db.writer() as conn:
+            await conn.execute("INSERT OR IGNORE INTO item_config (key, value) VALUES (?, ?)", (key, value))
+            cursor = await conn.execute("SELECT value FROM item_config WHERE key = ?", (key,))
+            row = await cursor.fetchone()
+            await conn.commit()
+        return row[0] if row else value
+
+    async def configs_with_prefix(self, prefix: str) -> dict:
+        async with self.db.reader() as conn:
+            cursor = await conn.execute(
+                "SELECT key, value FROM item_config WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            return dict(await cursor.fetchall())
+
+    # Guild settings and customisation
+    async def load_guild_settings(self, columns, shard_ids=None, shard_count=None):
+        columns = list(columns)
+        condition, params = shard_filter(shard_ids, shard_count)
+        async with self.db.reader() as conn:
+            cursor = await conn.execute(
+                f"SELECT guild_id, {', '.join(columns)} FROM item_settings WHERE {condition}", params)
+            rows = await cursor.fetchall()
+
+            cursor = await conn.execute(
+                f"SELECT guild_id, value FROM customisation WHERE type = 'embed_color' AND {condition}", params)
+            colours = await cursor.fetchall()
+
+        return [(row[0], dict(zip(columns, row[1:]))) for row in rows], list(colours)
+
+    async def insert_default_settings(self, guild_ids, defaults: dict):
+        columns = ", ".join(defaults)
+        placeholders = ", ".join("?" for _ in defaults)
+        values = tuple(defaults.values())
+
+        async with self.db.writer() as conn:
+            await conn.executemany(
+                f"INSERT OR IGNORE INTO item_settings (guild_id, {columns}) VALUES (?, {placeholders})",
+                [(guild_id,) + values for guild_id in guild_ids]
+            )
+            await conn.commit()
+
+    async def save_settings(self, guild_id: int, fields: dict, current: dict):
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+
+        async with self.db.writer() as conn:
+            cursor = await conn.execute(
+                f"UPDATE item_settings SET {assignments} WHERE guild_id = ?",
+                (*fields.values(), guild_id)
+            )
+            if cursor.rowcount == 0:
+                values = dict(current, **fields)
+                columns = ", ".join(values)
+                placeholders = ", ".join("?" for _ in values)
+                await conn.execute(
+                    f"INSERT INTO item_settings (guild_id, {columns}) VALUES (?, {placeholders})",
+                    (guild_id, *values.values())
+                )
+            await conn.commit()
+
+    async def fill_setting_defaults(self, defaults: dict):
+        """Also adds any of the columns a database from an older release lacks (TEXT, as those always were)."""
+        async with self.db.writer() as conn:
+            cursor = await conn.execute("PRAGMA table_info(item_settings)")
+            existing = {row[1] for row in await cursor.fetchall()}
+            for column in defaults:
+                if column not in existing:
+                    await conn.execute(f"ALTER TABLE item_settings ADD COLUMN {column} TEXT")
+
+            fills = {column: value for column, value in defaults.items() if value is not None}
+            if fills:
+                assignments = ", ".join(f"{column} = COALESCE({column}, ?)" for column in fills)
+                await conn.execute(f"UPDATE item_settings SET {assignments}", tuple(fills.values()))
+            await conn.commit()
+
+    async def set_customisation(self, guild_id: int, values: dict):
+        async with self.db.writer() as conn:
+            await conn.executemany(UPSERT_CUSTOMISATION, [(guild_id, kind, value) for kind, value in values.items()])
+            await conn.commit()
+
+    async def find_customisation(self, kind: str):
+        async with self.db.reader() as conn:
+            cursor = await conn.execute("SELECT value FROM customisation WHERE type = ?", (kind,))
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    # Permissions, blacklist and per-guild lookups
+    async def can_use_commands(self, guild_id: int, user_id: int) -> bool:
+        async with self.db.reader() as conn:
+            cursor = await conn.execute(
+                "SELECT can_use_commands FROM permissions WHERE guild_id = ? AND user_id = ?", (guild_id, user_id))
+            row = await cursor.fetchone()
+        return bool(row and row[0])
+
+    async def set_can_use_commands(self, guild_id: int, user_id: int, allowed: bool):
+        async with self.db.writer() as conn:
+            if allowed:
+                await conn.execute('''
+                    INSERT INTO permissions (guild_id, user_id, can_use_commands) VALUES (?, ?, 1)
+                    ON CONFLICT(guild_id, user_id) DO UPDATE SET can_use_commands = 1
+                ''', (guild_id, user_id))
+            else:
+                await conn.execute(
+                    "UPDATE permissions SET can_use_commands = 0 WHERE guild_id = ? AND user_id = ?",
+                    (guild_id, user_id))
+            await conn.commit()
+
+    async def is_blacklisted(self, user_id: int) -> bool:
+        async with self.db.reader() as conn:
+            cursor = await conn.execute("SELECT 1 FROM blacklist WHERE user_id = ?", (user_id,))
+            return await cursor.fetchone() is not None
+
+    async def add_to_blacklist(self, user_id: int):
+        async with self.db.writer() as conn:
+            await conn.execute("INSERT OR IGNORE INTO blacklist (user_id) VALUES (?)", (user_id,))
+            await conn.commit()
+
+    async def rare_role_holder(self, guild_id: int):
+        async with self.db.reader() as conn:
+            cursor = await conn.execute(
+                "SELECT role_id, user_id FROM rare_role_holders WHERE guild_id = ?", (guild_id,))
+            row = await cursor.fetchone()
+        return tuple(row) if row else None
+
+    async def set_rare_role_holder(self, guild_id: int, role_id: int, user_id: int):
+        async with self.db.writer() as conn:
+            await conn.execute(UPSERT_HOLDER, (guild_id, role_id, user_id))
+            await conn.commit()
+
+    async def log_channel_id(self, guild_id: int):
+        async with self.db.reader() as conn:
+            cursor = await conn.execute("SELECT log_channel_id FROM config WHERE guild_id = ?", (guild_id,))
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    # Active drops
+    async def record_drops(self, records):
+        records = list(records)
+        if not records:
+            return
+        async with self.partitions.for_guild(records[0][1]).writer() as conn:
+            await conn.executemany(INSERT_DROP, records)
+            await conn.commit()
+
+    async def settle_drop(self, message_id: int, guild_id: int, channel_id: int, drop_time: str, expires_at: int,
+                          status: str, user_id: int) -> bool:
+        async with self.partitions.for_guild(guild_id).writer() as conn:
+            cursor = await conn.execute(SETTLE_DROP, (
+                message_id, guild_id, channel_id, drop_time, expires_at, status, user_id
+            ))
+            await conn.commit()
+        return cursor.rowcount == 1
+
+    async def next_expiry(self, shard_ids=None, shard_count=None):
+        condition, params = shard_filter(shard_ids, shard_count)
+        earliest = []
+        for pool in self.partitions.pools:
+            async with pool.reader() as conn:
+                # Walks the expires_at index in order and stops at the first row on these shards
+                cursor = await conn.execute(
+                    f"SELECT expires_at FROM active_drops WHERE {condition} ORDER BY expires_at LIMIT 1", params
+                )
+                row = await cursor.fetchone()
+            if row and row[0] is not None:
+                earliest.append(row[0])
+        return min(earliest) if earliest else None
+
+    async def due_drops(self, now: int, shard_ids=None, shard_count=None):
+        condition, params = shard_filter(shard_ids, shard_count)
+        expired = []
+        for pool in self.partitions.pools:
+            async with pool.reader() as conn:
+                cursor = await conn.execute(
+                    f"SELECT message_id, guild_id, channel_id FROM active_drops "
+                    f"WHERE expires_at <= ? AND {condition}", (now, *params)
+                )
+                expired.extend(await cursor.fetchall())
+        return expired
+
+    async def delete_drops(self, drops):
+        drops = list(drops)
+        if not drops:
+            return
+        async with self.partitions.for_guild(drops[0][1]).writer() as conn:
+            await conn.executemany("DELETE FROM active_drops WHERE message_id = ?",
+                                   [(message_id,) for message_id, *_ in drops])
+            await conn.commit()
+
+    async def reschedule_drops(self, guild_id: int, minutes: int):
+        async with self.partitions.for_guild(guild_id).writer() as conn:
+            await conn.execute('''
+                UPDATE active_drops
+                SET expires_at = CAST(strftime('%s', drop_time) AS INTEGER) + ? * 60
+                WHERE guild_id = ?
+            ''', (minutes, guild_id))
+            await conn.commit()
+
+    async def active_drop_count(self) -> int:
+        count = 0
+        for pool in self.partitions.pools:
+            async with pool.reader() as conn:
+                cursor = await conn.execute("SELECT COUNT(*) FROM active_drops")
+                count += (await cursor.fetchone())[0]
+        return count
+
+    # Stats
+    async def record_stats(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+
+        totals = {}
+        for _, uid, *deltas in rows:
+            user_totals = totals.setdefault(uid, [0, 0, 0])
+            for i in range(3):
+                user_totals[i] += deltas[i]
+
+        async with self.partitions.for_guild(rows[0][0]).writer() as conn:
+            await conn.executemany(UPSERT_STATS, rows)
+            await conn.executemany(UPSERT_TOTALS, [(uid, *deltas) for uid, deltas in totals.items()])
+            await conn.commit()
+
+    async def stat_values(self, column: str, user_ids, guild_id: int = None) -> dict:
+        user_ids = sorted(user_ids)
+        if guild_id is None:
+            pools, table, scope, params = self.partitions.pools, "user_totals", "", ()
+        else:
+            pools, table, scope, params = [self._pool(guild_id)], "item_stats", "guild_id = ? AND ", (guild_id,)
+
+        values = {}
+        for pool in pools:
+            async with pool.reader() as conn:
+                for start in range(0, len(user_ids), QUERY_CHUNK):
+                    chunk = user_ids[start:start + QUERY_CHUNK]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    cursor = await conn.execute(
+                        f"SELECT user_id, {column} FROM {table} WHERE {scope}user_id IN ({placeholders})",
+                        (*params, *chunk))
+                    for user_id, value in await cursor.fetchall():
+                        values[user_id] = values.get(user_id, 0) + (value or 0)
+        return values
+
+    async def top(self, column: str, limit: int, guild_id: int = None):
+        if guild_id is None and self.partitions.enabled:
+            return await self._merged_top(column, limit)
+        return await self.page(column, None, limit, guild_id)
+
+    async def page(self, column: str, after, limit: int, guild_id: int = None):
+        """
+        Seeks the ranking index from the previous page's key rather than using OFFSET, so every page costs the
+        same. Global pages over partitioned storage are cut from a merged ranking instead, which costs more the
+        deeper the page.
+        """
+        if guild_id is None and self.partitions.enabled:
+            return await self._merged_page(column, after, limit)
+
+        table, conditions, params = _scope(guild_id)
+        if after is not None:
+            conditions.append(f"{column} <= ? AND ({column} < ? OR user_id > ?)")
+            params += [after[0], after[0], after[1]]
+        where = " AND ".join(conditions) or "1"
+
+        async with self._pool(guild_id).reader() as conn:
+            cursor = await conn.execute(
+                f"SELECT user_id, {column} FROM {table} WHERE {where} "
+                f"ORDER BY {column} DESC, user_id LIMIT ?", (*params, limit))
+            return [(user_id, value or 0) for user_id, value in await cursor.fetchall()]
+
+    async def rank(self, column: str, user_id: int, guild_id: int = None):
+        if guild_id is None and self.partitions.enabled:
+            return await self._merged_rank(column, user_id)
+
+        table, conditions, params = _scope(guild_id)
+        scope = "".join(f"{condition} AND " for condition in conditions)
+
+        async with self._pool(guild_id).reader() as conn:
+            cursor = await conn.execute(
+                f"SELECT {column} FROM {table} WHERE {scope}user_id = ?", (*params, user_id))
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+
+            value = row[0] or 0
+            cursor = await conn.execute(
+                f"SELECT (SELECT COUNT(*) FROM {table} WHERE {scope}{column} > ?) + "
+                f"(SELECT COUNT(*) FROM {table} WHERE {scope}{column} = ? AND user_id < ?)",
+                (*params, value, *params, value, user_id))
+            ahead = (await cursor.fetchone())[0]
+
+        return ahead + 1, value
+
+    async def totals(self):
+        collected = destroyed = 0
+        for pool in self.partitions.pools:
+            async with pool.reader() as conn:
+                cursor = await conn.execute("SELECT SUM(items_collected), SUM(items_destroyed) FROM user_totals")
+                pool_collected, pool_destroyed = await cursor.fetchone()
+            collected += pool_collected or 0
+            destroyed += pool_destroyed or 0
+        return collected, destroyed
+
+    async def rebuild_totals(self):
+        for pool in self.partitions.pools:
+            async with pool.writer() as conn:
+                await conn.execute(USER_TOTALS_SCHEMA)
+                await conn.execute("DELETE FROM user_totals")
+                try:
+                    await conn.execute(BACKFILL_USER_TOTALS)
+                except aiosqlite.OperationalError:
+                    pass  # item_stats itself was dropped
+                await conn.commit()
+
+    # Merged global views over partitioned storage
+    async def _merged_top(self, column: str, limit: int):
+        """
+        The exact global top `limit` rows, merged from each partition's own ranking.
+
+        A user's global total is spread over the partitions they played in. Each round reads the top n rows of
+        every partition and sums the candidates' totals everywhere. Anyone not yet seen scores at most the sum of
+        the partitions' n-th values, so once the limit-th candidate beats that bound the answer is final.
+        Otherwise n grows and the round repeats.
+        """
+        n = limit + MERGE_SLACK
+        while True:
+            candidates = set()
+            bound = 0
+            exhausted = True
+            for pool in self.partitions.pools:
+                async with pool.reader() as conn:
+                    cursor = await conn.execute(
+                        f"SELECT user_id, {column} FROM user_totals ORDER BY {column} DESC, user_id LIMIT ?", (n,))
+                    rows = await cursor.fetchall()
+                candidates.update(user_id for user_id, _ in rows)
+                if len(rows) == n:
+                    bound += rows[-1][1] or 0
+                    exhausted = False
+
+            ranked = _ranked((await self.stat_values(column, candidates)).items())
+            if exhausted or (len(ranked) >= limit and ranked[limit - 1][1] > bound):
+                return ranked[:limit]
+            n *= 4
+
+    async def _merged_page(self, column: str, after, limit: int):
+        depth = limit + MERGE_SLACK
+        while True:
+            ranked = await self._merged_top(column, depth)
+            rows = _after(ranked, after)
+            if len(rows) >= limit or len(ranked) < depth:
+                return rows[:limit]
+            depth *= 2
+
+    async def _merged_rank(self, column: str, user_id: int):
+        """
+        Anyone with a global total of at least `value` has at least value / K of it in some partition, so only
+        users at or above that share in one of the partition indexes need to be summed.
+        """
+        values = await self.stat_values(column, [user_id])
+        if user_id not in values:
+            return None
+
+        value = values[user_id]
+        floor = math.ceil(value / len(self.partitions))
+        candidates = set()
+        for pool in self.partitions.pools:
+            async with pool.reader() as conn:
+                cursor = await conn.execute(f"SELECT user_id FROM user_totals WHERE {column} >= ?", (floor,))
+                candidates.update(row[0] for row in await cursor.fetchall())
+
+        ahead = sum(
+            1 for other, total in (await self.stat_values(column, candidates)).items()
+            if total > value or (total == value and other < user_id)
+        )
+        return ahead + 1, value
+
+
+def _scope(guild_id):
+    if guild_id is None:
+        return "user_totals", [], []
+    return "item_stats", ["guild_id = ?"], [guild_id]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# In-Memory Storage
+# ---------------------------------------------------------------------------------------------------------------------
+class MemoryStorage(Storage):
+    """
+    Plain dicts behind the same interface, for tests and benchmarks that should measure the bot's own logic
+    rather than disk I/O. Nothing survives a restart, and each process has its own copy.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.config = {}
+        self.settings = {}
+        self.customisation = {}
+        self.permissions = {}
+        self.blacklist = set()
+        self.rare_role_holders = {}
+        self.log_channels = {}
+        self.drops = {}
+        self.stats = {}
+        self.user_totals = {}
+
+    # Drop configuration
+    async def get_config(self, key: str):
+        return self.config.get(key)
+
+    async def set_config(self, key: str, value):
+        if value is None:
+            self.config.pop(key, None)
+        else:
+            self.config[key] = str(value)
+
+    async def setdefault_config(self, key: str, value: str) -> str:
+        return self.config.setdefault(key, value)
+
+    async def configs_with_prefix(self, prefix: str) -> dict:
+        return {key: value for key, value in self.config.items() if key.startswith(prefix)}
+
+    # Guild settings and customisation
+    async def load_guild_settings(self, columns, shard_ids=None, shard_count=None):
+        owned = _shard_check(shard_ids, shard_count)
+        settings = [(guild_id, {column: row.get(column) for column in columns}) for guild_id, row in self.settings.items() if owned(guild_id)]
+        colours = [(guild_id, value) for (guild_id, kind), value in self.customisation.items()
+                   if kind == "embed_color" and owned(guild_id)]
+        return settings, colours
+
+    async def insert_default_settings(self, guild_ids, defaults: dict):
+        for guild_id in guild_ids:
+            self.settings.setdefault(guild_id, dict(defaults))
+
+    async def save_settings(self, guild_id: int, fields: dict, current: dict):
+        row = self.settings.get(guild_id)
+        if row is None:
+            self.settings[guild_id] = dict(current, **fields)
+        else:
+            row.update(fields)
+
+    async def fill_setting_defaults(self, defaults: dict):
+        for row in self.settings.values():
+            for column, value in defaults.items():
+                if row.get(column) is None:
+                    row[column] = value
+
+    async def set_customisation(self, guild_id: int, values: dict):
+        for kind, value in values.items():
+            self.customisation[(guild_id, kind)] = value
+
+    async def find_customisation(self, kind: str):
+        return next((value for (_, stored), value in self.customisation.items() if stored == kind), None)
+
+    # Permissions, blacklist and per-guild lookups
+    async def can_use_commands(self, guild_id: int, user_id: int) -> bool:
+        return self.permissions.get((guild_id, user_id), False)
+
+    async def set_can_use_commands(self, guild_id: int, user_id: int, allowed: bool):
+        if allowed or (guild_id, user_id) in self.permissions:
+            self.permissions[(guild_id, user_id)] = allowed
+
+    async def is_blacklisted(self, user_id: int) -> bool:
+        return user_id in self.blacklist
+
+    async def add_to_blacklist(self, user_id: int):
+        self.blacklist.add(user_id)
+
+    async def rare_role_holder(self, guild_id: int):
+        return self.rare_role_holders.get(guild_id)
+
+    async def set_rare_role_holder(self, guild_id: int, role_id: int, user_id: int):
+        self.rare_role_holders[guild_id] = (role_id, user_id)
+
+    async def log_channel_id(self, guild_id: int):
+        return self.log_channels.get(guild_id)
+
+    # Active drops
+    async def record_drops(self, records):
+        for message_id, guild_id, channel_id, drop_time, expires_at in records:
+            self.drops.setdefault(message_id, {
+                "guild_id": guild_id, "channel_id": channel_id, "drop_time": drop_time,
+                "expires_at": expires_at, "status": "open", "resolved_by": None,
+            })
+
+    async def settle_drop(self, message_id: int, guild_id: int, channel_id: int, drop_time: str, expires_at: int,
+                          status: str, user_id: int) -> bool:
+        drop = self.drops.get(message_id)
+        if drop is None:
+            self.drops[message_id] = {
+                "guild_id": guild_id, "channel_id": channel_id, "drop_time": drop_time,
+                "expires_at": expires_at, "status": status, "resolved_by": user_id,
+            }
+            return True
+        if drop["status"] != "open":
+            return False
+        drop["status"] = status
+        drop["resolved_by"] = user_id
+        return True
+
+    async def next_expiry(self, shard_ids=None, shard_count=None):
+        owned = _shard_check(shard_ids, shard_count)
+        expiries = [drop["expires_at"] for drop in self.drops.values()
+                    if drop["expires_at"] is not None and owned(drop["guild_id"])]
+        return min(expiries) if expiries else None
+
+    async def due_drops(self, now: int, shard_ids=None, shard_count=None):
+        owned = _shard_check(shard_ids, shard_count)
+        return [(message_id, drop["guild_id"], drop["channel_id"]) for message_id, drop in self.drops.items()
+                if drop["expires_at"] is not None and drop["expires_at"] <= now and owned(drop["guild_id"])]
+
+    async def delete_drops(self, drops):
+        for message_id, *_ in drops:
+            self.drops.pop(message_id, None)
+
+    async def reschedule_drops(self, guild_id: int, minutes: int):
+        for drop in self.drops.values():
+            if drop["guild_id"] == guild_id:
+                dropped_at = datetime.fromisoformat(drop["drop_time"]).replace(tzinfo=timezone.utc)
+                drop["expires_at"] = int(dropped_at.timestamp()) + minutes * 60
+
+    async def active_drop_count(self) -> int:
+        return len(self.drops)
+
+    # Stats
+    async def record_stats(self, rows):
+        for guild_id, user_id, *deltas in rows:
+            for counters in (self.stats.setdefault((guild_id, user_id), [0, 0, 0]),
+                             self.user_totals.setdefault(user_id, [0, 0, 0])):
+                for i in range(3):
+                    counters[i] += deltas[i]
+
+    def _rows(self, column: str, guild_id):
+        index = STAT_COLUMNS.index(column)
+        if guild_id is None:
+            return ((user_id, counters[index]) for user_id, counters in self.user_totals.items())
+        return ((user_id, counters[index]) for (stored, user_id), counters in self.stats.items()
+                if stored == guild_id)
+
+    async def stat_values(self, column: str, user_ids, guild_id: int = None) -> dict:
+        user_ids = set(user_ids)
+        return {user_id: value for user_id, value in self._rows(column, guild_id) if user_id in user_ids}
+
+    async def top(self, column: str, limit: int, guild_id: int = None):
+        return heapq.nsmallest(limit, self._rows(column, guild_id), key=lambda row: (-row[1], row[0]))
+
+    async def page(self, column: str, after, limit: int, guild_id: int = None):
+        return _after(_ranked(self._rows(column, guild_id)), after)[:limit]
+
+    async def rank(self, column: str, user_id: int, guild_id: int = None):
+        rows = list(self._rows(column, guild_id))
+        value = next((stored for other, stored in rows if other == user_id), None)
+        if value is None:
+            return None
+        ahead = sum(1 for other, stored in rows if stored > value or (stored == value and other < user_id))
+        return ahead + 1, value
+
+    async def totals(self):
+        return (sum(counters[0] for counters in self.user_totals.values()),
+                sum(counters[1] for counters in self.user_totals.values()))
+
+    async def rebuild_totals(self):
+        self.user_totals = {}
+        for (_, user_id), counters in self.stats.items():
+            totals = self.user_totals.setdefault(user_id, [0, 0, 0])
+            for i in range(3):
+                totals[i] += counters[i]
+
+
+def _shard_check(shard_ids, shard_count):
+    if not shard_ids or not shard_count or shard_count <= 1:
+        return lambda guild_id: True
+    owned = set(shard_ids)
+    return lambda guild_id: shard_for(guild_id, shard_count) in owned
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Backend Selection
+# ---------------------------------------------------------------------------------------------------------------------
+def _timed(statement: str, operation):
+    recorder = latency("db_query", statement=statement)
+
+    @functools.wraps(operation)
+    async def timed_operation(*args, **kwargs):
+        with recorder.time():
+            return await operation(*args, **kwargs)
+
+    return timed_operation
+
+
+def timed(backend: Storage) -> Storage:
+    """Records every interface operation on this instance into the db_query histogram, labelled by method."""
+    for name, member in vars(Storage).items():
+        if inspect.iscoroutinefunction(member):
+            setattr(backend, name, _timed(name, getattr(backend, name)))
+    return backend
+
+
+def create_storage(backend: str = "sqlite") -> Storage:
+    if backend == "sqlite":
+        return timed(SQLiteStorage(db, partitions))
+    if backend == "memory":
+        return timed(MemoryStorage())
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}; expected 'sqlite' or 'memory'")
+
+
+storage = create_storage(STORAGE_BACKEND)
@@ -0,0 +1,125 @@
+import os
+import sys
+import signal
+import asyncio
+import logging
+
+from core.cluster import Coordinator, DEFAULT_SOCKET_PATH
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+logger = logging.getLogger("launcher")
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Launcher Settings
+# ---------------------------------------------------------------------------------------------------------------------
+CLUSTER_PROCESSES = int(os.getenv("CLUSTER_PROCESSES", 0)) or os.cpu_count() or 1
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 0)) or CLUSTER_PROCESSES
+SOCKET_PATH = os.getenv("CLUSTER_SOCKET", DEFAULT_SOCKET_PATH)
+RESTART_DELAY = 5.0
+RESTART_DELAY_MAX = 60.0
+HEALTHY_AFTER = 60.0
+STOP_TIMEOUT = 30.0
+
+
+def shard_ranges(shard_count: int, processes: int):
+    """Splits shards 0..shard_count-1 into contiguous ranges, one per process, as even as possible."""
+    processes = max(1, min(processes, shard_count))
+    base, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        size = base + (1 if index < extra else 0)
+        ranges.append(range(start, start + size))
+        start += size
+    return ranges
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Worker Supervision
+# ---------------------------------------------------------------------------------------------------------------------
+class Worker:
+    """One bot.py process owning a fixed shard range; restarted with backoff if it exits unexpectedly."""
+
+    def __init__(self, cluster_id: int, shards: range, shard_count: int, socket_path: str):
+        self.cluster_id = cluster_id
+        self.shards = shards
+        self.shard_count = shard_count
+        self.socket_path = socket_path
+        self.process = None
+        self.stopping = False
+
+    def environment(self):
+        env = dict(os.environ)
+        env.update(
+            CLUSTER_ID=str(self.cluster_id),
+            CLUSTER_SOCKET=self.socket_path,
+            SHARD_COUNT=str(self.shard_count),
+            SHARD_IDS=f"{self.shards.start}-{self.shards.stop - 1}",
+        )
+        return env
+
+    async def run(self):
+        delay = RESTART_DELAY
+        while not self.stopping:
+            started = asyncio.get_running_loop().time()
+            self.process = await asyncio.create_subprocess_exec(sys.executable, "bot.py", env=self.environment())
+            logger.info(f"Started process {self.cluster_id} (pid {self.process.pid}) "
+                        f"for shards {self.shards.start}-{self.shards.stop - 1}.")
+
+            code = await self.process.wait()
+            if self.stopping:
+                break
+
+            if asyncio.get_running_loop().time() - started > HEALTHY_AFTER:
+                delay = RESTART_DELAY
+            logger.warning(f"Process {self.cluster_id} exited with code {code}; restarting in {delay:.0f}s.")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RESTART_DELAY_MAX)
+
+    async def stop(self):
+        self.stopping = True
+        if self.process is None or self.process.returncode is not None:
+            return
+
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Process {self.cluster_id} did not stop in {STOP_TIMEOUT:.0f}s; killing it.")
+            self.process.kill()
+            await self.process.wait()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Main Function
+# ---------------------------------------------------------------------------------------------------------------------
+async def main():
+    ranges = shard_ranges(SHARD_COUNT, CLUSTER_PROCESSES)
+    coordinator = Coordinator(SOCKET_PATH, expected=len(ranges))
+    await coordinator.start()
+
+    workers = [Worker(index, shards, SHARD_COUNT, SOCKET_PATH) for index, shards in enumerate(ranges)]
+    supervisors = [asyncio.create_task(worker.run()) for worker in workers]
+    logger.info(f"Launching {len(workers)} process(es) for {SHARD_COUNT} shard(s).")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await stop.wait()
+        logger.info("Stopping cluster...")
+    finally:
+        await asyncio.gather(*(worker.stop() for worker in workers))
+        for supervisor in supervisors:
+            supervisor.cancel()
+        await asyncio.gather(*supervisors, return_exceptions=True)
+        await coordinator.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+import os
+import sys
+import sqlite3
+import argparse
+import logging
+
+from core.db_config import DB_DIR, DB_PATH
+from core.database import partition_index, PARTITIONED_TABLES
+from core.storage import USER_TOTALS_SCHEMA, BACKFILL_USER_TOTALS
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+logger = logging.getLogger("repartition")
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Repartition Settings
+# ---------------------------------------------------------------------------------------------------------------------
+# Rows are copied as they are; user_totals is derived, so every target rebuilds its own from item_stats
+COPIED_TABLES = ("item_stats", "active_drops")
+TEMP_SUFFIX = ".repartition"
+BACKUP_SUFFIX = ".bak"
+
+
+def partition_paths(count: int):
+    """The files holding the guild-keyed tables for a partition count; 0 or 1 means the main database."""
+    if count <= 1:
+        return [DB_PATH]
+    return [os.path.join(DB_DIR, f"collector-p{index}.db") for index in range(count)]
+
+
+def table_schemas(conn):
+    """CREATE statements for the guild-keyed tables and their indexes, tables first."""
+    placeholders = ", ".join("?" for _ in PARTITIONED_TABLES)
+    rows = conn.execute(
+        f"SELECT type, name, sql FROM sqlite_master "
+        f"WHERE tbl_name IN ({placeholders}) AND sql IS NOT NULL ORDER BY type = 'index', name",
+        PARTITIONED_TABLES
+    ).fetchall()
+    return {name: sql for _, name, sql in rows}
+
+
+def checkpoint(path: str):
+    """Folds the WAL back into the file so the source can be attached and later renamed safely."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def remove_sidecars(path: str):
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Copying
+# ---------------------------------------------------------------------------------------------------------------------
+def build_target(conn, sources, schemas, index: int, count: int):
+    """Fills one target with every source row whose guild hashes to it, then rebuilds its user_totals."""
+    conn.create_function("partition_index", 2, partition_index, deterministic=True)
+
+    for table in PARTITIONED_TABLES:
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+    for name, sql in schemas.items():
+        conn.execute(sql)
+    if "user_totals" not in schemas:
+        conn.execute(USER_TOTALS_SCHEMA)
+
+    copied = {}
+    for alias, path in enumerate(sources):
+        conn.execute(f"ATTACH DATABASE ? AS source{alias}", (path,))
+        try:
+            for table in COPIED_TABLES:
+                exists = conn.execute(
+                    f"SELECT 1 FROM source{alias}.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+                ).fetchone()
+                if not exists:
+                    continue
+
+                columns = [row[1] for row in conn.execute(f"PRAGMA source{alias}.table_info({table})")]
+                column_list = ", ".join(columns)
+                cursor = conn.execute(
+                    f"INSERT INTO main.{table} ({column_list}) SELECT {column_list} FROM source{alias}.{table} "
+                    f"WHERE partition_index(guild_id, ?) = ?",
+                    (count, index)
+                )
+                copied[table] = copied.get(table, 0) + cursor.rowcount
+            conn.commit()
+        finally:
+            conn.execute(f"DETACH DATABASE source{alias}")
+
+    conn.execute(BACKFILL_USER_TOTALS)
+    conn.commit()
+    return copied
+
+
+def repartition(current: int, target: int):
+    sources = partition_paths(current)
+    targets = partition_paths(target)
+    if sources == targets:
+        logger.info("Nothing to do: the data is already laid out that way.")
+        return
+
+    missing = [path for path in sources if not os.path.exists(path)]
+    if missing:
+        raise SystemExit(f"Missing source database(s): {', '.join(missing)}")
+
+    for path in sources:
+        checkpoint(path)
+
+    source = sqlite3.connect(sources[0])
+    try:
+        schemas = table_schemas(source)
+    finally:
+        source.close()
+    if "item_stats" not in schemas:
+        raise SystemExit(f"No item_stats table in {sources[0]}; is --from right?")
+
+    # Build every target beside the live files first, so a failure part way leaves the originals untouched
+    for index, path in enumerate(targets):
+        temp = path + TEMP_SUFFIX if path != DB_PATH else DB_PATH
+        if temp != DB_PATH and os.path.exists(temp):
+            os.remove(temp)
+
+        conn = sqlite3.connect(temp)
+        try:
+            copied = build_target(conn, sources, schemas, index, len(targets))
+        finally:
+            conn.close()
+        logger.info(f"Partition {index + 1}/{len(targets)} ({path}): "
+                    + ", ".join(f"{count} {table} row(s)" for table, count in copied.items()))
+
+    # Swap the new files in, keeping the old partition files as backups
+    for path in set(sources) - {DB_PATH}:
+        os.replace(path, path + BACKUP_SUFFIX)
+        remove_sidecars(path)
+        logger.info(f"Backed up {path} to {path + BACKUP_SUFFIX}")
+
+    for path in targets:
+        if path != DB_PATH:
+            os.replace(path + TEMP_SUFFIX, path)
+
+    if DB_PATH in sources:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            for table in PARTITIONED_TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.commit()
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        logger.info(f"Dropped {', '.join(PARTITIONED_TABLES)} from {DB_PATH}")
+
+    logger.info(f"Repartitioned from {len(sources)} to {len(targets)} file(s). "
+                f"Start the bot with DB_PARTITIONS={target if target > 1 else 0}.")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Main Function
+# ---------------------------------------------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Offline tool: move item_stats, user_totals and active_drops between partition layouts. "
+                    "Stop every bot process first."
+    )
+    parser.add_argument("--to", type=int, required=True, help="Target partition count (0 or 1 for the main file)")
+    parser.add_argument("--from", dest="current", type=int, default=int(os.getenv("DB_PARTITIONS", 0)),
+                        help="Current partition count (defaults to DB_PARTITIONS)")
+    args = parser.parse_args(argv)
+
+    if args.to < 0 or args.current < 0:
+        parser.error("partition counts cannot be negative")
+
+    repartition(args.current, args.to)
+
+
+if __name__ == "__main__":
+    sys.exit(main())